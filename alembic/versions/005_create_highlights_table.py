@@ -0,0 +1,83 @@
+import json
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+
+# revision identifiers, used by Alembic.
+revision = '005'
+down_revision = '004'
+branch_labels = None
+depends_on = None
+
+
+BACKFILL_BATCH = 500
+
+
+def upgrade() -> None:
+    """Create highlights table (one row per highlight) and backfill it from stream_metadata.highlights."""
+
+    op.create_table(
+        'highlights',
+        sa.Column('id', sa.BigInteger(), autoincrement=True, nullable=False),
+        sa.Column('stream_id', sa.String(length=255), nullable=False),
+        # DOUBLE: start_time is part of the unique key, FLOAT is not precise enough for long streams
+        sa.Column('start_time', mysql.DOUBLE(), nullable=False),
+        sa.Column('end_time', mysql.DOUBLE(), nullable=False),
+        sa.Column('title', sa.String(length=512), nullable=True),
+        sa.Column('caption', sa.Text(), nullable=True),
+        sa.Column('thumbnail', sa.String(length=512), nullable=True),
+        sa.Column('snap_reason', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False, server_default=sa.text('CURRENT_TIMESTAMP')),
+        sa.Column('updated_at', sa.DateTime(), nullable=False, server_default=sa.text('CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP')),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('stream_id', 'start_time', name='uq_highlights_stream_start'),
+    )
+
+    # Backfill from the JSON blobs written before this table existed
+    conn = op.get_bind()
+    highlights_table = sa.table(
+        'highlights',
+        sa.column('stream_id', sa.String),
+        sa.column('start_time', sa.Float),
+        sa.column('end_time', sa.Float),
+        sa.column('title', sa.String),
+        sa.column('caption', sa.Text),
+        sa.column('thumbnail', sa.String),
+        sa.column('snap_reason', sa.Text),
+    )
+    streams = conn.execute(
+        sa.text("SELECT stream_id, highlights FROM stream_metadata WHERE highlights IS NOT NULL")
+    ).fetchall()
+
+    rows = []
+    for stream_id, blob in streams:
+        try:
+            items = json.loads(blob) if blob else []
+        except (TypeError, ValueError):
+            continue
+        # Later entries win, like re-snapped highlights do in the pipeline's upserts
+        by_start = {}
+        for item in items or []:
+            if not isinstance(item, dict) or item.get("start_time") is None or item.get("end_time") is None:
+                continue
+            start_time = round(float(item["start_time"]), 3)
+            by_start[start_time] = {
+                "stream_id": stream_id,
+                "start_time": start_time,
+                "end_time": round(float(item["end_time"]), 3),
+                "title": item.get("title"),
+                "caption": item.get("caption"),
+                "thumbnail": item.get("thumbnail"),
+                "snap_reason": item.get("snap_reason"),
+            }
+        rows.extend(by_start.values())
+        if len(rows) >= BACKFILL_BATCH:
+            op.bulk_insert(highlights_table, rows)
+            rows = []
+    if rows:
+        op.bulk_insert(highlights_table, rows)
+
+
+def downgrade() -> None:
+    op.drop_table('highlights')
@@ -0,0 +1,23 @@
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+
+
+# revision identifiers, used by Alembic.
+revision = '006'
+down_revision = '005'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Add score_sketch column (serialized highlight/saliency quantile sketches) to stream_metadata."""
+    op.add_column(
+        'stream_metadata',
+        sa.Column('score_sketch', mysql.MEDIUMTEXT(), nullable=True)
+    )
+
+
+def downgrade() -> None:
+    """Remove score_sketch column from stream_metadata table."""
+    op.drop_column('stream_metadata', 'score_sketch')
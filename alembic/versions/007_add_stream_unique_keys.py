@@ -0,0 +1,32 @@
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '007'
+down_revision = '006'
+branch_labels = None
+depends_on = None
+
+
+# (table, unique key name, columns)
+UNIQUE_KEYS = [
+    ('video_metadata', 'uq_video_stream_frame', ['stream_id', 'frame_index']),
+    ('audio_metadata', 'uq_audio_stream_chunk', ['stream_id', 'chunk_index']),
+    ('score_metadata', 'uq_score_stream_start', ['stream_id', 'start_time']),
+]
+
+
+def upgrade() -> None:
+    """Add per-stream unique keys so retried jobs upsert instead of duplicating rows."""
+    for table, name, columns in UNIQUE_KEYS:
+        # Drop duplicates left by retried jobs, keeping the first row of each key
+        join = " AND ".join(f"newer.{c} = older.{c}" for c in columns)
+        op.execute(
+            f"DELETE newer FROM {table} newer JOIN {table} older ON {join} AND newer.id > older.id"
+        )
+        op.create_unique_constraint(name, table, columns)
+
+
+def downgrade() -> None:
+    for table, name, _ in UNIQUE_KEYS:
+        op.drop_constraint(name, table, type_='unique')
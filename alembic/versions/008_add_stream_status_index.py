@@ -0,0 +1,17 @@
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '008'
+down_revision = '007'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Index for the dashboard list: status filter/sort with keyset seeks on stream_id (InnoDB appends id)."""
+    op.create_index('idx_status_stream', 'stream_metadata', ['status', 'stream_id'])
+
+
+def downgrade() -> None:
+    op.drop_index('idx_status_stream', table_name='stream_metadata')
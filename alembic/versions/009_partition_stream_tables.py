@@ -0,0 +1,78 @@
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+
+
+# revision identifiers, used by Alembic.
+revision = '009'
+down_revision = '008'
+branch_labels = None
+depends_on = None
+
+
+# Hash partitions of every per-stream table (all reads and writes filter on stream_id)
+PARTITIONS = 16
+
+# (table, index name, columns) covered by the unique keys of 007 or never queried
+REDUNDANT_INDEXES = [
+    ('video_metadata', 'idx_stream_id', ['stream_id']),
+    ('video_metadata', 'idx_stream_frame', ['stream_id', 'frame_index']),
+    ('video_metadata', 'idx_stream_timestamp', ['stream_id', 'timestamp']),
+    ('video_metadata', 'idx_filename', ['filename']),
+    ('audio_metadata', 'idx_stream_id', ['stream_id']),
+    ('audio_metadata', 'idx_stream_chunk', ['stream_id', 'chunk_index']),
+    ('audio_metadata', 'idx_stream_timestamps', ['stream_id', 'start_timestamp', 'end_timestamp']),
+    ('audio_metadata', 'idx_filename', ['filename']),
+    ('score_metadata', 'idx_stream_id', ['stream_id']),
+    ('score_metadata', 'idx_stream_time', ['stream_id', 'start_time', 'end_time']),
+    ('score_metadata', 'idx_stream_highlight_score', ['stream_id', 'highlight_score']),
+    ('score_metadata', 'idx_highlight_score', ['highlight_score']),
+    ('score_metadata', 'idx_saliency_score', ['saliency_score']),
+]
+
+PARTITIONED_TABLES = ['video_metadata', 'audio_metadata', 'score_metadata']
+
+
+def upgrade() -> None:
+    """
+    Drop redundant secondary indexes, hash-partition the per-stream tables by
+    stream_id and add frame_manifest, the compacted form of a completed
+    stream's video_metadata rows (see compact_streams.py).
+    """
+    for table, name, _ in REDUNDANT_INDEXES:
+        op.drop_index(name, table_name=table)
+    # The transcriber updates chunks by (stream_id, filename)
+    op.create_index('idx_stream_filename', 'audio_metadata', ['stream_id', 'filename'])
+
+    # MySQL requires the partitioning column in every unique key, the primary key included
+    for table in PARTITIONED_TABLES:
+        op.execute(
+            f"ALTER TABLE {table} DROP PRIMARY KEY, ADD PRIMARY KEY (id, stream_id) "
+            f"PARTITION BY KEY (stream_id) PARTITIONS {PARTITIONS}"
+        )
+
+    op.create_table(
+        'frame_manifest',
+        sa.Column('id', sa.BigInteger(), autoincrement=True, nullable=False),
+        sa.Column('stream_id', sa.String(length=255), nullable=False),
+        sa.Column('frame_count', sa.BigInteger(), nullable=False),
+        sa.Column('last_frame_index', sa.BigInteger(), nullable=False),
+        sa.Column('last_timestamp', sa.Float(), nullable=True),
+        sa.Column('width', sa.Integer(), nullable=True),
+        sa.Column('height', sa.Integer(), nullable=True),
+        sa.Column('manifest', mysql.LONGBLOB(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False, server_default=sa.text('CURRENT_TIMESTAMP')),
+        sa.Column('updated_at', sa.DateTime(), nullable=False, server_default=sa.text('CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP')),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('stream_id', name='uq_frame_manifest_stream'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('frame_manifest')
+    for table in PARTITIONED_TABLES:
+        op.execute(f"ALTER TABLE {table} REMOVE PARTITIONING")
+        op.execute(f"ALTER TABLE {table} DROP PRIMARY KEY, ADD PRIMARY KEY (id)")
+    op.drop_index('idx_stream_filename', table_name='audio_metadata')
+    for table, name, columns in REDUNDANT_INDEXES:
+        op.create_index(name, table, columns)
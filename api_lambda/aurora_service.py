@@ -1,13 +1,43 @@
+import json
+import time
+import base64
 import asyncio
 import aiomysql
 import logging
 
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 from contextlib import asynccontextmanager
+from repositories.db_metrics import DbMetrics, get_metrics_sink
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 
+# Stream totals are cached per warm container; below EXACT_COUNT_BELOW rows
+# (InnoDB estimate) the unfiltered total is an exact COUNT(*)
+STREAM_COUNT_TTL_SECONDS = 60
+EXACT_COUNT_BELOW = 10000
+
+# status -> (cached_at, total, is_estimate)
+_count_cache: Dict[Optional[str], Tuple[float, int, bool]] = {}
+
+
+def _encode_cursor(key_values: List[Any]) -> str:
+    raw = json.dumps(key_values).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+
+def _decode_cursor(cursor: Optional[str]) -> Optional[List[Any]]:
+    """Sort key values of the last row of the previous page, or None for an invalid cursor."""
+    if not cursor:
+        return None
+    try:
+        value = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+    except (ValueError, TypeError):
+        return None
+    if not isinstance(value, list) or not value:
+        return None
+    return value
+
 
 class AuroraService:
 
@@ -19,6 +49,7 @@ class AuroraService:
         database: str,
         port: int = 3306,
         pool_size: int = 10,
+        component: str = "api",
     ):
         self.host = host
         self.user = user
@@ -27,6 +58,7 @@ class AuroraService:
         self.port = port
         self.pool_size = pool_size
         self.pool = None
+        self.metrics = DbMetrics(component)
 
         logger.info("AuroraService initialized with asyncio")
 
@@ -46,18 +78,27 @@ class AuroraService:
 
     @asynccontextmanager
     async def get_connection(self):
-        """Async context manager for database connections."""
+        """Async context manager for database connections (instrumented, see repositories/db_metrics.py)."""
         if not self.pool:
             raise RuntimeError("Pool not initialized. Call initialize() first.")
 
+        started = time.perf_counter()
         async with self.pool.acquire() as conn:
-            async with conn.cursor(aiomysql.DictCursor) as cursor:
-                try:
-                    yield cursor
-                    await conn.commit()
-                except Exception as e:
-                    await conn.rollback()
-                    raise e
+            self.metrics.acquired(time.perf_counter() - started)
+            try:
+                async with conn.cursor(aiomysql.DictCursor) as cursor:
+                    try:
+                        yield self.metrics.wrap(cursor)
+                        await conn.commit()
+                    except Exception as e:
+                        await conn.rollback()
+                        raise e
+            finally:
+                self.metrics.released()
+
+    def flush_metrics(self):
+        """Publish the DB metrics recorded so far (called at the end of each invocation)."""
+        get_metrics_sink().flush()
 
     async def insert_dict(self, table_name: str, data: Dict[str, Any]) -> int:
         """
@@ -200,102 +241,218 @@ class AuroraService:
         )
         task.add_done_callback(self._handle_task_result)
 
+    async def _stream_count(self, status: Optional[str]) -> Tuple[int, bool]:
+        """
+        Total for the dashboard pager, cached per warm container for STREAM_COUNT_TTL_SECONDS.
+        Without a status filter, large tables use InnoDB's row estimate instead of COUNT(*).
+
+        Returns:
+            (total, is_estimate)
+        """
+        cached = _count_cache.get(status)
+        if cached is not None and time.monotonic() - cached[0] < STREAM_COUNT_TTL_SECONDS:
+            return cached[1], cached[2]
+
+        total, is_estimate = None, False
+        async with self.get_connection() as cursor:
+            if not status:
+                await cursor.execute(
+                    """
+                    SELECT TABLE_ROWS AS total
+                    FROM information_schema.TABLES
+                    WHERE TABLE_SCHEMA = %s AND TABLE_NAME = 'stream_metadata'
+                    """,
+                    (self.database,),
+                )
+                row = await cursor.fetchone()
+                if row and row["total"] is not None and row["total"] >= EXACT_COUNT_BELOW:
+                    total, is_estimate = int(row["total"]), True
+            if total is None:
+                # Exact count is cheap while the table is small, or via idx_status_stream with a filter
+                if status:
+                    await cursor.execute("SELECT COUNT(*) AS total FROM stream_metadata WHERE status = %s", (status,))
+                else:
+                    await cursor.execute("SELECT COUNT(*) AS total FROM stream_metadata")
+                total = int((await cursor.fetchone())["total"])
+
+        _count_cache[status] = (time.monotonic(), total, is_estimate)
+        return total, is_estimate
+
     async def get_available_streams(
         self,
         page: int = 1,
         limit: int = 20,
         status: Optional[str] = None,
         sort_by: str = "stream_id",
-        sort_order: str = "DESC"
+        sort_order: str = "DESC",
+        cursor: Optional[str] = None,
     ) -> Dict[str, Any]:
         """
-        Retrieve available streams with pagination support.
+        Retrieve available streams with keyset pagination.
 
         Args:
-            page: Page number (1-based indexing)
+            page: Page number (1-based), used for the pager and, without a
+                cursor, to reach a page by OFFSET (slow for deep pages)
             limit: Number of items per page
             status: Optional filter by status
             sort_by: Column to sort by (default: stream_id)
             sort_order: Sort direction (ASC or DESC)
+            cursor: Opaque "next_cursor" of the previous page
 
         Returns:
             Dictionary containing:
-            - items: List of stream records
-            - total: Total number of records
+            - items: List of stream records (without highlights, see get_highlights_by_stream)
+            - total: Total number of records (cached; estimated for large tables)
+            - total_is_estimate: Whether total is InnoDB's row estimate
             - page: Current page number
             - total_pages: Total number of pages
             - has_next: Boolean indicating if there's a next page
             - has_prev: Boolean indicating if there's a previous page
+            - next_cursor: Cursor of the next page or None
         """
         # Validate and sanitize input
         allowed_sort_columns = {"stream_id", "status"}
         if sort_by not in allowed_sort_columns:
             sort_by = "stream_id"
-        
+
         sort_order = "DESC" if sort_order.upper() != "ASC" else "ASC"
-        
-        # Calculate offset
-        offset = (max(1, page) - 1) * limit
+        limit = max(1, limit)
 
-        # Base query
+        # Lean projection: the list view never needs the large columns.
+        # highlights stays in the shape as null for existing clients.
         query = """
-            SELECT 
-                stream_id,
-                stream_url,
-                highlights,
-                status,
-                message
+            SELECT id, stream_id, stream_url, status, message
             FROM stream_metadata
         """
-        count_query = "SELECT COUNT(*) as total FROM stream_metadata"
-        
-        # Add status filter if provided
-        where_clause = ""
-        params = []
+        conditions, params = [], []
         if status:
-            where_clause = " WHERE status = %s"
+            conditions.append("status = %s")
             params.append(status)
-            
-        query += where_clause
-        count_query += where_clause
-
-        # Add sorting and pagination
-        query += f" ORDER BY {sort_by} {sort_order} LIMIT %s OFFSET %s"
-        params.extend([limit, offset])
 
-        async with self.get_connection() as cursor:
-            # Get total count
-            await cursor.execute(count_query, params[:-2] if status else [])
-            total = (await cursor.fetchone())["total"]
-            
-            # Get paginated results
-            await cursor.execute(query, params)
-            items = await cursor.fetchall()
-            
-            # Calculate pagination info
-            total_pages = -((-total) // limit)  # Ceiling division
-            
-            return {
-                "items": items,
-                "total": total,
-                "page": page,
-                "total_pages": total_pages,
-                "has_next": page < total_pages,
-                "has_prev": page > 1,
-                "limit": limit
+        # stream_id is not unique, id breaks the remaining ties; InnoDB appends id
+        # to idx_stream_id / idx_status_stream, so the keys still range-scan them
+        keys = ["stream_id", "id"] if sort_by == "stream_id" else [sort_by, "stream_id", "id"]
+        after = _decode_cursor(cursor)
+        if after is not None and len(after) != len(keys):
+            after = None  # cursor of another sort
+        if after is not None:
+            # Seek past the last row with a row constructor, e.g. (status, stream_id, id) < (%s, %s, %s)
+            op = "<" if sort_order == "DESC" else ">"
+            conditions.append(f"({', '.join(keys)}) {op} ({', '.join(['%s'] * len(keys))})")
+            params.extend(after)
+
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY " + ", ".join(f"{key} {sort_order}" for key in keys) + " LIMIT %s"
+        params.append(limit + 1)  # one extra row tells whether another page exists
+        if after is None and page > 1:
+            query += " OFFSET %s"
+            params.append((page - 1) * limit)
+
+        async with self.get_connection() as db_cursor:
+            await db_cursor.execute(query, params)
+            rows = list(await db_cursor.fetchall())
+
+        has_next = len(rows) > limit
+        rows = rows[:limit]
+        next_cursor = _encode_cursor([rows[-1][key] for key in keys]) if has_next else None
+        items = [
+            {
+                "stream_id": r["stream_id"],
+                "stream_url": r["stream_url"],
+                "highlights": None,
+                "status": r["status"],
+                "message": r["message"],
             }
-        
-    async def get_highlights_by_stream(self, stream_id: str):
-        query = """
-            SELECT stream_id, stream_url, highlights, status, message
+            for r in rows
+        ]
+
+        total, is_estimate = await self._stream_count(status)
+        total_pages = max(page if rows else 0, -((-total) // limit))  # Ceiling division
+
+        return {
+            "items": items,
+            "total": total,
+            "total_is_estimate": is_estimate,
+            "page": page,
+            "total_pages": total_pages,
+            "has_next": has_next,
+            "has_prev": page > 1,
+            "next_cursor": next_cursor,
+            "limit": limit
+        }
+
+    async def get_highlights_by_stream(
+        self,
+        stream_id: str,
+        start_time: Optional[float] = None,
+        end_time: Optional[float] = None,
+        after: Optional[float] = None,
+        limit: Optional[int] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Retrieve a stream and one page of its highlights ordered by start_time.
+
+        Args:
+            stream_id: The stream identifier
+            start_time: Optional lower bound on highlight start_time (inclusive)
+            end_time: Optional upper bound on highlight start_time (exclusive)
+            after: Keyset cursor, only highlights starting after this time
+            limit: Maximum number of highlights to return
+
+        Returns:
+            Stream record with "highlights" as a JSON list string (same shape as
+            the former stream_metadata.highlights blob) and "next_after", the
+            cursor of the next page or None, or None if the stream does not exist.
+        """
+        stream_query = """
+            SELECT stream_id, stream_url, status, message
             FROM stream_metadata
             WHERE stream_id = %s
             LIMIT 1
         """
+        query = """
+            SELECT start_time, end_time, title, caption, thumbnail, snap_reason
+            FROM highlights
+            WHERE stream_id = %s
+        """
+        params = [stream_id]
+
+        if start_time is not None:
+            query += " AND start_time >= %s"
+            params.append(start_time)
+
+        if end_time is not None:
+            query += " AND start_time < %s"
+            params.append(end_time)
+
+        if after is not None:
+            query += " AND start_time > %s"
+            params.append(after)
+
+        query += " ORDER BY start_time ASC"
+
+        # Fetch one extra row to know whether another page exists
+        if limit is not None:
+            query += " LIMIT %s"
+            params.append(limit + 1)
+
         async with self.get_connection() as cursor:
-            await cursor.execute(query, (stream_id,))
-            result = await cursor.fetchone()
-            return result
+            await cursor.execute(stream_query, (stream_id,))
+            stream = await cursor.fetchone()
+            if stream is None:
+                return None
+            await cursor.execute(query, tuple(params))
+            rows = list(await cursor.fetchall())
+
+        next_after = None
+        if limit is not None and len(rows) > limit:
+            rows = rows[:limit]
+            next_after = rows[-1]["start_time"]
+
+        stream["highlights"] = json.dumps(rows)
+        stream["next_after"] = next_after
+        return stream
 
     async def get_video_by_stream_and_frame(
         self, stream_id: str, frame_index: int
@@ -124,7 +124,10 @@ async def insert_dict(table_name: str, data: dict):
     logger.info("connecting to db")
     service = await init_db()
     logger.info("successfully connected to db")
-    return await service.insert_dict(table_name, data)
+    try:
+        return await service.insert_dict(table_name, data)
+    finally:
+        service.flush_metrics()
 
 
 def video_receiver(event, context):
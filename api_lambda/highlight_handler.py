@@ -9,6 +9,8 @@ from .aurora_service import AuroraService
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 
+# "sqlite" serves the API from the embedded database of a single-box run
+STORAGE_BACKEND = os.environ.get("STORAGE_BACKEND", "aurora")
 SECRET_NAME = os.environ["SECRET_NAME"]
 DB_URL = os.environ["DB_URL"]
 DB_NAME = os.environ["DB_NAME"]
@@ -16,38 +18,49 @@ FRONTEND_ORIGIN = os.environ.get("FRONTEND_ORIGIN", "*")
 ALLOWED_ORIGINS = os.environ.get("ALLOWED_ORIGINS", "").split(",")
 
 # Global pool (shared across invocations)
-db_service: AuroraService | None = None
+db_service = None
 loop = asyncio.new_event_loop()
 asyncio.set_event_loop(loop)
 
 async def init_db():
     global db_service
     if db_service is None:
-        secrets = get_secret(SECRET_NAME)
-        db_service = AuroraService(
-            host=DB_URL,
-            user=secrets["username"],
-            password=secrets["password"],
-            database=DB_NAME,
-        )
+        if STORAGE_BACKEND == "sqlite":
+            from repositories.sqlite_service import SqliteService
+            db_service = SqliteService(component="api")
+        else:
+            secrets = get_secret(SECRET_NAME)
+            db_service = AuroraService(
+                host=DB_URL,
+                user=secrets["username"],
+                password=secrets["password"],
+                database=DB_NAME,
+            )
         await db_service.initialize()
     return db_service
 
-async def get_list_of_streams(page: int = 1, limit: int = 20, status: str = None):
+async def get_list_of_streams(page: int = 1, limit: int = 20, status: str = None, cursor: str = None):
     logger.info("connecting to db")
     service = await init_db()
     logger.info("successfully connected to db")
-    return await service.get_available_streams(
-        page=page,
-        limit=limit,
-        status=status
-    )
+    try:
+        return await service.get_available_streams(
+            page=page,
+            limit=limit,
+            status=status,
+            cursor=cursor
+        )
+    finally:
+        service.flush_metrics()
 
-async def get_highlights_by_stream(stream_id: str):
+async def get_highlights_by_stream(stream_id: str, **page):
     logger.info("connecting to db")
     service = await init_db()
     logger.info("successfully connected to db")
-    return await service.get_highlights_by_stream(stream_id)
+    try:
+        return await service.get_highlights_by_stream(stream_id, **page)
+    finally:
+        service.flush_metrics()
 
 def _cors_headers(event):
     
@@ -74,12 +87,14 @@ def get_streams(event, context):
         page = int(query_params.get('page', 1))
         limit = int(query_params.get('limit', 20))
         status = query_params.get('status')
+        cursor = query_params.get('cursor')
 
         # Get streams with pagination
         result = loop.run_until_complete(get_list_of_streams(
             page=page,
             limit=limit,
-            status=status
+            status=status,
+            cursor=cursor
         ))
 
         return {
@@ -103,7 +118,15 @@ def get_highlights(event, context):
             raise KeyError("stream_id not found in Query Parameters.")
         stream_id = query_params["stream_id"]
 
-        result = loop.run_until_complete(get_highlights_by_stream(stream_id))
+        # Optional time range / keyset pagination over the highlights table
+        page = {}
+        for key in ("start_time", "end_time", "after"):
+            if query_params.get(key) is not None:
+                page[key] = float(query_params[key])
+        if query_params.get("limit") is not None:
+            page["limit"] = int(query_params["limit"])
+
+        result = loop.run_until_complete(get_highlights_by_stream(stream_id, **page))
 
         return  {
             "statusCode": 200,
@@ -1,28 +1,46 @@
 import os
 import json
+import time
 import asyncio
 import numpy as np
 
 from typing import List
+from contextlib import aclosing
 from llm.claude import Claude
 from utils.logger import app_logger as logger
-from utils.boundary_snapper import snap_window
+from utils.boundary_snapper import BoundaryIndex, EMPTY_INDEX, snap_windows
+from utils.quantile_sketch import ScoreSketches, get_score_sketches
 from evaluators.edge_refiner import EdgeRefiner
-from utils.helpers import get_video_frame_filename
-from nlp.text_tiling import text_tiling_boundaries
+from evaluators.edge_confidence import WordSpans, get_refinement_stats, score_snap_confidence
+from nlp.text_tiling import IncrementalTextTiler
+from utils.helpers import get_video_frame_filename, EMPTY_STRING
+from utils.frame_manifest import FrameManifest, FRAME_MANIFEST_FILENAME
 from evaluators.snap_evaluator import SnapEvaluator
-from repositories.aurora_service import AuroraService
-from detectors.scene_detector import detect_scene_boundaries
+from repositories.storage_backend import create_storage_backend
+from repositories.frame_segment_store import FrameSegmentStore
+from detectors.scene_detector import detect_scene_boundaries, get_scene_detector
+from detectors.shot_hints import confirm_scene_hints, get_shot_hints
+from detectors.audio_boundary_detector import detect_audio_boundaries, get_audio_boundary_detector
 from config import (
-    STREAM_METADATA_TABLE,
+    HIGHLIGHTS_TABLE,
     HIGHLIGHT_CHUNK,
+    HIGHLIGHT_THRESHOLD_MODE,
+    HIGHLIGHT_THRESHOLD_PERCENTILE,
     CANDIDATE_SLICE,
     VIDEO_FRAME_SAMPLE_RATE,
     HIGHLIGHT_MIN_LEN,
     HIGHLIGHT_MAX_LEN,
     BASE_DIR,
+    AUDIO_CHUNK,
     MAX_EDGE_SHIFT_SECONDS,
+    MAX_AUDIO_SNAP_SECONDS,
+    SHOT_HINTS_REQUIRE_CONFIRMATION,
     AGENTIC_REFINEMENT_ENABLED,
+    EDGE_REFINER_SKIP_CONFIDENCE,
+    TEXT_TILING_BLOCK,
+    TEXT_TILING_STEP,
+    TEXT_TILING_SMOOTH,
+    TEXT_TILING_CUTOFF_STD,
 )
 
 
@@ -132,14 +150,19 @@ class GroupAndTitleService:
         return response["groups"]
 
 class AssortClipsService:
-    def __init__(self):
+    def __init__(self, frame_segments: FrameSegmentStore | None = None):
         self.is_db_service_initialized = False
-        self.db_service = AuroraService(pool_size=10)
+        # Packed frame storage: thumbnails must be published as per-frame objects
+        self.frame_segments = frame_segments
+        self.db_service = create_storage_backend(pool_size=4, component="assort_clips")
         self.title_service = GroupAndTitleService()
-        # Boundary caches per stream_id
-        self._scene_boundaries = {}
-        self._topic_boundaries = {}
-        self._topic_words_count = {}
+        # Boundary indexes per stream_id
+        self._scene_boundaries: dict[str, BoundaryIndex] = {}
+        self._topic_boundaries: dict[str, BoundaryIndex] = {}
+        self._audio_boundaries: dict[str, BoundaryIndex] = {}
+        self._topic_tilers: dict[str, IncrementalTextTiler] = {}
+        self._topic_next_chunk: dict[str, int] = {}
+        self._word_spans: dict[str, WordSpans] = {}
         self.snap_evaluator: SnapEvaluator | None = None
         self.edge_refiner: EdgeRefiner | None = None
 
@@ -187,12 +210,37 @@ class AssortClipsService:
     async def has_more_clips(self, stream_id, end_time):
         return await self.db_service.has_more_entries_after(stream_id, end_time)
 
-    def get_highlight_thresholds(self, scored_clips: List):
-        h_scores = [score["highlight_score"]for score in scored_clips]
-        s_scores = [score["saliency_score"]for score in scored_clips]
-        prim = round(np.percentile(h_scores, 70), 1)
+    def get_highlight_thresholds(self, scored_clips: List, sketches: ScoreSketches | None = None):
+        """
+        Primary/secondary highlight thresholds and the saliency threshold at
+        HIGHLIGHT_THRESHOLD_PERCENTILE, from the stream-wide sketches when given
+        ("global" mode) or from this window's clips ("window" mode).
+        """
+        q = HIGHLIGHT_THRESHOLD_PERCENTILE
+        if sketches is not None and sketches.count > 0:
+            prim = round(sketches.highlight.quantile(q / 100.0), 1)
+            sal = sketches.saliency.quantile(q / 100.0)
+        else:
+            h_scores = [score["highlight_score"]for score in scored_clips]
+            s_scores = [score["saliency_score"]for score in scored_clips]
+            prim = round(np.percentile(h_scores, q), 1)
+            sal = np.percentile(s_scores, q)
         sec = round(prim - 0.1, 1)
-        return (prim, sec), round(np.percentile(s_scores, 70), 1)
+        return (prim, sec), round(sal, 1)
+
+    async def _score_sketches(self, stream_id: str) -> ScoreSketches | None:
+        if HIGHLIGHT_THRESHOLD_MODE != "global":
+            return None
+        sketches = get_score_sketches(stream_id)
+        if sketches.count == 0:
+            # Scores were produced by another process; use the sketches persisted with the stream
+            stream = await self.db_service.get_stream(stream_id)
+            if stream and stream.get("score_sketch"):
+                try:
+                    sketches.merge(ScoreSketches.from_dict(json.loads(stream["score_sketch"])))
+                except Exception as e:
+                    logger.warning(f"[AssortClipsService] unable to load score sketches: {e}")
+        return sketches
 
     def _clamp_to_edge_budget(self, orig_start: float, orig_end: float, new_start: float, new_end: float):
         """Clamp each edge shift to MAX_EDGE_SHIFT_SECONDS relative to original.
@@ -214,34 +262,81 @@ class AssortClipsService:
             return orig_start, orig_end
         return clamped_start, clamped_end
 
-    async def _flatten_transcript_words(self, stream_id: str):
-        rows = await self.db_service.get_audios_by_stream(stream_id=stream_id)
+    @staticmethod
+    def _transcript_words(row) -> List[dict]:
+        t = row.get("transcript")
+        if not t:
+            return []
+        try:
+            items = json.loads(t)
+        except Exception:
+            return []
+        start0 = float(row.get("start_timestamp") or 0.0)
         words = []
-        for row in rows:
-            t = row.get("transcript")
-            if not t:
+        for it in items:
+            if it.get("type") != "pronunciation":
                 continue
-            try:
-                items = json.loads(t)
-            except Exception:
+            st = it.get("start_time")
+            if st is None:
                 continue
-            start0 = float(row.get("start_timestamp") or 0.0)
-            for it in items:
-                if it.get("type") != "pronunciation":
-                    continue
-                st = it.get("start_time")
-                if st is None:
-                    continue
-                words.append({
-                    "content": it.get("content", ""),
-                    "start_time": float(st) + start0,
-                    "type": "pronunciation",
-                })
+            et = it.get("end_time")
+            words.append({
+                "content": it.get("content", ""),
+                "start_time": float(st) + start0,
+                "end_time": float(et) + start0 if et is not None else None,
+                "type": "pronunciation",
+            })
         return words
 
-    async def _ensure_boundaries(self, stream_id: str, clip_scorer_event: asyncio.Event | None = None):
-        # Scene boundaries from frames if not cached
-        if stream_id not in self._scene_boundaries:
+    async def _feed_transcript_words(self, stream_id: str, up_to_time: float | None):
+        """
+        Append words of audio chunks not seen yet to the stream's TextTiling engine.
+
+        Only chunks ending by up_to_time are read, since their transcripts are final
+        once the scorer has covered them; None reads every remaining chunk.
+        """
+        tiler = self._topic_tilers.get(stream_id)
+        if tiler is None:
+            tiler = IncrementalTextTiler(
+                block_size=TEXT_TILING_BLOCK,
+                step=TEXT_TILING_STEP,
+                smoothing_width=TEXT_TILING_SMOOTH,
+                cutoff_std=TEXT_TILING_CUTOFF_STD,
+            )
+            self._topic_tilers[stream_id] = tiler
+
+        next_chunk = self._topic_next_chunk.get(stream_id, 0)
+        end_chunk = None
+        if up_to_time is not None:
+            end_chunk = int(up_to_time // AUDIO_CHUNK) - 1
+            if end_chunk < next_chunk:
+                return tiler
+        # Streamed: with up_to_time=None this reads the rest of the stream's transcripts
+        rows = self.db_service.iter_audios_by_stream(
+            stream_id=stream_id,
+            start_chunk=next_chunk,
+            end_chunk=end_chunk,
+            columns=("chunk_index", "start_timestamp", "transcript"),
+        )
+        async with aclosing(rows):
+            async for row in rows:
+                if row.get("transcript") == EMPTY_STRING and up_to_time is not None:
+                    # not transcribed yet, keep word order by resuming here next time
+                    break
+                words = self._transcript_words(row)
+                tiler.add_words(words)
+                self._word_spans.setdefault(stream_id, WordSpans()).add_words(words)
+                next_chunk = row["chunk_index"] + 1
+        self._topic_next_chunk[stream_id] = next_chunk
+        return tiler
+
+    async def _ensure_boundaries(self, stream_id: str, up_to_time: float, clip_scorer_event: asyncio.Event | None = None):
+        # Scene boundaries from the online detector fed by VideoProcessor
+        detector = get_scene_detector(stream_id)
+        if detector.frames_seen > 0:
+            self._scene_boundaries[stream_id] = BoundaryIndex(detector.boundaries())
+        elif stream_id not in self._scene_boundaries:
+            # Frames were not ingested by this process, scan them once from disk
             frames_dir = os.path.join(BASE_DIR, stream_id, "frames")
             if os.path.isdir(frames_dir):
                 try:
@@ -251,62 +346,209 @@ class AssortClipsService:
                     cuts = []
             else:
                 cuts = []
-            self._scene_boundaries[stream_id] = cuts
+            self._scene_boundaries[stream_id] = BoundaryIndex(cuts)
+
+        # Refine histogram cuts with frame-accurate hints from the demuxer
+        shot_hints = get_shot_hints(stream_id)
+        hints = shot_hints.candidates()
+        if hints:
+            # Recorded times of the sampled frames come from the manifest VideoProcessor
+            # checkpoints next to them (memory-mapped, O(1) per frame)
+            manifest = None
+            manifest_path = os.path.join(BASE_DIR, stream_id, "frames", FRAME_MANIFEST_FILENAME)
+            if shot_hints.start_time is not None and os.path.exists(manifest_path):
+                try:
+                    manifest = FrameManifest.open(manifest_path)
+                except (OSError, ValueError) as e:
+                    logger.warning(f"[AssortClipsService] could not map the frame manifest of {stream_id}: {e}")
+            frame_time_fn = None
+            if manifest is not None:
+                # On the hints' clock (seconds from the stream start)
+                def _hint_frame_time(idx, start=shot_hints.start_time):
+                    t = manifest.timestamp_of(idx)
+                    return None if t is None else t - start
+                frame_time_fn = _hint_frame_time
+            try:
+                cuts = confirm_scene_hints(
+                    hints,
+                    self._scene_boundaries[stream_id].tolist(),
+                    fps=VIDEO_FRAME_SAMPLE_RATE,
+                    require_confirmation=SHOT_HINTS_REQUIRE_CONFIRMATION,
+                    frame_time=frame_time_fn,
+                )
+            finally:
+                if manifest is not None:
+                    manifest.close()
+            self._scene_boundaries[stream_id] = BoundaryIndex(cuts)
+
+        # Audio boundaries (speech pauses / energy changes) from the online detector fed by AudioChunker
+        audio_detector = get_audio_boundary_detector(stream_id)
+        if audio_detector.seconds_seen > 0:
+            self._audio_boundaries[stream_id] = BoundaryIndex(audio_detector.boundaries())
+        elif stream_id not in self._audio_boundaries:
+            try:
+                self._audio_boundaries[stream_id] = BoundaryIndex(detect_audio_boundaries(os.path.join(BASE_DIR, stream_id, "audio_chunks")))
+            except Exception as e:
+                logger.warning(f"[AssortClipsService] Audio boundary detection failed: {e}")
+                self._audio_boundaries[stream_id] = EMPTY_INDEX
 
-        # Topic boundaries via TextTiling, with lightweight refresh when new transcript arrives
-        refresh_threshold = 100  # recompute when we have 100 new words
-        need_recompute = stream_id not in self._topic_boundaries
+        # Topic boundaries via incremental TextTiling over newly transcribed words
+        if clip_scorer_event is not None and clip_scorer_event.is_set():
+            up_to_time = None
         try:
-            words = await self._flatten_transcript_words(stream_id)
-            current_count = len(words)
+            tiler = await self._feed_transcript_words(stream_id, up_to_time)
+            self._topic_boundaries[stream_id] = BoundaryIndex(tiler.boundaries())
         except Exception as e:
-            logger.warning(f"[AssortClipsService] Failed to read words for TextTiling: {e}")
-            words = []
-            current_count = 0
-
-        last_count = self._topic_words_count.get(stream_id, 0)
-        if not need_recompute:
-            if clip_scorer_event is not None and clip_scorer_event.is_set():
-                need_recompute = True
-            elif current_count - last_count >= refresh_threshold:
-                need_recompute = True
-
-        if need_recompute:
-            try:
-                topics = text_tiling_boundaries(words)
-            except Exception as e:
-                logger.warning(f"[AssortClipsService] TextTiling failed: {e}")
-                topics = []
-            self._topic_boundaries[stream_id] = topics
-            self._topic_words_count[stream_id] = current_count
-
-    def _snap_highlight(self, stream_id: str, start: float, end: float):
-        scenes = self._scene_boundaries.get(stream_id, [])
-        topics = self._topic_boundaries.get(stream_id, [])
+            logger.warning(f"[AssortClipsService] TextTiling failed: {e}")
+            self._topic_boundaries.setdefault(stream_id, EMPTY_INDEX)
+
+    def _snap_highlights(self, stream_id: str, starts: List[float], ends: List[float], priority: str = "topic_first", audio_refine: float = MAX_AUDIO_SNAP_SECONDS):
+        """
+        Snap many highlight windows in one vectorized call. Returns [(start, end, tags), ...].
+
+        audio_refine lets an audio boundary that close to a snapped edge win;
+        pass 0 when the caller asked for a specific source.
+        """
+        starts_arr = np.asarray(starts, dtype=np.float64)
+        ends_arr = np.asarray(ends, dtype=np.float64)
         # Use generous bounds; final clamping to MAX_EDGE_SHIFT_SECONDS is applied after snapping
         generous_min = 1.0
-        generous_max = max(generous_min + 0.5, (end - start) + 2 * MAX_EDGE_SHIFT_SECONDS)
-        s, e, tags = snap_window(
-            start,
-            end,
-            scene_boundaries=scenes,
-            topic_boundaries=topics,
+        generous_max = np.maximum(generous_min + 0.5, (ends_arr - starts_arr) + 2 * MAX_EDGE_SHIFT_SECONDS)
+        new_starts, new_ends, tags = snap_windows(
+            starts_arr,
+            ends_arr,
+            scene_boundaries=self._scene_boundaries.get(stream_id, EMPTY_INDEX),
+            topic_boundaries=self._topic_boundaries.get(stream_id, EMPTY_INDEX),
+            audio_boundaries=self._audio_boundaries.get(stream_id, EMPTY_INDEX),
             max_shift_scene_start=MAX_EDGE_SHIFT_SECONDS,
             max_shift_scene_end=MAX_EDGE_SHIFT_SECONDS,
             max_shift_topic=MAX_EDGE_SHIFT_SECONDS,
+            max_shift_audio=MAX_AUDIO_SNAP_SECONDS,
             min_len=generous_min,
             max_len=generous_max,
-            priority="topic_first",
+            priority=priority,
+            audio_refine=audio_refine,
         )
-        return s, e, tags
+        return list(zip(new_starts.tolist(), new_ends.tolist(), tags))
+
+    def _snap_highlight(self, stream_id: str, start: float, end: float, priority: str = "topic_first", audio_refine: float = MAX_AUDIO_SNAP_SECONDS):
+        return self._snap_highlights(stream_id, [start], [end], priority=priority, audio_refine=audio_refine)[0]
 
     
+    async def _refine_highlight(self, stream_id: str, scored_clips: list, l: int, r: int, title: str, snapped: tuple) -> dict:
+        """Run EdgeRefiner on one snapped highlight and apply its plan."""
+        orig_start = scored_clips[l]["start_time"]
+        orig_end = scored_clips[r]["end_time"]
+        snapped_start, snapped_end, snap_tags = snapped
+        snapped_start, snapped_end = self._clamp_to_edge_budget(orig_start, orig_end, snapped_start, snapped_end)
+
+        # LLM agentic refinement (simple plan -> act -> verify)
+        chosen_start, chosen_end = snapped_start, snapped_end
+        snap_reason = None
+        stats = get_refinement_stats(stream_id)
+
+        # Deterministic fast path: skip the LLM when the snap is unambiguous
+        confidence, details = score_snap_confidence(
+            snapped_start,
+            snapped_end,
+            self._scene_boundaries.get(stream_id, EMPTY_INDEX),
+            self._topic_boundaries.get(stream_id, EMPTY_INDEX),
+            self._audio_boundaries.get(stream_id, EMPTY_INDEX),
+            self._word_spans.get(stream_id),
+            HIGHLIGHT_MIN_LEN,
+            HIGHLIGHT_MAX_LEN,
+        )
+        if confidence >= EDGE_REFINER_SKIP_CONFIDENCE:
+            stats.record_skipped()
+            snap_reason = (
+                f"Fast path (confidence {confidence:.2f}, LLM skipped): kept "
+                f"{snap_tags.get('start_source','original')}/{snap_tags.get('end_source','original')} snap; "
+                f"start agree={details['start']['agree']} gap={details['start']['gap']}, "
+                f"end agree={details['end']['agree']} gap={details['end']['gap']}, slack={details['slack']}s"
+            )
+            return self._highlight_dict(scored_clips, l, r, title, chosen_start, chosen_end, snap_reason)
+
+        refine_started = time.perf_counter()
+        try:
+            plan = await self.edge_refiner.refine(
+                stream_id,
+                base_path=f"{BASE_DIR}/{stream_id}",
+                snapped_start=snapped_start,
+                snapped_end=snapped_end,
+                topic_boundaries=self._topic_boundaries.get(stream_id, EMPTY_INDEX),
+                scene_boundaries=self._scene_boundaries.get(stream_id, EMPTY_INDEX),
+                min_len=HIGHLIGHT_MIN_LEN,
+                max_len=HIGHLIGHT_MAX_LEN,
+                audio_boundaries=self._audio_boundaries.get(stream_id, EMPTY_INDEX),
+            )
+            action = plan.get("action", "keep")
+            sd = float(plan.get("start_delta", 0.0))
+            ed = float(plan.get("end_delta", 0.0))
+            reason_txt = str(plan.get("reason", ""))
+
+            # Execute the plan deterministically
+            # The plan names a source: only use_audio lets nearby pauses override it
+            if action == "use_topic":
+                chosen_start, chosen_end, _ = self._snap_highlight(stream_id, orig_start, orig_end, audio_refine=0.0)
+                chosen_start, chosen_end = self._clamp_to_edge_budget(orig_start, orig_end, chosen_start, chosen_end)
+            elif action in ("use_scene", "use_audio"):
+                priority = "scene_first" if action == "use_scene" else "audio_first"
+                audio_refine = MAX_AUDIO_SNAP_SECONDS if action == "use_audio" else 0.0
+                chosen_start, chosen_end, _ = self._snap_highlight(stream_id, orig_start, orig_end, priority=priority, audio_refine=audio_refine)
+                chosen_start, chosen_end = self._clamp_to_edge_budget(orig_start, orig_end, chosen_start, chosen_end)
+            elif action == "micro_adjust":
+                # Apply small deltas to the snapped baseline with midpoint and edge budget guards
+                mid = (snapped_start + snapped_end) / 2.0
+                new_start = snapped_start + sd
+                new_end = snapped_end + ed
+                # midpoint safety
+                if new_start > mid:
+                    new_start = snapped_start
+                if new_end < mid:
+                    new_end = snapped_end
+                chosen_start, chosen_end = self._clamp_to_edge_budget(orig_start, orig_end, new_start, new_end)
+                if chosen_end <= chosen_start:
+                    chosen_start, chosen_end = snapped_start, snapped_end
+            else:
+                # keep
+                chosen_start, chosen_end = snapped_start, snapped_end
+
+            snap_reason = f"LLM plan={action}; applied deltas start {chosen_start-snapped_start:+.2f}s, end {chosen_end-snapped_end:+.2f}s; {reason_txt}"
+        except Exception as e:
+            logger.warning(f"[AssortClipsService] LLM EdgeRefiner failed: {e}")
+        stats.record_refined(time.perf_counter() - refine_started)
+        if snap_reason is None and (snapped_start != orig_start or snapped_end != orig_end):
+            snap_reason = (
+                f"Snapped to {snap_tags.get('start_source','original')}/"
+                f"{snap_tags.get('end_source','original')} boundaries; "
+                f"shifts: start {snapped_start-orig_start:+.2f}s, end {snapped_end-orig_end:+.2f}s"
+            )
+
+        return self._highlight_dict(scored_clips, l, r, title, chosen_start, chosen_end, snap_reason)
+
+    @staticmethod
+    def _highlight_dict(scored_clips: list, l: int, r: int, title: str, start: float, end: float, snap_reason: str | None) -> dict:
+        # Update thumbnail to chosen start frame
+        thumb_idx = int(start * VIDEO_FRAME_SAMPLE_RATE)
+        return {
+            "start_time": start,
+            "end_time": end,
+            "caption": ' '.join([clip["caption"] for clip in scored_clips[l:r+1]]),
+            "thumbnail": get_video_frame_filename(thumb_idx),
+            "title": title,
+            "snap_reason": snap_reason,
+        }
+
     async def assort_clips(self, stream_id, clip_scorer_event: asyncio.Event):
         should_break = False
         i = 0
         await self.intialize_db_service()
+        # Assembly is not resumed and a retry refines different edges, so its
+        # highlights would not upsert over a previous attempt's: start over
+        deleted = await self.db_service.delete_highlights(stream_id)
+        if deleted:
+            logger.info(f"[AssortClipsService] removed {deleted} highlights of a previous attempt of {stream_id}.")
         while True:
-            stream = await self.db_service.get_stream(stream_id)
             if should_break:
                 logger.info("[AssortClipsService] exiting assort clips service.")
                 break
@@ -329,7 +571,8 @@ class AssortClipsService:
                     continue
             
             potential_highlights = []
-            (primary_threshold, secondary_threshold), saliency_threshold = self.get_highlight_thresholds(scored_clips)
+            sketches = await self._score_sketches(stream_id)
+            (primary_threshold, secondary_threshold), saliency_threshold = self.get_highlight_thresholds(scored_clips, sketches)
             logger.info(f"[AssortClipsService] thresholds for highlights are: ({primary_threshold, secondary_threshold}, and saliency is: {saliency_threshold})")
             # Write the logic
             for clip in scored_clips:
@@ -343,122 +586,55 @@ class AssortClipsService:
 
             highlight_groups = self.consolidate_groups(self.get_one_groups(potential_highlights))
 
-            highlights = stream["highlights"] if "highlights" in stream else []
-            highlights = [] if not highlights else json.loads(highlights)
+            highlights = []
 
-            for (start_idx, end_idx) in highlight_groups:
-                groups = await self.title_service.group_and_generate_title([clip["caption"] for clip in scored_clips[start_idx:end_idx+1]])
+            # Title every group of the window concurrently, then snap all of them in one call
+            titled = await asyncio.gather(*[
+                self.title_service.group_and_generate_title([clip["caption"] for clip in scored_clips[start_idx:end_idx+1]])
+                for (start_idx, end_idx) in highlight_groups
+            ])
+            entries = []
+            for (start_idx, _), groups in zip(highlight_groups, titled):
                 for group in groups:
-                    l, r = start_idx + group["indexes"][0], start_idx + group["indexes"][-1]
-                    # Fast path: if agentic refinement is disabled, emit grouped highlights as-is
-                    if not AGENTIC_REFINEMENT_ENABLED:
-                        highlight = {
-                            "start_time": scored_clips[l]["start_time"],
-                            "end_time": scored_clips[r]["end_time"],
-                            "caption": ' '.join([clip["caption"] for clip in scored_clips[l:r+1]]),
-                            "thumbnail": get_video_frame_filename(l*VIDEO_FRAME_SAMPLE_RATE),
-                            "title": group["title"],
-                            "snap_reason": None,
-                        }
-                        highlights.append(highlight)
-                        continue
-                    # Agentic refinement: compute boundaries once, then snap this highlight
-                    await self._ensure_boundaries(stream_id, clip_scorer_event)
-                    orig_start = scored_clips[l]["start_time"]
-                    orig_end = scored_clips[r]["end_time"]
-                    snapped_start, snapped_end, snap_tags = self._snap_highlight(stream_id, orig_start, orig_end)
-                    snapped_start, snapped_end = self._clamp_to_edge_budget(orig_start, orig_end, snapped_start, snapped_end)
-
-                    # LLM agentic refinement (simple plan -> act -> verify)
-                    chosen_start, chosen_end = snapped_start, snapped_end
-                    snap_reason = None
-                    if self.edge_refiner is None:
-                        self.edge_refiner = EdgeRefiner()
-                    try:
-                        plan = await self.edge_refiner.refine(
-                            stream_id,
-                            base_path=f"{BASE_DIR}/{stream_id}",
-                            snapped_start=snapped_start,
-                            snapped_end=snapped_end,
-                            topic_boundaries=self._topic_boundaries.get(stream_id, []),
-                            scene_boundaries=self._scene_boundaries.get(stream_id, []),
-                            min_len=HIGHLIGHT_MIN_LEN,
-                            max_len=HIGHLIGHT_MAX_LEN,
-                        )
-                        action = plan.get("action", "keep")
-                        sd = float(plan.get("start_delta", 0.0))
-                        ed = float(plan.get("end_delta", 0.0))
-                        reason_txt = str(plan.get("reason", ""))
-
-                        # Execute the plan deterministically
-                        if action == "use_topic":
-                            chosen_start, chosen_end, _ = self._snap_highlight(stream_id, orig_start, orig_end)
-                            chosen_start, chosen_end = self._clamp_to_edge_budget(orig_start, orig_end, chosen_start, chosen_end)
-                        elif action == "use_scene":
-                            # Force scene-first by swapping priority for this call
-                            scenes = self._scene_boundaries.get(stream_id, [])
-                            topics = self._topic_boundaries.get(stream_id, [])
-                            from utils.boundary_snapper import snap_window
-                            generous_min = 1.0
-                            generous_max = max(generous_min + 0.5, (orig_end - orig_start) + 2 * MAX_EDGE_SHIFT_SECONDS)
-                            chosen_start, chosen_end, _ = snap_window(
-                                orig_start,
-                                orig_end,
-                                scene_boundaries=scenes,
-                                topic_boundaries=topics,
-                                max_shift_scene_start=MAX_EDGE_SHIFT_SECONDS,
-                                max_shift_scene_end=MAX_EDGE_SHIFT_SECONDS,
-                                max_shift_topic=MAX_EDGE_SHIFT_SECONDS,
-                                min_len=generous_min,
-                                max_len=generous_max,
-                                priority="scene_first",
-                            )
-                            chosen_start, chosen_end = self._clamp_to_edge_budget(orig_start, orig_end, chosen_start, chosen_end)
-                        elif action == "micro_adjust":
-                            # Apply small deltas to the snapped baseline with midpoint and edge budget guards
-                            mid = (snapped_start + snapped_end) / 2.0
-                            new_start = snapped_start + sd
-                            new_end = snapped_end + ed
-                            # midpoint safety
-                            if new_start > mid:
-                                new_start = snapped_start
-                            if new_end < mid:
-                                new_end = snapped_end
-                            chosen_start, chosen_end = self._clamp_to_edge_budget(orig_start, orig_end, new_start, new_end)
-                            if chosen_end <= chosen_start:
-                                chosen_start, chosen_end = snapped_start, snapped_end
-                        else:
-                            # keep
-                            chosen_start, chosen_end = snapped_start, snapped_end
-
-                        snap_reason = f"LLM plan={action}; applied deltas start {chosen_start-snapped_start:+.2f}s, end {chosen_end-snapped_end:+.2f}s; {reason_txt}"
-                    except Exception as e:
-                        logger.warning(f"[AssortClipsService] LLM EdgeRefiner failed: {e}")
-                    if snap_reason is None and (snapped_start != orig_start or snapped_end != orig_end):
-                        snap_reason = (
-                            f"Snapped to {snap_tags.get('start_source','original')}/"
-                            f"{snap_tags.get('end_source','original')} boundaries; "
-                            f"shifts: start {snapped_start-orig_start:+.2f}s, end {snapped_end-orig_end:+.2f}s"
-                        )
-
-                    # Update thumbnail to chosen start frame
-                    thumb_idx = int(chosen_start * VIDEO_FRAME_SAMPLE_RATE)
-                    highlight = {
-                        "start_time": chosen_start,
-                        "end_time": chosen_end,
+                    entries.append((start_idx + group["indexes"][0], start_idx + group["indexes"][-1], group["title"]))
+
+            if not AGENTIC_REFINEMENT_ENABLED:
+                # Fast path: if agentic refinement is disabled, emit grouped highlights as-is
+                for l, r, title in entries:
+                    highlights.append({
+                        "start_time": scored_clips[l]["start_time"],
+                        "end_time": scored_clips[r]["end_time"],
                         "caption": ' '.join([clip["caption"] for clip in scored_clips[l:r+1]]),
-                        "thumbnail": get_video_frame_filename(thumb_idx),
-                        "title": group["title"],
-                        "snap_reason": snap_reason,
-                    }
-                    highlights.append(highlight)
+                        "thumbnail": get_video_frame_filename(l*VIDEO_FRAME_SAMPLE_RATE),
+                        "title": title,
+                        "snap_reason": None,
+                    })
+            elif entries:
+                # Agentic refinement: compute boundaries once, then snap every highlight of the window
+                await self._ensure_boundaries(stream_id, scored_clips[-1]["end_time"], clip_scorer_event)
+                snapped = self._snap_highlights(
+                    stream_id,
+                    [scored_clips[l]["start_time"] for l, _, _ in entries],
+                    [scored_clips[r]["end_time"] for _, r, _ in entries],
+                )
+                if self.edge_refiner is None:
+                    self.edge_refiner = EdgeRefiner()
+                # Refine concurrently (bounded by the shared LLM limit); gather keeps timeline order
+                highlights.extend(await asyncio.gather(*[
+                    self._refine_highlight(stream_id, scored_clips, l, r, title, snapped[k])
+                    for k, (l, r, title) in enumerate(entries)
+                ]))
+                logger.info(f"[AssortClipsService] edge refinement stats for {stream_id}: {get_refinement_stats(stream_id).summary()}")
 
             logger.info(f"[AssortClipsService] generated highlights {highlights}")
 
-            await self.db_service.update_dict(
-                STREAM_METADATA_TABLE, 
-                {"highlights": json.dumps(highlights)},
-                where_clause="stream_id=%s",
-                where_params=(stream_id,)
+            if self.frame_segments is not None:
+                await self.frame_segments.publish_thumbnails(stream_id, highlights)
+
+            # Upsert only this window's highlights; (stream_id, start_time) keeps a window's re-runs idempotent
+            await self.db_service.upsert_dicts(
+                HIGHLIGHTS_TABLE,
+                [{"stream_id": stream_id, **highlight} for highlight in highlights],
+                unique_keys=["stream_id", "start_time"],
             )
             i += HIGHLIGHT_CHUNK 
@@ -4,10 +4,11 @@ import asyncio
 import aiofiles
 
 from asyncio import Event
-from utils.helpers import ERROR_STRING, retry_with_backoff
+from utils.helpers import ERROR_STRING, EMPTY_STRING, retry_with_backoff
 from utils.logger import app_logger as logger
+from utils.stream_state import get_stream_state
 from amazon_transcribe.model import TranscriptEvent
-from repositories.aurora_service import AuroraService
+from repositories.storage_backend import create_storage_backend
 from amazon_transcribe.client import TranscribeStreamingClient
 from amazon_transcribe.handlers import TranscriptResultStreamHandler
 from config import AWS_REGION, LANGUAGE_CODE, AUDIO_METADATA_TABLE_NAME
@@ -36,7 +37,7 @@ class AudioTranscriber:
     def __init__(self, audio_chunk_dir: str):
         self.chunk_dir = audio_chunk_dir
         self.is_db_service_initialized = False
-        self.db_service = AuroraService(pool_size=10)
+        self.db_service = create_storage_backend(pool_size=4, component="audio_transcriber")
 
     async def intialize_db_service(self):
         if not self.is_db_service_initialized:
@@ -86,12 +87,15 @@ class AudioTranscriber:
 
     async def transcribe_audio(self, stream_id, audio_processor_event: Event):
         await self.intialize_db_service()
+        stream_state = get_stream_state(stream_id)
         start_chunk = 0
         
         while True:
             audio_chunks = await self.db_service.get_audios_by_stream(
                 stream_id=stream_id, start_chunk=start_chunk, limit=10
             )
+            # Rows of a previous attempt exist before this run re-creates their local files
+            audio_chunks = [c for c in audio_chunks if c["chunk_index"] < stream_state.chunks_written]
 
             if len(audio_chunks) == 0:
                 if audio_processor_event.is_set():
@@ -102,6 +106,10 @@ class AudioTranscriber:
 
             for chunk in audio_chunks:
                 filename = chunk["filename"]
+                if chunk["transcript"] not in (None, EMPTY_STRING):
+                    # Transcribed (or failed for good) by a previous attempt
+                    stream_state.mark_transcribed(chunk["chunk_index"])
+                    continue
                 logger.info(f"[AudioTranscriber] trancribing {filename}...")
                 sample_rate = chunk["sample_rate"]
                 stream_id = chunk["stream_id"]
@@ -116,10 +124,12 @@ class AudioTranscriber:
                         where_params=(stream_id, filename)
                     )
                     logger.info(f"[TranscriptEventHandler] transcription errored pushed error string for {filename} to audio metadata table.")
+                stream_state.mark_transcribed(chunk["chunk_index"])
                 logger.info(f"[AudioTranscriber] {filename} transcribed.")
 
             start_chunk = audio_chunks[-1]["chunk_index"] + 1
 
             await asyncio.sleep(2)
 
+        stream_state.mark_transcripts_done()
         logger.info("[AudioTranscriber] exiting audio transcriber service")
@@ -1,11 +1,12 @@
 import av
 import os
-import cv2
 import json
 import numpy as np
 
 from config import VIDEO_FRAME_SAMPLE_RATE
 from utils.logger import app_logger as logger
+from utils.pcm_store import get_pcm_reader
+from utils.frame_store import get_frame_store
 from utils.helpers import get_audio_filename, get_video_frame_filename, EMPTY_STRING
 
 class CandidateClip:
@@ -13,6 +14,7 @@ class CandidateClip:
         self.start_time = start_time
         self.end_time = end_time
         self.base_path = base_path
+        self.frame_store = get_frame_store(f"{base_path}/frames")
 
     def get_audio_chunk_indexes(self, chunk_duration):
         start_chunk = int(self.start_time // chunk_duration)
@@ -25,6 +27,13 @@ class CandidateClip:
         return list(range(start_chunk, end_chunk + 1))
 
     def load_audio_segment(self, chunk_duration):
+        # Fast path: zero-copy view into the stream's contiguous PCM file
+        reader = get_pcm_reader(f"{self.base_path}/audio_chunks")
+        if reader is not None:
+            window = reader.window(self.start_time, self.end_time)
+            if window is not None:
+                return window
+
         chunks = self.get_audio_chunk_indexes(chunk_duration)
         sr = 0
         audios = []
@@ -52,11 +61,11 @@ class CandidateClip:
     def load_images(self):
         images = []
         for i in range(self.start_time * VIDEO_FRAME_SAMPLE_RATE,  self.end_time * VIDEO_FRAME_SAMPLE_RATE):
-            filepath = f"{self.base_path}/frames/{get_video_frame_filename(i)}"
-            if not os.path.exists(filepath):
-                logger.warning(f"[SaliencyScorerService] video frame does not exist {os.path.basename(filepath)}")
+            img = self.frame_store.get(i)
+            if img is None:
+                logger.warning(f"[SaliencyScorerService] video frame does not exist {get_video_frame_filename(i)}")
                 continue
-            images.append(cv2.imread(filename=filepath))
+            images.append(img)
         
         return images
     
@@ -1,4 +1,5 @@
 import cv2
+import json
 import asyncio
 import librosa
 import numpy as np
@@ -7,8 +8,10 @@ from typing import List
 from llm.claude import Claude
 from candidate_clip import CandidateClip
 from utils.logger import app_logger as logger
+from utils.stream_state import get_stream_state
+from utils.quantile_sketch import get_score_sketches
 from audio_transcriber import AudioTranscriber
-from repositories.aurora_service import AuroraService
+from repositories.storage_backend import create_storage_backend
 from utils.helpers import numpy_to_base64, EMPTY_STRING, ERROR_STRING
 from config import (
     VIDEO_FRAME_SAMPLE_RATE, 
@@ -16,7 +19,9 @@ from config import (
     CANDIDATE_SLICE, 
     STEP_BACK,
     AUDIO_CHUNK,
-    SCORE_METADATA_TABLE
+    SCORE_METADATA_TABLE,
+    STREAM_METADATA_TABLE,
+    SCORE_SKETCH_PERSIST_EVERY,
 )
 
 CAPTION_AND_SCORER_PROMPT = """
@@ -162,7 +167,7 @@ class ClipScorerService:
         self.scorer = SaliencyScorer()
         self.caption_service = CaptionService()
         self.is_db_service_initialized = False
-        self.db_service = AuroraService(pool_size=10)
+        self.db_service = create_storage_backend(pool_size=4, component="clip_scorer")
 
     async def intialize_db_service(self):
         if not self.is_db_service_initialized:
@@ -194,58 +199,92 @@ class ClipScorerService:
         end = start + CANDIDATE_SLICE
         return start, end
     
-    async def score_clips(self, stream_id, clip_scorer_event: asyncio.Event, audio_processor_event: asyncio.Event, video_processor_event: asyncio.Event):
+    async def _get_audio_metadata(self, stream_id, audio_chunk_indexes):
+        if len(audio_chunk_indexes) == 1:
+            return await self.db_service.get_audios_by_stream(
+                stream_id=stream_id,
+                start_chunk=audio_chunk_indexes[0],
+                limit=1
+            )
+        return await self.db_service.get_audios_by_stream(
+            stream_id=stream_id,
+            start_chunk=audio_chunk_indexes[0],
+            end_chunk=audio_chunk_indexes[1]
+        )
+
+    async def _persist_score_sketches(self, stream_id):
+        sketches = get_score_sketches(stream_id)
+        try:
+            await self.db_service.update_dict(
+                STREAM_METADATA_TABLE,
+                {"score_sketch": json.dumps(sketches.to_dict())},
+                where_clause="stream_id=%s",
+                where_params=(stream_id,)
+            )
+        except Exception as e:
+            logger.warning(f"[ClipScorerService] failed to persist score sketches: {e}")
+
+    async def _restore_scored_slices(self, stream_id, scored_until: float) -> int:
+        """
+        Resume after the slices a previous attempt scored: rebuild the stream's
+        score sketches from their rows and return the first slice to score.
+        """
+        if scored_until <= 0:
+            return 0
+        sketches = get_score_sketches(stream_id)
+        scored = 0
+        async for highlight_score, saliency_score in self.db_service.iter_scored_clips_by_stream(
+            stream_id, end_time=scored_until, columns=("highlight_score", "saliency_score"), row_type="tuple"
+        ):
+            sketches.update(highlight_score, saliency_score)
+            scored += 1
+        first_slice = int(scored_until // CANDIDATE_SLICE)
+        logger.info(f"[ClipScorerService] resuming at slice {first_slice}, {scored} slices already scored.")
+        return first_slice
+
+    async def score_clips(self, stream_id, clip_scorer_event: asyncio.Event):
         base_path = f"{BASE_DIR}/{stream_id}"
+        stream_state = get_stream_state(stream_id)
+        sketches = get_score_sketches(stream_id)
         should_break = False
-        i = 0
         await self.intialize_db_service()
+        i = await self._restore_scored_slices(stream_id, stream_state.durable_scored_until)
         while True:
             if should_break:
                 logger.info("[ClipScorerService] exiting saliency scorer service.")
+                await self._persist_score_sketches(stream_id)
                 clip_scorer_event.set()
                 break
             start_time, end_time = self._get_slice(i)
             candidate_clip = CandidateClip(base_path, start_time, end_time)
             audio_chunk_indexes = candidate_clip.get_audio_chunk_indexes(AUDIO_CHUNK)
 
+            # Wake up once frames and finished transcripts for this slice exist (or never will)
+            await stream_state.wait_for_time(end_time, audio_chunk_indexes)
+
             logger.info(f"[ClipScorerService] scoring for interval {start_time} - {end_time}.")
 
-            audio_metadata = []
-            if len(audio_chunk_indexes) == 1:
-                audio_metadata = await self.db_service.get_audios_by_stream(
-                    stream_id=stream_id,
-                    start_chunk=audio_chunk_indexes[0],
-                    limit=1
-                )
-            else:
-                audio_metadata = await self.db_service.get_audios_by_stream(
-                    stream_id=stream_id,
-                    start_chunk=audio_chunk_indexes[0],
-                    end_chunk=audio_chunk_indexes[1]
-                )
+            audio_metadata = await self._get_audio_metadata(stream_id, audio_chunk_indexes)
 
-            if not all([((meta["transcript"] != EMPTY_STRING) and (meta["transcript"] != ERROR_STRING)) for meta in audio_metadata]):
+            if any(meta["transcript"] == ERROR_STRING for meta in audio_metadata):
                 await self.transcribe_leftover_audio_chunks(stream_id, audio_metadata)
-                await asyncio.sleep(0.5)
-                continue
+                audio_metadata = await self._get_audio_metadata(stream_id, audio_chunk_indexes)
 
-            frame_metdata = await self.db_service.get_videos_by_stream(
-                stream_id=stream_id,
-                start_frame=start_time*VIDEO_FRAME_SAMPLE_RATE,
-                limit=CANDIDATE_SLICE*VIDEO_FRAME_SAMPLE_RATE
-            )
+            start_frame = start_time * VIDEO_FRAME_SAMPLE_RATE
+            frames_available = min(stream_state.frames_ingested - start_frame, CANDIDATE_SLICE * VIDEO_FRAME_SAMPLE_RATE)
 
-            if (len(frame_metdata) != CANDIDATE_SLICE * VIDEO_FRAME_SAMPLE_RATE) or (len(audio_metadata) != len(audio_chunk_indexes)):
-                if audio_processor_event.is_set() and video_processor_event.is_set():
-                    should_break = True
-                    if not audio_metadata or not frame_metdata:
-                        continue
-                else:
-                    await asyncio.sleep(0.2)
+            if (frames_available != CANDIDATE_SLICE * VIDEO_FRAME_SAMPLE_RATE) or (len(audio_metadata) != len(audio_chunk_indexes)):
+                # Producers are done, this is the (partial) tail of the stream
+                should_break = True
+                if not audio_metadata or frames_available <= 0:
                     continue
-            
+
+            transcribed = [
+                meta for meta in audio_metadata
+                if meta["transcript"] not in (EMPTY_STRING, ERROR_STRING)
+            ]
             score = self.get_slice_saliency_score(candidate_clip)
-            highlight_score, caption = await self.caption_service.generate_clip_caption(candidate_clip, audio_metadata)
+            highlight_score, caption = await self.caption_service.generate_clip_caption(candidate_clip, transcribed)
             metadata = {
                 "stream_id": stream_id,
                 "start_time": start_time,
@@ -254,6 +293,9 @@ class ClipScorerService:
                 "caption": caption,
                 "highlight_score": highlight_score
             }
-            await self.db_service.insert_dict(SCORE_METADATA_TABLE, metadata)
+            await self.db_service.upsert_dict(SCORE_METADATA_TABLE, metadata, unique_keys=["stream_id", "start_time"])
+            sketches.update(highlight_score, score)
+            if sketches.count % SCORE_SKETCH_PERSIST_EVERY == 0:
+                await self._persist_score_sketches(stream_id)
             i += 1
             
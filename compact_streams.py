@@ -0,0 +1,54 @@
+import argparse
+import asyncio
+
+from utils.logger import app_logger as logger
+from repositories.storage_backend import create_storage_backend
+from config import COMPACTION_BATCH_STREAMS
+
+
+async def compact_streams(stream_ids=None, batch: int = COMPACTION_BATCH_STREAMS, max_streams: int = None):
+    """
+    Collapse the per-frame video_metadata rows of COMPLETED streams into one
+    frame_manifest row each, so the frame table only holds live streams.
+
+    Args:
+        stream_ids: Streams to compact (default: every compactable stream)
+        batch: Streams fetched per pass
+        max_streams: Stop after this many streams (default: no limit)
+    """
+    db_service = create_storage_backend(pool_size=2, component="compaction")
+    await db_service.initialize()
+    done, skipped, rows = 0, set(), 0
+    try:
+        while max_streams is None or done + len(skipped) < max_streams:
+            if stream_ids is not None:
+                pending, stream_ids = list(stream_ids), []
+            else:
+                # Skipped streams keep their rows and come back in every pass
+                candidates = await db_service.get_compactable_streams(limit=batch + len(skipped))
+                pending = [s for s in candidates if s not in skipped]
+            if not pending:
+                break
+            for stream_id in pending:
+                if max_streams is not None and done + len(skipped) >= max_streams:
+                    break
+                result = await db_service.compact_stream_frames(stream_id)
+                if result is None:
+                    skipped.add(stream_id)
+                    continue
+                done += 1
+                rows += result["compacted"]
+                logger.info(f"[Compaction] {stream_id}: {result['compacted']} frame rows -> manifest of {result['frames']} frames")
+    finally:
+        await db_service.close()
+    logger.info(f"[Compaction] compacted {done} stream(s), {rows} frame rows; skipped {len(skipped)}")
+    return {"streams": done, "rows": rows, "skipped": sorted(skipped)}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compact frame rows of completed streams into manifests")
+    parser.add_argument("stream_ids", nargs="*", help="streams to compact (default: all completed streams)")
+    parser.add_argument("--batch", type=int, default=COMPACTION_BATCH_STREAMS)
+    parser.add_argument("--max-streams", type=int, default=None)
+    args = parser.parse_args()
+    asyncio.run(compact_streams(args.stream_ids or None, batch=args.batch, max_streams=args.max_streams))
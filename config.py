@@ -5,8 +5,22 @@ LANGUAGE_CODE="en-US"
 S3_BUCKET_NAME = "highlight-clipping-service-main-975049899047"
 S3_REGION = "us-east-1"
 IMAGE_BUCKET_PREFIX = "images/frame/"
+SEGMENT_BUCKET_PREFIX = "images/segments/"
 AUDIO_BUCKET_PREFIX = "audio/streams/"
 
+# Background S3 uploads (repositories/s3_service.py): concurrent PUTs (also the size of the
+# client's connection pool), bytes queued or in flight before producers wait, attempts per object
+S3_UPLOAD_CONCURRENCY = int(os.environ.get("S3_UPLOAD_CONCURRENCY", 16))
+S3_UPLOAD_MAX_INFLIGHT_BYTES = int(os.environ.get("S3_UPLOAD_MAX_INFLIGHT_BYTES", 64 * 1024 * 1024))
+S3_UPLOAD_RETRIES = 4
+S3_UPLOAD_BACKOFF_SECONDS = 0.5
+
+# Sampled frames in S3: "packed" uploads one segment object per FRAME_SEGMENT_SECONDS of
+# frames (read back with byte ranges) and per-frame objects for highlight thumbnails only;
+# "frames" uploads every frame as its own object
+FRAME_STORAGE_MODE = os.environ.get("FRAME_STORAGE_MODE", "packed")
+FRAME_SEGMENT_SECONDS = int(os.environ.get("FRAME_SEGMENT_SECONDS", 20))
+
 # Optional: CloudFront domain to serve S3 objects
 CDN_DOMAIN = os.environ.get("CDN_DOMAIN")
 
@@ -16,10 +30,32 @@ VIDEO_METADATA_TABLE_NAME = "video_metadata"
 AUDIO_METADATA_TABLE_NAME = "audio_metadata"
 SCORE_METADATA_TABLE = "score_metadata"
 STREAM_METADATA_TABLE = "stream_metadata"
+HIGHLIGHTS_TABLE = "highlights"
+FRAME_MANIFEST_TABLE = "frame_manifest"
 
 DB_HOST = os.environ.get("DB_URL", "highlight-clipping-service-main-auroracluster-o27b01gfhdja.cluster-ckdseak4qyg6.us-east-1.rds.amazonaws.com")
 DB_PORT = 3306
 DB_SECRET_NAME = os.environ.get("SECRET_NAME", "rds!cluster-00500b97-b996-4bb1-9e88-00aef1715034")
+# One aiomysql pool per process; components get quotas within it
+DB_POOL_MAX_SIZE = int(os.environ.get("DB_POOL_MAX_SIZE", 20))
+# Repository backend: "aurora" (MySQL) or "sqlite" (embedded, single-box runs)
+STORAGE_BACKEND = os.environ.get("STORAGE_BACKEND", "aurora")
+SQLITE_DB_PATH = os.environ.get("SQLITE_DB_PATH", "./data/snipsnap.db")
+# Write-behind buffers behind the *_nowait repository writes (repositories/write_behind.py)
+# Queued writes per table before producers wait, rows per multi-row statement, max delay (s)
+WRITE_BEHIND_MAX_ROWS = 5000
+WRITE_BEHIND_BATCH_ROWS = 200
+WRITE_BEHIND_FLUSH_INTERVAL = 0.5
+# Attempts per flushed statement, first backoff (s) between them
+WRITE_BEHIND_RETRIES = 4
+WRITE_BEHIND_BACKOFF_SECONDS = 0.5
+# Rows fetched per round trip by the streaming (server-side cursor) reads
+STREAM_FETCH_BATCH = 500
+# Read-your-writes cache of the Batch job's hot reads (repositories/aurora_service.py)
+QUERY_CACHE_MAX_STREAMS = 4
+QUERY_CACHE_MAX_ROWS = 20000
+# Streams per pass of the frame compaction job (compact_streams.py)
+COMPACTION_BATCH_STREAMS = 20
 
 # AUDIO CONFIGURATION
 TARGET_SAMPLE_RATE = 16000
@@ -27,6 +63,19 @@ AUDIO_CHUNK = 5
 
 # VIDEO CONFIGURATION
 VIDEO_FRAME_SAMPLE_RATE = 2
+# VideoProcessor saves the frame manifest and its frame_manifest row every N frames
+FRAME_MANIFEST_CHECKPOINT_FRAMES = 120
+
+# Byte budget for the per-stream LRU of decoded frames (see utils/frame_store.py)
+FRAME_CACHE_MAX_BYTES = 512 * 1024 * 1024
+
+# Compressed-domain shot hints (see detectors/shot_hints.py)
+# An inter frame larger than SHOT_HINT_SIZE_RATIO x the median of the previous
+# SHOT_HINT_WINDOW packets is a cut candidate
+SHOT_HINT_SIZE_RATIO = 2.5
+SHOT_HINT_WINDOW = 30
+# Only keep hints confirmed by the histogram detector (False: keep all hints too)
+SHOT_HINTS_REQUIRE_CONFIRMATION = True
 
 # SALIENCY CONFIGURATION
 SALIENCY_THRESHOLD = 0.7
@@ -41,6 +90,15 @@ BASE_DIR = "./data"
 
 HIGHLIGHT_CHUNK = 300
 
+# Highlight score thresholds: "global" uses stream-wide quantile sketches
+# (utils/quantile_sketch.py), "window" the percentiles of the current HIGHLIGHT_CHUNK
+HIGHLIGHT_THRESHOLD_MODE = os.environ.get("HIGHLIGHT_THRESHOLD_MODE", "global")
+HIGHLIGHT_THRESHOLD_PERCENTILE = 70
+# Accuracy/size parameter of the KLL sketches (rank error ~ 1/k)
+QUANTILE_SKETCH_K = 200
+# Persist the stream's score sketches every N scored clips
+SCORE_SKETCH_PERSIST_EVERY = 12
+
 # --- Agentic Boundary / Duration (defaults) ---
 # Enforce clip duration sanity after refinement (seconds)
 HIGHLIGHT_MIN_LEN = 4.0
@@ -52,6 +110,17 @@ TEXT_TILING_STEP = 10
 TEXT_TILING_SMOOTH = 2
 TEXT_TILING_CUTOFF_STD = 0.5
 
+# Audio boundaries (speech pauses / energy changes over the stream PCM)
+AUDIO_BOUNDARY_FRAME_SEC = 0.02
+AUDIO_BOUNDARY_MIN_PAUSE_SEC = 0.3
+# Frames this many dB below the recent median level count as silence
+AUDIO_BOUNDARY_SILENCE_DB = 15.0
+# Mean level jump between adjacent 1s windows that marks an energy change
+AUDIO_BOUNDARY_ENERGY_CHANGE_DB = 9.0
+# Max shift when snapping an edge to an audio boundary (seconds); an audio boundary this
+# close to the scene/topic boundary an edge snapped to also wins over it
+MAX_AUDIO_SNAP_SECONDS = 1.5
+
 # Hard cap on how much an edge can move compared to the original (per side)
 # Positive = extend, Negative = shorten. Applied independently to start and end.
 MAX_EDGE_SHIFT_SECONDS = 60.0
@@ -60,6 +129,24 @@ MAX_EDGE_SHIFT_SECONDS = 60.0
 # When False: after grouping, we skip boundary snapping, topic/scene detection,
 # and LLM refinement, and return grouped highlights as-is.
 AGENTIC_REFINEMENT_ENABLED = True
+
+# Deterministic fast path around EdgeRefiner (see evaluators/edge_confidence.py)
+# Skip the LLM when the rule-based snap confidence reaches this value (>1 disables skipping);
+# above 0.7 only edges where at least two boundary sources agree qualify
+EDGE_REFINER_SKIP_CONFIDENCE = 0.8
+# Boundaries within this many seconds of an edge count as agreeing with it
+EDGE_AGREEMENT_TOLERANCE = 0.5
+# Silence between words (seconds) that makes an edge a clean cut
+EDGE_MIN_WORD_GAP = 0.25
+# Duration slack (seconds) against HIGHLIGHT_MIN_LEN/MAX_LEN for full confidence
+EDGE_DURATION_SLACK = 2.0
+
+# Max concurrent Bedrock requests per process (titling, edge refinement, captions)
+LLM_MAX_CONCURRENCY = 8
 MAX_STREAM_DURATION = 300
 
+# Resume a retried job from the stream's durable watermarks (skips finished ingest
+# writes, ASR and scoring); a job message may override it with "resume"
+RESUME_ENABLED = os.environ.get("RESUME_ENABLED", "true").lower() == "true"
+
 MEDIACONVERT_ROLE_ARN = os.environ.get("MEDIACONVERT_ROLE_ARN")
@@ -0,0 +1,213 @@
+from __future__ import annotations
+
+import os
+import json
+import bisect
+import threading
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from config import (
+    AUDIO_BOUNDARY_FRAME_SEC,
+    AUDIO_BOUNDARY_MIN_PAUSE_SEC,
+    AUDIO_BOUNDARY_SILENCE_DB,
+    AUDIO_BOUNDARY_ENERGY_CHANGE_DB,
+)
+from utils.logger import app_logger as logger
+from utils.pcm_store import STREAM_PCM_FILENAME, STREAM_PCM_FORMAT_FILENAME
+
+
+class OnlineAudioBoundaryDetector:
+    """
+    Streaming pause and energy-change detector over s16 PCM.
+
+    Samples are reduced to the RMS level (dBFS) of short frames as they
+    arrive. A frame is silent when it is AUDIO_BOUNDARY_SILENCE_DB below the
+    median level of the last few seconds; a silent run of at least
+    min_pause_sec yields a boundary at its middle. A jump of the mean level
+    between the preceding and following second yields an energy-change
+    boundary. Times are relative to the first pushed sample, like the stream
+    PCM file.
+    """
+
+    def __init__(
+        self,
+        frame_sec: float = AUDIO_BOUNDARY_FRAME_SEC,
+        min_pause_sec: float = AUDIO_BOUNDARY_MIN_PAUSE_SEC,
+        silence_db: float = AUDIO_BOUNDARY_SILENCE_DB,
+        energy_change_db: float = AUDIO_BOUNDARY_ENERGY_CHANGE_DB,
+        energy_window_sec: float = 1.0,
+        reference_sec: float = 3.0,
+        min_gap_sec: float = 1.0,
+    ):
+        self.frame_sec = frame_sec
+        self.min_pause_frames = max(1, int(round(min_pause_sec / frame_sec)))
+        self.silence_db = silence_db
+        self.energy_change_db = energy_change_db
+        self.energy_window = max(1, int(round(energy_window_sec / frame_sec)))
+        self.reference_frames = max(1, int(round(reference_sec / frame_sec)))
+        self.min_gap_sec = min_gap_sec
+
+        self._lock = threading.Lock()
+        self._remainder: Optional[np.ndarray] = None
+        self._levels: List[float] = []
+        self._silent_run_start: Optional[int] = None
+        self._next_energy_pos = self.energy_window
+        self._pending_change: Optional[tuple] = None  # (time, |delta|)
+
+        self._pauses: List[float] = []
+        self._changes: List[float] = []
+
+    @property
+    def seconds_seen(self) -> float:
+        return len(self._levels) * self.frame_sec
+
+    def push(self, samples: np.ndarray, sample_rate: int, channels: int):
+        """Feed interleaved int16 samples (any shape) in stream order."""
+        frame_len = max(1, int(round(self.frame_sec * sample_rate))) * channels
+        data = np.asarray(samples).reshape(-1)
+        with self._lock:
+            if self._remainder is not None and len(self._remainder):
+                data = np.concatenate([self._remainder, data])
+            n = len(data) // frame_len
+            self._remainder = data[n * frame_len:].copy()
+            if n == 0:
+                return
+            frames = data[: n * frame_len].astype(np.float32).reshape(n, frame_len) / 32768.0
+            rms = np.sqrt(np.mean(frames * frames, axis=1))
+            levels = 20.0 * np.log10(rms + 1e-6)
+            self._process(levels)
+
+    def _process(self, levels: np.ndarray):
+        start = len(self._levels)
+        history = np.asarray(self._levels[-self.reference_frames:], dtype=np.float32)
+        # One reference level per push: pushes are a few tens of ms of audio
+        reference = float(np.median(np.concatenate([history, levels])))
+        silent = levels < reference - self.silence_db
+        self._levels.extend(levels.tolist())
+
+        for k, is_silent in enumerate(silent):
+            pos = start + k
+            if is_silent:
+                if self._silent_run_start is None:
+                    self._silent_run_start = pos
+            elif self._silent_run_start is not None:
+                if pos - self._silent_run_start >= self.min_pause_frames:
+                    self._add(self._pauses, (self._silent_run_start + pos) / 2.0 * self.frame_sec)
+                self._silent_run_start = None
+
+        self._scan_energy_changes()
+
+    def _scan_energy_changes(self):
+        w = self.energy_window
+        end = len(self._levels) - w
+        if self._next_energy_pos > end:
+            return
+        lo = self._next_energy_pos - w
+        seg = np.asarray(self._levels[lo:end + w], dtype=np.float64)
+        csum = np.concatenate([[0.0], np.cumsum(seg)])
+        positions = np.arange(self._next_energy_pos, end + 1)
+        rel = positions - lo
+        before = (csum[rel] - csum[rel - w]) / w
+        after = (csum[rel + w] - csum[rel]) / w
+        delta = np.abs(after - before)
+        for pos in positions[delta >= self.energy_change_db]:
+            t = pos * self.frame_sec
+            d = float(delta[pos - self._next_energy_pos])
+            # keep the strongest change among positions closer than min_gap
+            if self._pending_change is not None and t - self._pending_change[0] < self.min_gap_sec:
+                if d > self._pending_change[1]:
+                    self._pending_change = (t, d)
+                continue
+            if self._pending_change is not None:
+                self._add(self._changes, self._pending_change[0])
+            self._pending_change = (t, d)
+        self._next_energy_pos = end + 1
+
+    def _add(self, target: List[float], t: float):
+        bisect.insort(target, round(float(t), 3))
+
+    def finalize(self):
+        """Flush state that waits for more audio (open pause, pending change)."""
+        with self._lock:
+            if self._silent_run_start is not None:
+                end = len(self._levels)
+                if end - self._silent_run_start >= self.min_pause_frames:
+                    # Midpoint of the trailing pause, like pauses closed by sound
+                    self._add(self._pauses, (self._silent_run_start + end) / 2.0 * self.frame_sec)
+                self._silent_run_start = None
+            if self._pending_change is not None:
+                self._add(self._changes, self._pending_change[0])
+                self._pending_change = None
+
+    def pauses(self) -> List[float]:
+        with self._lock:
+            return list(self._pauses)
+
+    def boundaries(self) -> List[float]:
+        """
+        Pause midpoints plus energy-change points, sorted. Energy changes
+        closer than min_gap_sec to a pause are dropped in favour of the pause.
+        """
+        with self._lock:
+            pauses = list(self._pauses)
+            changes = list(self._changes)
+            if self._pending_change is not None:
+                changes.append(round(float(self._pending_change[0]), 3))
+        out = list(pauses)
+        for t in changes:
+            i = bisect.bisect_left(pauses, t)
+            near = any(
+                abs(pauses[j] - t) < self.min_gap_sec
+                for j in (i - 1, i) if 0 <= j < len(pauses)
+            )
+            if not near:
+                out.append(t)
+        return sorted(out)
+
+
+def detect_audio_boundaries(audio_dir: str, block_sec: float = 1.0) -> List[float]:
+    """
+    Run the detector over a stream PCM file written by AudioChunker.
+
+    Args:
+        audio_dir: Folder containing stream.pcm and its format sidecar.
+        block_sec: Seconds of audio mapped per step.
+
+    Returns:
+        Sorted list of boundary timestamps (seconds).
+    """
+    path = os.path.join(audio_dir, STREAM_PCM_FILENAME)
+    format_path = os.path.join(audio_dir, STREAM_PCM_FORMAT_FILENAME)
+    if not os.path.exists(path) or not os.path.exists(format_path):
+        return []
+    with open(format_path) as f:
+        fmt = json.load(f)
+    sample_rate, channels = int(fmt["sample_rate"]), int(fmt["channels"])
+    n = os.path.getsize(path) // np.dtype(np.int16).itemsize
+    if n == 0:
+        return []
+
+    mm = np.memmap(path, dtype=np.int16, mode="r", shape=(n,))
+    detector = OnlineAudioBoundaryDetector()
+    step = int(block_sec * sample_rate) * channels
+    for i in range(0, n, step):
+        detector.push(mm[i:i + step], sample_rate, channels)
+    detector.finalize()
+    logger.info(f"[AudioBoundaryDetector] {len(detector.boundaries())} boundaries in {detector.seconds_seen:.1f}s of audio")
+    return detector.boundaries()
+
+
+_detectors: Dict[str, OnlineAudioBoundaryDetector] = {}
+_detectors_lock = threading.Lock()
+
+
+def get_audio_boundary_detector(stream_id: str) -> OnlineAudioBoundaryDetector:
+    """Return the process-wide audio boundary detector of a stream."""
+    with _detectors_lock:
+        detector = _detectors.get(stream_id)
+        if detector is None:
+            detector = OnlineAudioBoundaryDetector()
+            _detectors[stream_id] = detector
+        return detector
@@ -3,11 +3,14 @@ from __future__ import annotations
 import os
 import re
 import math
-from typing import List, Optional, Tuple
+import bisect
+from typing import Dict, List, Optional, Tuple
 
 import cv2
 
+from config import VIDEO_FRAME_SAMPLE_RATE
 from utils.logger import app_logger as logger
+from utils.frame_store import FrameStore, get_frame_store
 
 
 _FNAME_RE = re.compile(r"frame_(\d+)\.jpg$")
@@ -43,6 +46,7 @@ def detect_scene_boundaries(
     threshold: float = 0.5,
     min_scene_len_sec: float = 1.0,
     downscale: Optional[Tuple[int, int]] = (160, 90),
+    frame_store: Optional[FrameStore] = None,
 ) -> List[float]:
     """
     Detect scene/shot boundaries using saved frames instead of opening the video.
@@ -53,6 +57,7 @@ def detect_scene_boundaries(
         threshold: Bhattacharyya distance threshold to declare a cut (> threshold → cut).
         min_scene_len_sec: Minimum time between cuts to avoid over-segmentation.
         downscale: Optional (width, height) to downscale frames for faster histograms.
+        frame_store: Decoded-frame store to read through (defaults to the store of frames_dir).
 
     Returns:
         Sorted list of boundary timestamps (seconds), deduplicated.
@@ -62,9 +67,10 @@ def detect_scene_boundaries(
         return []
 
     min_gap_frames = max(1, int(math.ceil(min_scene_len_sec * fps)))
+    store = frame_store or get_frame_store(frames_dir)
 
     prev_idx, prev_path = pairs[0]
-    prev_img = cv2.imread(prev_path)
+    prev_img = store.get(prev_idx, populate=False)
     if prev_img is None:
         logger.warning("[SceneDetector] unable to read first frame: %s", prev_path)
         return []
@@ -73,8 +79,8 @@ def detect_scene_boundaries(
     boundaries: List[float] = []
     last_cut_idx = prev_idx
 
-    for idx, path in pairs[1:]:
-        img = cv2.imread(path)
+    for idx, _ in pairs[1:]:
+        img = store.get(idx, populate=False)
         if img is None:
             continue
         hist = _hist_hs(img, downscale=downscale)
@@ -92,3 +98,69 @@ def detect_scene_boundaries(
 
     return boundaries
 
+
+
+class OnlineSceneDetector:
+    """
+    Scene cut detection over frames as VideoProcessor samples them.
+
+    Applies the same histogram test as detect_scene_boundaries, one frame at
+    a time while the decoded pixels are still in memory, and keeps a growing
+    sorted cut list that can be queried at any point of the stream.
+    """
+
+    def __init__(
+        self,
+        fps: float,
+        threshold: float = 0.5,
+        min_scene_len_sec: float = 1.0,
+        downscale: Optional[Tuple[int, int]] = (160, 90),
+    ):
+        self.fps = fps
+        self.threshold = threshold
+        self.downscale = downscale
+        self.min_gap_frames = max(1, int(math.ceil(min_scene_len_sec * fps)))
+        self.frames_seen = 0
+        self._prev_hist = None
+        self._last_cut_idx: Optional[int] = None
+        self._boundaries: List[float] = []
+
+    def push(self, frame_index: int, img_bgr) -> Optional[float]:
+        """Consume the next sampled frame; returns the cut time if it starts a new scene."""
+        hist = _hist_hs(img_bgr, downscale=self.downscale)
+        self.frames_seen += 1
+        if self._prev_hist is None:
+            self._prev_hist = hist
+            self._last_cut_idx = frame_index
+            return None
+
+        # Bhattacharyya distance: 0 = identical, higher = more different
+        dist = cv2.compareHist(self._prev_hist.astype('float32'), hist.astype('float32'), cv2.HISTCMP_BHATTACHARYYA)
+        self._prev_hist = hist
+
+        if dist > self.threshold and (frame_index - self._last_cut_idx) >= self.min_gap_frames:
+            t = round(frame_index / float(self.fps), 3)
+            self._boundaries.append(t)
+            self._last_cut_idx = frame_index
+            return t
+        return None
+
+    def boundaries(self) -> List[float]:
+        return list(self._boundaries)
+
+    def boundaries_between(self, start: float, end: float) -> List[float]:
+        lo = bisect.bisect_left(self._boundaries, start)
+        hi = bisect.bisect_right(self._boundaries, end)
+        return self._boundaries[lo:hi]
+
+
+_online_detectors: Dict[str, OnlineSceneDetector] = {}
+
+
+def get_scene_detector(stream_id: str, fps: Optional[float] = None) -> OnlineSceneDetector:
+    """Return the process-wide online scene detector of a stream."""
+    detector = _online_detectors.get(stream_id)
+    if detector is None:
+        detector = OnlineSceneDetector(fps=fps or VIDEO_FRAME_SAMPLE_RATE)
+        _online_detectors[stream_id] = detector
+    return detector
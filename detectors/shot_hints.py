@@ -0,0 +1,205 @@
+"""
+Shot-change hints from compressed-domain statistics.
+
+The demux thread records, for every video packet, its presentation time,
+size and keyframe flag, and the picture type of every decoded frame. Encoders
+place extra keyframes/I-frames at shot changes and the first inter frames
+after a cut are unusually large, so both are cheap cut candidates that cover
+all frames instead of the 2 fps sample used by the histogram detector.
+"""
+
+from __future__ import annotations
+
+import bisect
+import threading
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+from config import SHOT_HINT_SIZE_RATIO, SHOT_HINT_WINDOW, VIDEO_FRAME_SAMPLE_RATE
+
+
+class ShotHints:
+    """
+    Per-stream packet statistics plus the candidate cut times derived from them.
+
+    record_* methods are called from the demux thread; candidates() is called
+    from the event loop and only analyzes packets recorded since its last call.
+    """
+
+    def __init__(
+        self,
+        size_ratio: float = SHOT_HINT_SIZE_RATIO,
+        window: int = SHOT_HINT_WINDOW,
+        min_gap_sec: float = 1.0,
+        gop_tolerance: float = 0.1,
+    ):
+        self.size_ratio = size_ratio
+        self.window = window
+        self.min_gap_sec = min_gap_sec
+        self.gop_tolerance = gop_tolerance
+
+        self._lock = threading.Lock()
+        # Presentation time of the stream's start: hints are reported relative to it,
+        # the clock of the sampled frames' timestamps minus the same start
+        self.start_time: Optional[float] = None
+        self._times: List[float] = []
+        self._sizes: List[int] = []
+        self._keyframes: List[bool] = []
+        self._intra_times: List[float] = []
+
+        self._processed = 0
+        self._intra_processed = 0
+        self._key_times: List[float] = []
+        self._gop_intervals: List[float] = []
+        self._candidates: List[float] = []
+
+    # ---------- demux thread ----------
+    def record_packet(self, packet):
+        if packet.pts is None or not packet.size:
+            return
+        t = float(packet.pts * packet.time_base)
+        with self._lock:
+            if self.start_time is None:
+                stream_start = getattr(packet.stream, "start_time", None)
+                self.start_time = float(stream_start * packet.time_base) if stream_start is not None else t
+            elif t < self.start_time:
+                self.start_time = t
+            self._times.append(t)
+            self._sizes.append(int(packet.size))
+            self._keyframes.append(bool(packet.is_keyframe))
+
+    def record_frame(self, frame):
+        pict_type = getattr(frame.pict_type, "name", str(frame.pict_type))
+        if pict_type != "I" or frame.pts is None:
+            return
+        with self._lock:
+            self._intra_times.append(float(frame.pts * frame.time_base))
+
+    # ---------- analysis ----------
+    def _add_candidate(self, t: float):
+        i = bisect.bisect_left(self._candidates, t)
+        if i > 0 and t - self._candidates[i - 1] < self.min_gap_sec:
+            return
+        if i < len(self._candidates) and self._candidates[i] - t < self.min_gap_sec:
+            return
+        self._candidates.insert(i, round(t, 3))
+
+    def _off_cadence(self, t: float) -> bool:
+        """True for a keyframe that does not follow the regular GOP interval."""
+        if not self._key_times:
+            self._key_times.append(t)
+            return False
+        interval = t - self._key_times[-1]
+        self._key_times.append(t)
+        if interval <= 0:
+            return False
+        gop = float(np.median(self._gop_intervals)) if self._gop_intervals else None
+        self._gop_intervals.append(interval)
+        if len(self._gop_intervals) > 64:
+            self._gop_intervals.pop(0)
+        if len(self._key_times) > 256:
+            del self._key_times[:-256]
+        return gop is not None and interval < (1.0 - self.gop_tolerance) * gop
+
+    def candidates(self) -> List[float]:
+        """Sorted candidate cut times (seconds from the stream start) from all packets recorded so far."""
+        with self._lock:
+            start = self._processed
+            lookback = max(0, start - self.window)
+            times = self._times[lookback:]
+            sizes = np.asarray(self._sizes[lookback:], dtype=np.float64)
+            keyframes = self._keyframes[lookback:]
+            intra = self._intra_times[self._intra_processed:]
+            stream_start = self.start_time or 0.0
+            # Only the last window of packets is looked back on: drop the rest
+            self._processed = len(self._times)
+            keep_from = max(0, self._processed - self.window)
+            del self._times[:keep_from], self._sizes[:keep_from], self._keyframes[:keep_from]
+            self._processed -= keep_from
+            del self._intra_times[:]
+            self._intra_processed = 0
+
+        offset = start - lookback
+        for k in range(offset, len(times)):
+            if keyframes[k] and self._off_cadence(times[k]):
+                self._add_candidate(times[k])
+
+        # Size spikes of inter frames against the rolling median of the previous window
+        if len(sizes) > self.window:
+            inter = np.array([not kf for kf in keyframes])
+            ref = np.lib.stride_tricks.sliding_window_view(sizes, self.window)[:-1]
+            med = np.median(ref, axis=1)
+            spikes = (sizes[self.window:] > self.size_ratio * med) & inter[self.window:]
+            for k in np.nonzero(spikes)[0] + self.window:
+                if k >= offset:
+                    self._add_candidate(times[k])
+
+        # Non-keyframe I pictures are placed by the encoder's scene-cut decision
+        for t in intra:
+            i = bisect.bisect_left(self._key_times, t)
+            near_key = any(
+                abs(self._key_times[j] - t) < 1e-3
+                for j in (i - 1, i) if 0 <= j < len(self._key_times)
+            )
+            if not near_key:
+                self._add_candidate(t)
+
+        return [round(t - stream_start, 3) for t in self._candidates]
+
+
+def confirm_scene_hints(
+    hints: List[float],
+    histogram_cuts: List[float],
+    fps: float = VIDEO_FRAME_SAMPLE_RATE,
+    require_confirmation: bool = True,
+    frame_time: Optional[Callable[[int], Optional[float]]] = None,
+) -> List[float]:
+    """
+    Combine compressed-domain hints with histogram cuts.
+
+    A histogram cut at a sampled frame means the shot changed within the
+    preceding sample interval; a hint inside that interval confirms it and
+    replaces it with the hint's frame-accurate time. Unconfirmed hints are
+    dropped unless require_confirmation is False.
+
+    Cuts are at frame_index / fps; frame_time(frame_index) gives the sampled
+    frame's recorded time on the hints' clock (seconds from the stream start),
+    which the interval and unconfirmed cuts use when known, since sampling
+    drifts from index / fps.
+    """
+    period = 1.0 / float(fps)
+    used = set()
+    result: List[float] = []
+    for cut in histogram_cuts:
+        lo_t, hi_t = cut - period, cut
+        if frame_time is not None:
+            idx = int(round(cut * fps))
+            t, prev_t = frame_time(idx), frame_time(idx - 1)
+            if t is not None:
+                hi_t = t
+                lo_t = prev_t if prev_t is not None else t - period
+        lo = bisect.bisect_left(hints, lo_t - 1e-3)
+        hi = bisect.bisect_right(hints, hi_t + 1e-3)
+        if hi > lo:
+            # latest hint before the sampled frame is closest to the real change
+            result.append(hints[hi - 1])
+            used.update(range(lo, hi))
+        else:
+            result.append(round(hi_t, 3))
+    if not require_confirmation:
+        result.extend(h for i, h in enumerate(hints) if i not in used)
+    return sorted(set(result))
+
+
+_shot_hints: Dict[str, ShotHints] = {}
+_shot_hints_lock = threading.Lock()
+
+
+def get_shot_hints(stream_id: str) -> ShotHints:
+    with _shot_hints_lock:
+        hints = _shot_hints.get(stream_id)
+        if hints is None:
+            hints = ShotHints()
+            _shot_hints[stream_id] = hints
+        return hints
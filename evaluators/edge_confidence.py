@@ -0,0 +1,161 @@
+import bisect
+
+from typing import Dict, List, Optional, Tuple
+from utils.boundary_snapper import BoundaryIndex, Boundaries
+from config import (
+    EDGE_AGREEMENT_TOLERANCE,
+    EDGE_MIN_WORD_GAP,
+    EDGE_DURATION_SLACK,
+)
+
+
+class WordSpans:
+    """Start/end times of transcribed words of a stream, appended in time order."""
+
+    def __init__(self):
+        self.starts: List[float] = []
+        self.ends: List[float] = []
+
+    def add_words(self, words: List[Dict]):
+        for w in words:
+            st = w.get("start_time")
+            if st is None:
+                continue
+            st = float(st)
+            en = w.get("end_time")
+            self.starts.append(st)
+            self.ends.append(float(en) if en is not None else st)
+
+    def gap_at(self, t: float) -> Tuple[bool, Optional[float]]:
+        """
+        (inside_word, gap): whether t falls inside a spoken word, and the silent
+        gap between the word before t and the word after t (None without words
+        on both sides).
+        """
+        i = bisect.bisect_right(self.starts, t)
+        if i > 0 and self.ends[i - 1] > t:
+            return True, 0.0
+        if i == 0 or i >= len(self.starts):
+            return False, None
+        return False, self.starts[i] - self.ends[i - 1]
+
+
+def _edge_confidence(
+    t: float,
+    sources: Dict[str, BoundaryIndex],
+    words: Optional[WordSpans],
+) -> Tuple[float, Dict]:
+    # Boundary agreement and distance to the nearest boundary of any source
+    agree = 0
+    nearest = None
+    for index in sources.values():
+        b = index.nearest(t)
+        if b is None:
+            continue
+        d = abs(b - t)
+        nearest = d if nearest is None else min(nearest, d)
+        if d <= EDGE_AGREEMENT_TOLERANCE:
+            agree += 1
+    dist_score = 0.0 if nearest is None else max(0.0, 1.0 - nearest / EDGE_AGREEMENT_TOLERANCE)
+
+    # Word gap: cutting inside a word is never unambiguous
+    inside, gap = words.gap_at(t) if words is not None else (False, None)
+    if inside:
+        gap_score = 0.0
+    elif gap is None:
+        gap_score = 1.0  # no speech around the edge
+    else:
+        gap_score = min(1.0, gap / EDGE_MIN_WORD_GAP)
+
+    # Agreement of two or more sources is what makes an edge unambiguous: one source
+    # alone tops out at 0.7, below EDGE_REFINER_SKIP_CONFIDENCE
+    agree_score = 1.0 if agree >= 2 else 0.25 * agree
+    score = 0.0 if inside else 0.4 * agree_score + 0.3 * dist_score + 0.3 * gap_score
+    return score, {"agree": agree, "dist": None if nearest is None else round(nearest, 3), "gap": None if gap is None else round(gap, 3), "inside_word": inside}
+
+
+def score_snap_confidence(
+    start: float,
+    end: float,
+    scene_boundaries: Boundaries,
+    topic_boundaries: Boundaries,
+    audio_boundaries: Boundaries,
+    words: Optional[WordSpans],
+    min_len: float,
+    max_len: float,
+) -> Tuple[float, Dict]:
+    """
+    Rule-based confidence (0..1) that a snapped window needs no LLM refinement.
+
+    Each edge scores boundary agreement across scene/topic/audio sources,
+    distance to the nearest boundary and the silent word gap it sits in; the
+    window takes the weaker edge, scaled down when the duration has little
+    slack against [min_len, max_len].
+
+    Returns:
+        (confidence, details) where details holds the per-edge components.
+    """
+    sources = {
+        "scene": BoundaryIndex.coerce(scene_boundaries),
+        "topic": BoundaryIndex.coerce(topic_boundaries),
+        "audio": BoundaryIndex.coerce(audio_boundaries),
+    }
+    s_score, s_info = _edge_confidence(start, sources, words)
+    e_score, e_info = _edge_confidence(end, sources, words)
+
+    dur = end - start
+    slack = min(dur - min_len, max_len - dur)
+    slack_score = 0.0 if slack < 0 else min(1.0, slack / EDGE_DURATION_SLACK)
+
+    confidence = min(s_score, e_score) * (0.5 + 0.5 * slack_score)
+    return round(confidence, 3), {"start": s_info, "end": e_info, "slack": round(slack, 3)}
+
+
+class RefinementStats:
+    """Per-stream counters of LLM edge refinement vs deterministic skips."""
+
+    def __init__(self):
+        self.refined = 0
+        self.skipped = 0
+        self.refine_seconds = 0.0
+
+    def record_refined(self, seconds: float):
+        self.refined += 1
+        self.refine_seconds += seconds
+
+    def record_skipped(self):
+        self.skipped += 1
+
+    @property
+    def skip_rate(self) -> float:
+        total = self.refined + self.skipped
+        return self.skipped / total if total else 0.0
+
+    @property
+    def avg_refine_seconds(self) -> float:
+        return self.refine_seconds / self.refined if self.refined else 0.0
+
+    @property
+    def saved_seconds(self) -> float:
+        """Estimated refinement latency saved by skips, at the observed mean LLM latency."""
+        return self.skipped * self.avg_refine_seconds
+
+    def summary(self) -> Dict:
+        return {
+            "refined": self.refined,
+            "skipped": self.skipped,
+            "skip_rate": round(self.skip_rate, 3),
+            "avg_refine_seconds": round(self.avg_refine_seconds, 3),
+            "saved_seconds": round(self.saved_seconds, 3),
+        }
+
+
+_stats: Dict[str, RefinementStats] = {}
+
+
+def get_refinement_stats(stream_id: str) -> RefinementStats:
+    stats = _stats.get(stream_id)
+    if stats is None:
+        stats = RefinementStats()
+        _stats[stream_id] = stats
+    return stats
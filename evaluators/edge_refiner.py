@@ -7,8 +7,10 @@ import cv2
 
 from llm.claude import Claude
 from utils.logger import app_logger as logger
+from utils.frame_store import get_frame_store
+from utils.boundary_snapper import BoundaryIndex, Boundaries
 from utils.helpers import numpy_to_base64, EMPTY_STRING, ERROR_STRING
-from repositories.aurora_service import AuroraService
+from repositories.storage_backend import create_storage_backend
 from candidate_clip import CandidateClip
 from config import AUDIO_CHUNK, VIDEO_FRAME_SAMPLE_RATE
 
@@ -18,13 +20,14 @@ You are an expert highlight refiner. Improve the current clip edges with ONE act
 - keep: use the current window as-is.
 - use_topic: re-snap to nearest transcript/topic boundaries.
 - use_scene: re-snap to nearest scene cuts.
+- use_audio: re-snap to nearest speech pauses / loudness changes.
 - micro_adjust: propose small delta seconds to shift edges (start_delta in [-1.0, +1.0], end_delta in [-1.5, +1.5]).
 
-Prioritize transcript coherence (avoid cutting a word/sentence mid-way). Use scene cuts if transcript cues are weak.
+Prioritize transcript coherence (avoid cutting a word/sentence mid-way). Speech pauses near an edge are usually the cleanest cut. Use scene cuts if transcript cues are weak.
 Respect constraints: final clip must remain within [min_len, max_len] seconds and must not cross the midpoint.
 
 Return STRICT JSON only:
-{"action":"keep|use_topic|use_scene|micro_adjust","start_delta":0.0,"end_delta":0.0,"reason":"short","confidence":0.0}
+{"action":"keep|use_topic|use_scene|use_audio|micro_adjust","start_delta":0.0,"end_delta":0.0,"reason":"short","confidence":0.0}
 No extra text.
 """
 
@@ -32,7 +35,7 @@ No extra text.
 class EdgeRefiner:
     def __init__(self, db_pool_size: int = 5):
         self.llm = Claude()
-        self.db = AuroraService(pool_size=db_pool_size)
+        self.db = create_storage_backend(pool_size=db_pool_size, component="edge_refiner")
         self._db_ready = False
 
     async def _ensure_db(self):
@@ -41,12 +44,7 @@ class EdgeRefiner:
             self._db_ready = True
 
     def _load_frame(self, frames_dir: str, idx: int) -> Optional[cv2.Mat]:
-        if idx < 0:
-            return None
-        path = os.path.join(frames_dir, f"frame_{idx:09d}.jpg")
-        if not os.path.exists(path):
-            return None
-        return cv2.imread(path)
+        return get_frame_store(frames_dir).get(idx)
 
     def _edge_and_key_frames(self, base_path: str, start: float, end: float, max_mid_frames: int = 3) -> List[str]:
         frames_dir = os.path.join(base_path, "frames")
@@ -93,10 +91,10 @@ class EdgeRefiner:
         ]
         return clip.get_transcript(rows)
 
-    def _nearest(self, t: float, arr: List[float]) -> Tuple[Optional[float], Optional[float]]:
-        if not arr:
+    def _nearest(self, t: float, arr: Optional[Boundaries]) -> Tuple[Optional[float], Optional[float]]:
+        best = BoundaryIndex.coerce(arr).nearest(t)
+        if best is None:
             return None, None
-        best = min(arr, key=lambda x: abs(x - t))
         return best, (best - t)
 
     async def refine(
@@ -105,10 +103,11 @@ class EdgeRefiner:
         base_path: str,
         snapped_start: float,
         snapped_end: float,
-        topic_boundaries: List[float],
-        scene_boundaries: List[float],
+        topic_boundaries: Boundaries,
+        scene_boundaries: Boundaries,
         min_len: float,
         max_len: float,
+        audio_boundaries: Optional[Boundaries] = None,
         start_delta_range: Tuple[float, float] = (-1.0, 1.0),
         end_delta_range: Tuple[float, float] = (-1.5, 1.5),
     ) -> Dict:
@@ -117,6 +116,8 @@ class EdgeRefiner:
         ts_start_scene, d_start_scene = self._nearest(snapped_start, scene_boundaries)
         ts_end_topic, d_end_topic = self._nearest(snapped_end, topic_boundaries)
         ts_end_scene, d_end_scene = self._nearest(snapped_end, scene_boundaries)
+        ts_start_audio, d_start_audio = self._nearest(snapped_start, audio_boundaries)
+        ts_end_audio, d_end_audio = self._nearest(snapped_end, audio_boundaries)
 
         ctx = {
             "window": {
@@ -133,12 +134,16 @@ class EdgeRefiner:
                     "topic_delta_sec": None if d_start_topic is None else round(d_start_topic, 3),
                     "scene_candidate_sec": None if ts_start_scene is None else round(ts_start_scene, 3),
                     "scene_delta_sec": None if d_start_scene is None else round(d_start_scene, 3),
+                    "audio_candidate_sec": None if ts_start_audio is None else round(ts_start_audio, 3),
+                    "audio_delta_sec": None if d_start_audio is None else round(d_start_audio, 3),
                 },
                 "end": {
                     "topic_candidate_sec": None if ts_end_topic is None else round(ts_end_topic, 3),
                     "topic_delta_sec": None if d_end_topic is None else round(d_end_topic, 3),
                     "scene_candidate_sec": None if ts_end_scene is None else round(ts_end_scene, 3),
                     "scene_delta_sec": None if d_end_scene is None else round(d_end_scene, 3),
+                    "audio_candidate_sec": None if ts_end_audio is None else round(ts_end_audio, 3),
+                    "audio_delta_sec": None if d_end_audio is None else round(d_end_audio, 3),
                 },
             },
             "limits": {
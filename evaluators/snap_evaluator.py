@@ -7,8 +7,9 @@ import cv2
 
 from llm.claude import Claude
 from utils.logger import app_logger as logger
-from utils.helpers import numpy_to_base64, get_video_frame_filename, EMPTY_STRING
-from repositories.aurora_service import AuroraService
+from utils.frame_store import get_frame_store
+from utils.helpers import numpy_to_base64, EMPTY_STRING
+from repositories.storage_backend import create_storage_backend
 from candidate_clip import CandidateClip
 from config import AUDIO_CHUNK, VIDEO_FRAME_SAMPLE_RATE
 
@@ -37,7 +38,7 @@ class SnapEvaluator:
 
     def __init__(self, db_pool_size: int = 5):
         self.llm = Claude()
-        self.db = AuroraService(pool_size=db_pool_size)
+        self.db = create_storage_backend(pool_size=db_pool_size, component="snap_evaluator")
         self._db_ready = False
 
     async def _ensure_db(self):
@@ -46,12 +47,7 @@ class SnapEvaluator:
             self._db_ready = True
 
     def _load_frame(self, frames_dir: str, idx: int) -> Optional[cv2.Mat]:
-        if idx < 0:
-            return None
-        path = os.path.join(frames_dir, get_video_frame_filename(idx))
-        if not os.path.exists(path):
-            return None
-        return cv2.imread(path)
+        return get_frame_store(frames_dir).get(idx)
 
     def _edge_and_key_frames(
         self, base_path: str, start: float, end: float, max_mid_frames: int = 3
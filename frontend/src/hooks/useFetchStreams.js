@@ -1,5 +1,5 @@
 import { useParams } from "react-router";
-import { useState, useCallback, useEffect } from "react";
+import { useState, useCallback, useEffect, useRef } from "react";
 import { API_BASE_URL } from "../constants/app.constants";
 
 /**
@@ -19,6 +19,7 @@ import { API_BASE_URL } from "../constants/app.constants";
     "total_pages": 3,
     "has_next": true,
     "has_prev": false,
+    "next_cursor": "WyJhNjM4NTVlYiIsIDQ2XQ==",
     "limit": 20
 }
  */
@@ -30,6 +31,8 @@ export default function useFetchStreams(initialPage = 1, initialLimit = 20) {
     const [error, setError] = useState(null);
     const [page, setPage] = useState(initialPage);
     const [limit, setLimit] = useState(initialLimit);
+    // Keyset cursor of each visited page (page -> cursor); pages without one fall back to OFFSET
+    const cursorsRef = useRef({});
 
     const fetchStreams = useCallback(async (page, limit) => {
         setLoading(true);
@@ -38,6 +41,9 @@ export default function useFetchStreams(initialPage = 1, initialLimit = 20) {
             const url = new URL('streams', API_BASE_URL);
             url.searchParams.append('page', page);
             url.searchParams.append('limit', limit);
+            if (cursorsRef.current[page]) {
+                url.searchParams.append('cursor', cursorsRef.current[page]);
+            }
             
             const response = await fetch(url, {
                 method: 'GET',
@@ -51,6 +57,9 @@ export default function useFetchStreams(initialPage = 1, initialLimit = 20) {
             }
 
             const responseData = await response.json();
+            if (responseData.next_cursor) {
+                cursorsRef.current[page + 1] = responseData.next_cursor;
+            }
             
             // Parse the highlights JSON string for each item
             const processedData = {
@@ -83,6 +92,7 @@ export default function useFetchStreams(initialPage = 1, initialLimit = 20) {
     // Function to change items per page
     const setItemsPerPage = useCallback((newLimit) => {
         setLimit(newLimit);
+        cursorsRef.current = {};
         setPage(1); // Reset to first page when changing limit
     }, []);
 
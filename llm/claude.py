@@ -1,4 +1,5 @@
 import json
+import asyncio
 from typing import List
 from botocore.config import Config
 from aiobotocore.session import get_session
@@ -6,6 +7,18 @@ from aiobotocore.session import get_session
 from .base_llm import LLM
 from utils.logger import app_logger as logger
 from utils.helpers import extract_json, retry_with_backoff, EMPTY_STRING
+from config import LLM_MAX_CONCURRENCY
+
+
+# Process-wide cap on in-flight Bedrock requests, shared by every Claude instance
+_llm_semaphore: asyncio.Semaphore | None = None
+
+
+def get_llm_semaphore() -> asyncio.Semaphore:
+    global _llm_semaphore
+    if _llm_semaphore is None:
+        _llm_semaphore = asyncio.Semaphore(LLM_MAX_CONCURRENCY)
+    return _llm_semaphore
 
 
 class Claude(LLM):
@@ -41,17 +54,18 @@ class Claude(LLM):
             "anthropic_version": "bedrock-2023-05-31",
         }
 
-        async with self.session.create_client("bedrock-runtime", region_name=self.region, config=self.config) as client:
-            logger.info(f"[Claude] Invoking {self.model_id}")
-            response = await client.invoke_model(
-                modelId=self.model_id,
-                body=json.dumps(body),
-                contentType="application/json",
-                accept="application/json",
-            )
-
-            async with response["body"] as stream:
-                body_bytes = await stream.read()
+        async with get_llm_semaphore():
+            async with self.session.create_client("bedrock-runtime", region_name=self.region, config=self.config) as client:
+                logger.info(f"[Claude] Invoking {self.model_id}")
+                response = await client.invoke_model(
+                    modelId=self.model_id,
+                    body=json.dumps(body),
+                    contentType="application/json",
+                    accept="application/json",
+                )
+
+                async with response["body"] as stream:
+                    body_bytes = await stream.read()
 
         output = json.loads(body_bytes)
         logger.info(f"[Claude] Output: {output}")
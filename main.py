@@ -12,17 +12,19 @@ from queue import Queue
 from urllib.parse import urlparse
 from utils.helpers import seconds_to_hhmmss
 from utils.logger import app_logger as logger
+from utils.stream_state import get_stream_state
 from audio_transcriber import AudioTranscriber
 from clip_scorer_service import ClipScorerService
 from assort_clips_service import AssortClipsService
-from repositories.aurora_service import AuroraService
+from repositories.storage_backend import create_storage_backend
+from repositories.aurora_service import get_query_cache
 from stream_processor.processor import StreamProcessor
 from stream_processor.video_processor import VideoProcessor
 from stream_processor.audio_processor import AudioProcessor
-from config import BASE_DIR, STREAM_METADATA_TABLE, MEDIACONVERT_ROLE_ARN, AWS_REGION, S3_BUCKET_NAME, MAX_STREAM_DURATION
+from config import BASE_DIR, STREAM_METADATA_TABLE, MEDIACONVERT_ROLE_ARN, AWS_REGION, S3_BUCKET_NAME, MAX_STREAM_DURATION, STORAGE_BACKEND, RESUME_ENABLED
 
 
-db_service = AuroraService()
+db_service = create_storage_backend(pool_size=2, component="main")
 
 async def set_stream_status(stream_id, status: str, message: str = None):
     await db_service.update_dict(
@@ -169,8 +171,22 @@ async def main():
     stream_id = parsed_msg["stream_id"] if parsed_msg["stream_id"] else f"{uuid.uuid4()}"
     stream_url = parsed_msg["stream_url"] if parsed_msg["stream_url"] else "./data/test_videos/news.mp4"
 
+    # On a single box there is no API lambda to register the stream first
+    if STORAGE_BACKEND == "sqlite" and await db_service.get_stream(stream_id) is None:
+        await db_service.insert_dict(
+            STREAM_METADATA_TABLE,
+            {"stream_id": stream_id, "stream_url": stream_url, "status": "SUBMITTED"},
+        )
     await set_stream_status(stream_id, "IN_PROGRESS")
 
+    if parsed_msg.get("resume", RESUME_ENABLED):
+        watermarks = await db_service.get_stream_watermarks(stream_id)
+        get_stream_state(stream_id).restore(watermarks)
+        if STORAGE_BACKEND == "aurora" and not any(watermarks.values()):
+            # Nothing durable yet: every row of the stream will be written by this process
+            get_query_cache().mark_fresh(stream_id)
+        logger.info(f"[Main] resuming stream {stream_id} from durable watermarks {watermarks}")
+
     job_params = {
         "input_source": stream_url,
         "output_bucket": S3_BUCKET_NAME,
@@ -189,12 +205,12 @@ async def main():
 
     audio_frame_q = Queue(maxsize=2048)
     video_frame_q = Queue(maxsize=2048)
-    stream_processor = StreamProcessor(stream_url, audio_frame_q, video_frame_q)
+    stream_processor = StreamProcessor(stream_url, audio_frame_q, video_frame_q, stream_id=stream_id)
     video_processor = VideoProcessor(f"{BASE_DIR}/{stream_id}/frames", video_frame_q)
     audio_processor = AudioProcessor(f"{BASE_DIR}/{stream_id}/audio_chunks", audio_frame_q)
     audio_transcriber = AudioTranscriber(f"{BASE_DIR}/{stream_id}/audio_chunks")
     clip_scorer = ClipScorerService()
-    assort_clips_service = AssortClipsService()
+    assort_clips_service = AssortClipsService(frame_segments=video_processor.frame_segments)
 
 
     stream_task = threading.Thread(target=stream_processor.start_stream, args=(stream_processor_event,), daemon=True)
@@ -204,7 +220,7 @@ async def main():
         asyncio.create_task(video_processor.process_frames(stream_id, video_processor_event, stream_processor_event)),
         asyncio.create_task(audio_processor.process_frames(stream_id, audio_processor_event, stream_processor_event)),
         asyncio.create_task(audio_transcriber.transcribe_audio(stream_id, audio_processor_event)),
-        asyncio.create_task(clip_scorer.score_clips(stream_id, clip_scorer_event, audio_processor_event, video_processor_event)),
+        asyncio.create_task(clip_scorer.score_clips(stream_id, clip_scorer_event)),
         asyncio.create_task(assort_clips_service.assort_clips(stream_id, clip_scorer_event))
     ]
 
@@ -226,11 +242,19 @@ async def main():
             for task in tasks:
                 task.cancel()
             await asyncio.gather(*tasks, return_exceptions=True)
+        # Frames are only complete once their images are in S3
+        await video_processor.s3_writer.wait_for_pending_uploads()
+        # ... and readers (API, compaction) act on COMPLETED: the queued rows go first
+        failed_rows = await db_service.flush()
+        if failed_rows:
+            raise RuntimeError(f"{failed_rows} queued DB row(s) could not be written")
         await set_stream_status(stream_id, "COMPLETED")
     except Exception as e:
         await set_stream_status(stream_id, "FAILED", str(e))
     finally:
         stream_processor_event.set()
+        await video_processor.s3_writer.close()
+        await db_service.flush()
         await db_service.close()
         print("Shutdown complete.")
         end_time = time.time()
@@ -1,4 +1,5 @@
-from sqlalchemy import Column, String, Integer, BigInteger, Float, DateTime, Index, Text
+from sqlalchemy import Column, String, Integer, BigInteger, Float, DateTime, Index, Text, UniqueConstraint
+from sqlalchemy.dialects.mysql import DOUBLE, LONGBLOB
 from sqlalchemy.ext.declarative import declarative_base
 from datetime import datetime
 
@@ -9,7 +10,7 @@ class VideoMetadata(Base):
     __tablename__ = "video_metadata"
 
     id = Column(BigInteger, primary_key=True, autoincrement=True)
-    stream_id = Column(String(255), nullable=False, index=True)
+    stream_id = Column(String(255), primary_key=True, nullable=False)
     filename = Column(String(512), nullable=False)
     frame_index = Column(BigInteger, nullable=False)
     timestamp = Column(Float, nullable=True)
@@ -18,11 +19,10 @@ class VideoMetadata(Base):
     height = Column(Integer, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
 
-    # Composite indexes for common queries
+    # The unique key serves every read; rows are hash-partitioned by stream_id
     __table_args__ = (
-        Index("idx_stream_frame", "stream_id", "frame_index"),
-        Index("idx_stream_timestamp", "stream_id", "timestamp"),
-        Index("idx_filename", "filename"),
+        UniqueConstraint("stream_id", "frame_index", name="uq_video_stream_frame"),
+        {"mysql_partition_by": "KEY(stream_id)", "mysql_partitions": "16"},
     )
 
 
@@ -30,7 +30,7 @@ class AudioMetadata(Base):
     __tablename__ = "audio_metadata"
 
     id = Column(BigInteger, primary_key=True, autoincrement=True)
-    stream_id = Column(String(255), nullable=False, index=True)
+    stream_id = Column(String(255), primary_key=True, nullable=False)
     filename = Column(String(512), nullable=False)
     chunk_index = Column(BigInteger, nullable=False)
     start_timestamp = Column(Float, nullable=True)
@@ -40,11 +40,11 @@ class AudioMetadata(Base):
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     transcript = Column(Text, nullable=True)
 
-    # Composite indexes for common queries
+    # Chunk reads use the unique key, transcript updates (stream_id, filename)
     __table_args__ = (
-        Index("idx_stream_chunk", "stream_id", "chunk_index"),
-        Index("idx_stream_timestamps", "stream_id", "start_timestamp", "end_timestamp"),
-        Index("idx_filename", "filename"),
+        Index("idx_stream_filename", "stream_id", "filename"),
+        UniqueConstraint("stream_id", "chunk_index", name="uq_audio_stream_chunk"),
+        {"mysql_partition_by": "KEY(stream_id)", "mysql_partitions": "16"},
     )
 
 
@@ -52,7 +52,7 @@ class Highlight(Base):
     __tablename__ = "score_metadata"
 
     id = Column(BigInteger, primary_key=True, autoincrement=True)
-    stream_id = Column(String(255), nullable=False, index=True)
+    stream_id = Column(String(255), primary_key=True, nullable=False)
     start_time = Column(Float, nullable=False)
     end_time = Column(Float, nullable=False)
     saliency_score = Column(Float, nullable=True)
@@ -63,10 +63,52 @@ class Highlight(Base):
         DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False
     )
 
-    # Composite indexes for common queries
+    # (stream_id, start_time) serves the time-range reads
     __table_args__ = (
-        Index("idx_stream_time", "stream_id", "start_time", "end_time"),
-        Index("idx_stream_highlight_score", "stream_id", "highlight_score"),
-        Index("idx_highlight_score", "highlight_score"),
-        Index("idx_saliency_score", "saliency_score"),
+        UniqueConstraint("stream_id", "start_time", name="uq_score_stream_start"),
+        {"mysql_partition_by": "KEY(stream_id)", "mysql_partitions": "16"},
+    )
+
+
+class StreamHighlight(Base):
+    __tablename__ = "highlights"
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    stream_id = Column(String(255), nullable=False)
+    start_time = Column(DOUBLE, nullable=False)
+    end_time = Column(DOUBLE, nullable=False)
+    title = Column(String(512), nullable=True)
+    caption = Column(Text, nullable=True)
+    thumbnail = Column(String(512), nullable=True)
+    snap_reason = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = Column(
+        DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False
+    )
+
+    # (stream_id, start_time) is the upsert key and serves time-range reads
+    __table_args__ = (
+        UniqueConstraint("stream_id", "start_time", name="uq_highlights_stream_start"),
+    )
+
+
+class FrameManifest(Base):
+    __tablename__ = "frame_manifest"
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    stream_id = Column(String(255), nullable=False)
+    frame_count = Column(BigInteger, nullable=False)
+    last_frame_index = Column(BigInteger, nullable=False)
+    last_timestamp = Column(Float, nullable=True)
+    width = Column(Integer, nullable=True)
+    height = Column(Integer, nullable=True)
+    # Packed frame columns of a compacted stream (utils/frame_manifest.py)
+    manifest = Column(LONGBLOB, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = Column(
+        DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False
+    )
+
+    __table_args__ = (
+        UniqueConstraint("stream_id", name="uq_frame_manifest_stream"),
     )
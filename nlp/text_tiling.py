@@ -2,9 +2,10 @@ from __future__ import annotations
 
 import math
 import re
-from collections import Counter
 from typing import Dict, List, Tuple
 
+import numpy as np
+
 from utils.logger import app_logger as logger
 
 
@@ -14,41 +15,65 @@ def _normalize_token(tok: str) -> str:
     return tok
 
 
-def _cosine_sim(c1: Counter, c2: Counter) -> float:
-    if not c1 or not c2:
-        return 0.0
-    keys = set(c1) | set(c2)
-    dot = sum(c1[k] * c2[k] for k in keys)
-    n1 = math.sqrt(sum(v * v for v in c1.values()))
-    n2 = math.sqrt(sum(v * v for v in c2.values()))
-    if n1 == 0.0 or n2 == 0.0:
-        return 0.0
-    return float(dot / (n1 * n2))
+# Gaps scored per batch, bounds the (gaps, block, block) comparison tensors
+_GAP_BATCH = 2048
 
 
-def text_tiling_boundaries(
-    words: List[Dict],
-    block_size: int = 20,
-    step: int = 10,
-    smoothing_width: int = 2,
-    cutoff_std: float = 0.5,
-) -> List[float]:
+def _gap_similarities(ids: np.ndarray, centers: np.ndarray, block_size: int) -> np.ndarray:
     """
-    Lightweight TextTiling-like topic segmentation over word-timestamp stream.
+    Cosine similarity between the bag-of-words of [c - block_size, c) and
+    [c, c + block_size) for every gap center c, in one batch.
+
+    Block vectors are never materialized: with token ids, the dot product of
+    two count vectors is the number of equal-id pairs across the blocks and a
+    squared norm is the number of equal-id pairs within a block. That keeps
+    memory at O(gaps * block_size^2) instead of O(tokens * vocabulary), and
+    the integer counts make the result bit-identical to the Counter version.
+    """
+    sims = np.zeros(len(centers), dtype=np.float64)
+    offsets = np.arange(block_size)
+    for lo in range(0, len(centers), _GAP_BATCH):
+        batch = centers[lo:lo + _GAP_BATCH]
+        left = ids[batch[:, None] - block_size + offsets]
+        right = ids[batch[:, None] + offsets]
+        dot = (left[:, :, None] == right[:, None, :]).sum(axis=(1, 2))
+        sq_left = (left[:, :, None] == left[:, None, :]).sum(axis=(1, 2))
+        sq_right = (right[:, :, None] == right[:, None, :]).sum(axis=(1, 2))
+        norm = np.sqrt(sq_left.astype(np.float64)) * np.sqrt(sq_right.astype(np.float64))
+        sims[lo:lo + _GAP_BATCH] = dot / norm
+    return sims
 
-    Inputs:
-      - words: list of dicts with at least {'content', 'start_time', 'type'} where
-               type is 'pronunciation' for spoken words.
-    Returns:
-      - List of boundary timestamps (float seconds), based on similarity valleys
-        between adjacent token blocks. Boundaries are placed at the token index
-        where a valley occurs, mapped to that token's start_time.
 
-    This implementation avoids heavy deps and is robust to ASR noise. It uses
-    cosine similarity between bag-of-words of left/right windows, optional
-    moving-average smoothing, then selects minima below (mean - cutoff_std*std).
+def _smooth(sims: np.ndarray, width: int) -> np.ndarray:
     """
-    # Filter to spoken words with usable timestamps.
+    Moving average over [j - width, j + width], truncated at the edges.
+
+    Terms are added left to right (masked terms add 0.0) so the sums round
+    exactly like sum(sims[lo:hi]).
+    """
+    n = len(sims)
+    acc = np.zeros(n, dtype=np.float64)
+    idx = np.arange(n)
+    for d in range(-width, width + 1):
+        src = idx + d
+        valid = (src >= 0) & (src < n)
+        acc += np.where(valid, sims[np.clip(src, 0, n - 1)], 0.0)
+    lo = np.maximum(0, idx - width)
+    hi = np.minimum(n, idx + width + 1)
+    return acc / (hi - lo)
+
+
+def _valleys(curve: np.ndarray, cutoff: float) -> np.ndarray:
+    """Indexes j in [1, len - 2] that are local minima below cutoff."""
+    if len(curve) < 3:
+        return np.zeros(0, dtype=np.int64)
+    mid = curve[1:-1]
+    is_valley = (mid <= curve[:-2]) & (mid <= curve[2:]) & (mid < cutoff)
+    return np.nonzero(is_valley)[0] + 1
+
+
+def _spoken_tokens(words: List[Dict]) -> Tuple[List[str], List[float]]:
+    """Filter to spoken words with usable timestamps and normalize them."""
     toks: List[str] = []
     times: List[float] = []
     for w in words:
@@ -67,64 +92,194 @@ def text_tiling_boundaries(
             continue
         toks.append(norm)
         times.append(float(t))
+    return toks, times
+
+
+def _dedup_boundaries(boundaries: List[float], min_gap: float = 0.5) -> List[float]:
+    boundaries = sorted(boundaries)
+    deduped: List[float] = []
+    last = None
+    for b in boundaries:
+        if last is None or abs(b - last) > min_gap:
+            deduped.append(b)
+            last = b
+    return deduped
+
+
+def text_tiling_boundaries(
+    words: List[Dict],
+    block_size: int = 20,
+    step: int = 10,
+    smoothing_width: int = 2,
+    cutoff_std: float = 0.5,
+) -> List[float]:
+    """
+    Lightweight TextTiling-like topic segmentation over word-timestamp stream.
+
+    Inputs:
+      - words: list of dicts with at least {'content', 'start_time', 'type'} where
+               type is 'pronunciation' for spoken words.
+    Returns:
+      - List of boundary timestamps (float seconds), based on similarity valleys
+        between adjacent token blocks. Boundaries are placed at the token index
+        where a valley occurs, mapped to that token's start_time.
+
+    This implementation is robust to ASR noise. It uses cosine similarity
+    between bag-of-words of left/right windows, optional moving-average
+    smoothing, then selects minima below (mean - cutoff_std*std). All gaps
+    are scored as NumPy array operations over integer token ids.
+    """
+    toks, times = _spoken_tokens(words)
 
     n = len(toks)
     if n < 2 * block_size:
         return []
 
-    # Precompute cumulative counts for fast window vectors.
-    vocab_index: Dict[str, int] = {}
-    vectors: List[List[int]] = [[0] * 0]
-    # We'll build a rolling Counter for windows using prefix technique.
-    # For simplicity and small block sizes, compute Counters on the fly.
-
-    def window_counter(start: int, end: int) -> Counter:
-        c = Counter()
-        for i in range(start, end):
-            c[toks[i]] += 1
-        return c
-
-    sims: List[float] = []
-    centers: List[int] = []
-    i = block_size
-    while i + block_size <= n:
-        left = window_counter(i - block_size, i)
-        right = window_counter(i, i + block_size)
-        sims.append(_cosine_sim(left, right))
-        centers.append(i)
-        i += step
+    vocab: Dict[str, int] = {}
+    ids = np.fromiter((vocab.setdefault(t, len(vocab)) for t in toks), dtype=np.int64, count=n)
+    centers = np.arange(block_size, n - block_size + 1, step)
+    sims = _gap_similarities(ids, centers, block_size)
 
     # Optional smoothing (moving average over similarity curve).
     if smoothing_width > 1 and len(sims) >= 2:
-        smoothed: List[float] = []
-        w = smoothing_width
-        for j in range(len(sims)):
-            lo = max(0, j - w)
-            hi = min(len(sims), j + w + 1)
-            smoothed.append(sum(sims[lo:hi]) / (hi - lo))
-        sims = smoothed
+        sims = _smooth(sims, smoothing_width)
 
     # Compute global mean/std then select local minima below mean - k*std.
-    mean = sum(sims) / len(sims)
-    var = sum((x - mean) ** 2 for x in sims) / max(1, len(sims) - 1)
-    std = math.sqrt(var)
-    cutoff = mean - cutoff_std * std
-
-    boundaries: List[float] = []
-    for j in range(1, len(sims) - 1):
-        if sims[j] <= sims[j - 1] and sims[j] <= sims[j + 1] and sims[j] < cutoff:
-            idx = centers[j]
-            # Map token index to timestamp (start time of token at idx).
-            if 0 <= idx < len(times):
-                boundaries.append(round(float(times[idx]), 3))
+    # cumsum accumulates sequentially, matching the rounding of a Python sum.
+    mean = np.cumsum(sims)[-1] / len(sims)
+    var = np.cumsum((sims - mean) ** 2)[-1] / max(1, len(sims) - 1)
+    cutoff = mean - cutoff_std * math.sqrt(var)
+
+    # Map each valley's token index to that token's start_time.
+    boundaries = [round(times[centers[j]], 3) for j in _valleys(sims, cutoff)]
 
     # Deduplicate boundaries closer than 0.5s.
-    boundaries = sorted(boundaries)
-    deduped: List[float] = []
-    last = None
-    for b in boundaries:
-        if last is None or abs(b - last) > 0.5:
-            deduped.append(b)
-            last = b
-    return deduped
+    return _dedup_boundaries(boundaries)
+
+
+class IncrementalTextTiler:
+    """
+    TextTiling over an append-only word stream.
+
+    Gap similarities only depend on the 2*block_size tokens around each gap,
+    so appended words only add new gaps. Smoothed values and local minima are
+    finalized once no later gap can change them; only the trailing unstable
+    region (the last smoothing_width gaps) is re-evaluated on each read.
+    The mean/std cutoff is global, so boundaries are re-filtered from the
+    finalized minima when new gaps arrive and cached until the next append.
+
+    For the same words it returns what text_tiling_boundaries returns, up to
+    float rounding of the running mean/std.
+    """
+
+    def __init__(
+        self,
+        block_size: int = 20,
+        step: int = 10,
+        smoothing_width: int = 2,
+        cutoff_std: float = 0.5,
+    ):
+        self.block_size = block_size
+        self.step = step
+        self.width = smoothing_width if smoothing_width > 1 else 0
+        self.cutoff_std = cutoff_std
+
+        self.toks: List[str] = []
+        self.times: List[float] = []
+        self._vocab: Dict[str, int] = {}
+        self._ids: List[int] = []
+        self._sims: List[float] = []
+        self._centers: List[int] = []
+        # Finalized prefix of the smoothed curve and its running sums
+        self._smoothed: List[float] = []
+        self._sum = 0.0
+        self._sum_sq = 0.0
+        # Finalized local minima (gap indexes)
+        self._minima: List[int] = []
+        self._minima_checked = 1
+        self._boundaries: List[float] | None = []
+
+    @property
+    def word_count(self) -> int:
+        return len(self.toks)
+
+    def add_words(self, words: List[Dict]):
+        toks, times = _spoken_tokens(words)
+        if not toks:
+            return
+        self.toks.extend(toks)
+        self.times.extend(times)
+        self._ids.extend(self._vocab.setdefault(t, len(self._vocab)) for t in toks)
+
+        b = self.block_size
+        n = len(self.toks)
+        first = b + len(self._centers) * self.step
+        centers = np.arange(first, n - b + 1, self.step)
+        if len(centers) == 0:
+            return
+
+        # Only the tokens around the new gaps are needed
+        lo = int(centers[0]) - b
+        ids = np.asarray(self._ids[lo:int(centers[-1]) + b], dtype=np.int64)
+        sims = _gap_similarities(ids, centers - lo, b)
+        self._sims.extend(sims.tolist())
+        self._centers.extend(centers.tolist())
+
+        self._finalize()
+        self._boundaries = None
+
+    def _smooth_at(self, j: int) -> float:
+        if self.width == 0:
+            return self._sims[j]
+        lo = max(0, j - self.width)
+        hi = min(len(self._sims), j + self.width + 1)
+        return sum(self._sims[lo:hi]) / (hi - lo)
+
+    def _finalize(self):
+        # smoothed[j] is final once gap j + width exists
+        final_count = max(0, len(self._sims) - self.width)
+        for j in range(len(self._smoothed), final_count):
+            v = self._smooth_at(j)
+            self._smoothed.append(v)
+            self._sum += v
+            self._sum_sq += v * v
+        # minimum at j needs final smoothed values at j - 1, j and j + 1
+        s = self._smoothed
+        for j in range(self._minima_checked, len(s) - 1):
+            if s[j] <= s[j - 1] and s[j] <= s[j + 1]:
+                self._minima.append(j)
+        self._minima_checked = max(self._minima_checked, len(s) - 1)
+
+    def boundaries(self) -> List[float]:
+        """Current topic boundaries (seconds), cached until more gaps arrive."""
+        if self._boundaries is not None:
+            return self._boundaries
+
+        total = len(self._sims)
+        if len(self.toks) < 2 * self.block_size or total == 0:
+            self._boundaries = []
+            return self._boundaries
+
+        # Trailing unstable region is recomputed from the current gaps
+        tail = [self._smooth_at(j) for j in range(len(self._smoothed), total)]
+        curve_sum = self._sum + sum(tail)
+        curve_sq = self._sum_sq + sum(v * v for v in tail)
+        mean = curve_sum / total
+        var = max(0.0, curve_sq - total * mean * mean) / max(1, total - 1)
+        cutoff = mean - self.cutoff_std * math.sqrt(var)
+
+        def value(j: int) -> float:
+            return self._smoothed[j] if j < len(self._smoothed) else tail[j - len(self._smoothed)]
+
+        candidates = list(self._minima)
+        for j in range(max(1, len(self._smoothed) - 1), total - 1):
+            if value(j) <= value(j - 1) and value(j) <= value(j + 1):
+                candidates.append(j)
 
+        boundaries = [
+            round(float(self.times[self._centers[j]]), 3)
+            for j in candidates
+            if value(j) < cutoff
+        ]
+        self._boundaries = _dedup_boundaries(boundaries)
+        return self._boundaries
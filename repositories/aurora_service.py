@@ -1,56 +1,443 @@
+import re
+import time
 import asyncio
 import aiomysql
+import pymysql
 
-from utils.helpers import get_secret
+from utils.helpers import get_cached_secret
+from utils.frame_manifest import FrameManifest, build_manifest_row
+from collections import OrderedDict
 from contextlib import asynccontextmanager
-from typing import Dict, List, Any, Optional
+from typing import AsyncIterator, Dict, List, Any, Optional, Sequence
 from utils.logger import app_logger as logger
-from config import DB_PORT, DB_HOST, DB_NAME, DB_SECRET_NAME, AWS_REGION
+from repositories.db_metrics import DbMetrics, get_metrics_sink
+from repositories.storage_backend import StorageBackend, AUDIO_COLUMNS, SCORE_COLUMNS, merge_frame_rows, project_columns, row_factory
+from config import (
+    DB_PORT,
+    DB_HOST,
+    DB_NAME,
+    DB_SECRET_NAME,
+    AWS_REGION,
+    DB_POOL_MAX_SIZE,
+    STREAM_FETCH_BATCH,
+    QUERY_CACHE_MAX_STREAMS,
+    QUERY_CACHE_MAX_ROWS,
+    AUDIO_METADATA_TABLE_NAME,
+    SCORE_METADATA_TABLE,
+    STREAM_METADATA_TABLE,
+    FRAME_MANIFEST_TABLE,
+    HIGHLIGHTS_TABLE,
+)
 
+# MySQL "Access denied" error code, raised when the secret was rotated
+_ER_ACCESS_DENIED = 1045
 
 
-class AuroraService:
+class SharedAuroraPool:
+    """
+    The process-wide aiomysql pool behind every AuroraService.
 
-    def __init__(self, pool_size: int = 10):
-        self.host = DB_HOST
-        self.database = DB_NAME
-        self.port = DB_PORT
-        secrets = get_secret(DB_SECRET_NAME, AWS_REGION)
-        self.user = secrets["username"]
-        self.password = secrets["password"]
-        self.pool_size = pool_size
-        self.pool = None
+    Credentials come from the cached secret and are refreshed once when a new
+    connection is rejected. Keeps pool-usage metrics: acquires, time spent
+    waiting for a connection, connections in use and their peak.
+    """
 
-        logger.info("AuroraService initialized with asyncio")
+    def __init__(self, max_size: int = DB_POOL_MAX_SIZE):
+        self.max_size = max_size
+        self.pool: Optional[aiomysql.Pool] = None
+        self._init_lock: Optional[asyncio.Lock] = None
+        self.acquires = 0
+        self.acquire_wait_total = 0.0
+        self.acquire_wait_max = 0.0
+        self.in_use = 0
+        self.peak_in_use = 0
+        self.auth_refreshes = 0
+        # Pools replaced by a credential refresh, closing once their connections are back
+        self._retiring = set()
 
-    async def initialize(self):
-        """Initialize the connection pool. Call this before using the writer."""
-        self.pool = await aiomysql.create_pool(
-            host=self.host,
-            port=self.port,
-            user=self.user,
-            password=self.password,
-            db=self.database,
-            minsize=1,
-            maxsize=self.pool_size,
-            autocommit=True,
-        )
-        logger.info(f"Connection pool created with size {self.pool_size}")
+    async def initialize(self, refresh_secret: bool = False):
+        if self._init_lock is None:
+            self._init_lock = asyncio.Lock()
+        async with self._init_lock:
+            if self.pool is not None and not refresh_secret:
+                return
+            secrets = get_cached_secret(DB_SECRET_NAME, AWS_REGION, refresh=refresh_secret)
+            old_pool, self.pool = self.pool, await aiomysql.create_pool(
+                host=DB_HOST,
+                port=DB_PORT,
+                user=secrets["username"],
+                password=secrets["password"],
+                db=DB_NAME,
+                minsize=1,
+                maxsize=self.max_size,
+                autocommit=True,
+            )
+            if old_pool is not None:
+                # Connections checked out of the old pool still go back to it (acquire()
+                # captures their pool); close it once they have
+                old_pool.close()
+                self._retiring.add(asyncio.create_task(self._retire(old_pool)))
+            logger.info(f"[SharedAuroraPool] Connection pool created with size {self.max_size}")
+
+    async def _retire(self, pool: aiomysql.Pool):
+        try:
+            await pool.wait_closed()
+            logger.info("[SharedAuroraPool] previous connection pool closed")
+        finally:
+            self._retiring.discard(asyncio.current_task())
 
     @asynccontextmanager
-    async def get_connection(self):
-        """Async context manager for database connections."""
-        if not self.pool:
+    async def acquire(self):
+        if self.pool is None:
             raise RuntimeError("Pool not initialized. Call initialize() first.")
+        started = time.perf_counter()
+        # The connection is released to the pool it came from, even if a refresh swaps self.pool
+        pool = self.pool
+        try:
+            conn = await pool.acquire()
+        except pymysql.err.OperationalError as e:
+            if not e.args or e.args[0] != _ER_ACCESS_DENIED:
+                raise
+            logger.warning("[SharedAuroraPool] authentication failed, refreshing DB secret")
+            self.auth_refreshes += 1
+            await self.initialize(refresh_secret=True)
+            pool = self.pool
+            conn = await pool.acquire()
+        waited = time.perf_counter() - started
+        self.acquires += 1
+        self.acquire_wait_total += waited
+        self.acquire_wait_max = max(self.acquire_wait_max, waited)
+        self.in_use += 1
+        self.peak_in_use = max(self.peak_in_use, self.in_use)
+        get_metrics_sink().gauge("db.pool.in_use", self.in_use, pool="shared")
+        try:
+            yield conn
+        finally:
+            self.in_use -= 1
+            get_metrics_sink().gauge("db.pool.in_use", self.in_use, pool="shared")
+            pool.release(conn)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "max_size": self.max_size,
+            "size": self.pool.size if self.pool else 0,
+            "free": self.pool.freesize if self.pool else 0,
+            "in_use": self.in_use,
+            "peak_in_use": self.peak_in_use,
+            "acquires": self.acquires,
+            "acquire_wait_avg_ms": round(1000 * self.acquire_wait_total / self.acquires, 3) if self.acquires else 0.0,
+            "acquire_wait_max_ms": round(1000 * self.acquire_wait_max, 3),
+            "auth_refreshes": self.auth_refreshes,
+        }
+
+    async def close(self):
+        if self._retiring:
+            await asyncio.gather(*list(self._retiring), return_exceptions=True)
+        if self.pool is not None:
+            self.pool.close()
+            await self.pool.wait_closed()
+            self.pool = None
+            logger.info("[SharedAuroraPool] Connection pool closed")
+
+
+_shared_pool = SharedAuroraPool()
+
+
+def get_shared_pool() -> SharedAuroraPool:
+    return _shared_pool
+
+
+class _StreamEntry:
+    """Cached rows of one stream."""
+
+    def __init__(self):
+        self.stream_row: Optional[Dict[str, Any]] = None
+        self.audio: Dict[int, Dict[str, Any]] = {}  # chunk_index -> row
+        self.scores: Dict[float, Dict[str, Any]] = {}  # start_time -> row
+        # Every audio/score row of the stream was written or read through this cache
+        self.complete = False
+
+
+def _score_key(start_time) -> float:
+    return round(float(start_time), 3)
+
+
+def _parse_equalities(where_clause: str, where_params: tuple) -> Optional[Dict[str, Any]]:
+    """{column: value} of a "col=%s AND col=%s" WHERE clause, None for anything else."""
+    parts = re.split(r"\s+AND\s+", where_clause.strip(), flags=re.IGNORECASE)
+    if len(parts) != len(where_params):
+        return None
+    equalities = {}
+    for part, value in zip(parts, where_params):
+        m = _EQUALITY.match(part)
+        if m is None:
+            return None
+        equalities[m.group(1)] = value
+    return equalities
+
+
+_EQUALITY = re.compile(r"^\s*(\w+)\s*=\s*%s\s*$")
+
+
+class ReadYourWritesCache:
+    """
+    Process-wide, per-stream cache of the Batch job's hot reads: the stream
+    row, audio rows by chunk and score rows by start time.
+
+    Writes made through any AuroraService of the process update the cached
+    rows (or invalidate the stream when a WHERE clause is not a plain
+    equality), so reads see this process's own writes. A Batch job is the only
+    writer of its stream; main marks a stream without durable rows as fresh,
+    after which range reads are answered from the cache alone. For other
+    streams a range is served only when every row of it is cached.
+    Bounded to max_streams streams (LRU) and max_rows rows per table.
+    """
+
+    def __init__(self, max_streams: int = QUERY_CACHE_MAX_STREAMS, max_rows: int = QUERY_CACHE_MAX_ROWS):
+        self.max_streams = max_streams
+        self.max_rows = max_rows
+        self._streams: "OrderedDict[str, _StreamEntry]" = OrderedDict()
+        self.hits: Dict[str, int] = {}
+        self.misses: Dict[str, int] = {}
+        self.invalidations = 0
+
+    def _entry(self, stream_id: str, create: bool = True) -> Optional[_StreamEntry]:
+        entry = self._streams.get(stream_id)
+        if entry is None:
+            if not create:
+                return None
+            entry = _StreamEntry()
+            self._streams[stream_id] = entry
+            if len(self._streams) > self.max_streams:
+                self._streams.popitem(last=False)
+        else:
+            self._streams.move_to_end(stream_id)
+        return entry
+
+    def hit(self, kind: str):
+        self.hits[kind] = self.hits.get(kind, 0) + 1
+
+    def miss(self, kind: str):
+        self.misses[kind] = self.misses.get(kind, 0) + 1
+
+    def mark_fresh(self, stream_id: str):
+        """The stream has no durable rows yet: every row will pass through this process."""
+        self._entry(stream_id).complete = True
+
+    def _bound(self, entry: _StreamEntry, rows: Dict):
+        if len(rows) > self.max_rows:
+            # Drop the oldest half; the cache no longer mirrors the whole stream
+            for key in sorted(rows)[: len(rows) // 2]:
+                del rows[key]
+            entry.complete = False
+
+    # ---------- writes ----------
+    def on_rows_written(self, table_name: str, rows: List[Dict[str, Any]], keep_existing: Optional[Sequence[str]] = None):
+        """
+        Inserted/upserted rows (column values as written). keep_existing are the
+        columns an upsert leaves alone on an existing row (its unique_keys).
+        """
+        keep_existing = set(keep_existing or ())
+        for row in rows:
+            stream_id = row.get("stream_id")
+            if stream_id is None:
+                continue
+            if table_name == AUDIO_METADATA_TABLE_NAME and row.get("chunk_index") is not None:
+                self._put_row(stream_id, "audio", int(row["chunk_index"]), row, AUDIO_COLUMNS, keep_existing)
+            elif table_name == SCORE_METADATA_TABLE and row.get("start_time") is not None:
+                self._put_row(stream_id, "scores", _score_key(row["start_time"]), row, SCORE_COLUMNS, keep_existing)
+            elif table_name == STREAM_METADATA_TABLE:
+                entry = self._entry(stream_id, create=False)
+                if entry is not None:
+                    entry.stream_row = None  # re-read the full row once
+
+    def _put_row(self, stream_id: str, table: str, key, row: Dict[str, Any], columns: Sequence[str], keep_existing: set):
+        entry = self._entry(stream_id)
+        rows = getattr(entry, table)
+        cached = rows.get(key)
+        if cached is None:
+            if keep_existing and not entry.complete:
+                # The DB may hold an older row whose kept columns we do not know
+                return
+            cached = {c: None for c in columns}
+            rows[key] = cached
+            keep_existing = set()
+        cached.update({k: v for k, v in row.items() if k in columns and k not in keep_existing})
+        self._bound(entry, rows)
+
+    def on_update(self, table_name: str, data: Dict[str, Any], where_clause: str, where_params: tuple):
+        if table_name not in (AUDIO_METADATA_TABLE_NAME, SCORE_METADATA_TABLE, STREAM_METADATA_TABLE):
+            return
+        equalities = _parse_equalities(where_clause, where_params)
+        if equalities is None or "stream_id" not in equalities:
+            self.invalidations += 1
+            for entry in self._streams.values():
+                self._invalidate(entry, table_name)
+            return
+        entry = self._entry(equalities["stream_id"], create=False)
+        if entry is None:
+            return
+        if table_name == STREAM_METADATA_TABLE:
+            targets = [entry.stream_row] if entry.stream_row is not None else []
+        else:
+            targets = (entry.audio if table_name == AUDIO_METADATA_TABLE_NAME else entry.scores).values()
+        for row in targets:
+            if all(row.get(k) == v for k, v in equalities.items()):
+                row.update(data)
+
+    def _invalidate(self, entry: _StreamEntry, table_name: str):
+        if table_name == AUDIO_METADATA_TABLE_NAME:
+            entry.audio.clear()
+            entry.complete = False
+        elif table_name == SCORE_METADATA_TABLE:
+            entry.scores.clear()
+            entry.complete = False
+        else:
+            entry.stream_row = None
+
+    # ---------- reads ----------
+    def get_stream(self, stream_id: str) -> Optional[Dict[str, Any]]:
+        entry = self._entry(stream_id, create=False)
+        if entry is None or entry.stream_row is None:
+            return None
+        return dict(entry.stream_row)
+
+    def put_stream(self, stream_id: str, row: Optional[Dict[str, Any]]):
+        if row is not None:
+            self._entry(stream_id).stream_row = dict(row)
+
+    def get_audios(self, stream_id: str, start_chunk: Optional[int], end_chunk: Optional[int], limit: Optional[int]) -> Optional[List[Dict]]:
+        entry = self._entry(stream_id, create=False)
+        if entry is None:
+            return None
+        lo = start_chunk if start_chunk is not None else 0
+        if entry.complete:
+            keys = sorted(k for k in entry.audio if k >= lo and (end_chunk is None or k <= end_chunk))
+            keys = keys[:limit] if limit is not None else keys
+        else:
+            # Without the whole stream cached only a fully cached, bounded range is certain
+            hi = end_chunk if end_chunk is not None else (lo + limit - 1 if limit is not None else None)
+            if hi is None or start_chunk is None:
+                return None
+            if limit is not None:
+                hi = min(hi, lo + limit - 1)
+            keys = list(range(lo, hi + 1))
+            if any(k not in entry.audio for k in keys):
+                return None
+        return [dict(entry.audio[k]) for k in keys]
+
+    def _put_read_rows(self, stream_id: str, table: str, keyed_rows, columns: Sequence[str]):
+        # Rows already cached are at least as fresh as a read that may have raced a write
+        entry = self._entry(stream_id)
+        rows = getattr(entry, table)
+        for key, row in keyed_rows:
+            if key not in rows:
+                rows[key] = {c: row.get(c) for c in columns}
+        self._bound(entry, rows)
+
+    def put_audios(self, stream_id: str, rows: List[Dict[str, Any]]):
+        if rows:
+            self._put_read_rows(stream_id, "audio", ((int(r["chunk_index"]), r) for r in rows), AUDIO_COLUMNS)
+
+    def get_scores(self, stream_id: str, start_time: float, end_time: float) -> Optional[List[Dict]]:
+        entry = self._entry(stream_id, create=False)
+        if entry is None or not entry.complete:
+            return None
+        rows = [
+            r for k, r in sorted(entry.scores.items())
+            if r["start_time"] <= end_time and r["end_time"] >= start_time
+        ]
+        return [dict(r) for r in rows]
+
+    def put_scores(self, stream_id: str, rows: List[Dict[str, Any]]):
+        if rows:
+            self._put_read_rows(stream_id, "scores", ((_score_key(r["start_time"]), r) for r in rows), SCORE_COLUMNS)
+
+    def has_scores_after(self, stream_id: str, end_time: float) -> Optional[bool]:
+        """True/False when the cache knows, None when the DB has to answer."""
+        entry = self._entry(stream_id, create=False)
+        if entry is None:
+            return None
+        if any(k > end_time for k in entry.scores):
+            return True  # rows are never deleted, a cached one is proof
+        return False if entry.complete else None
+
+    def stats(self) -> Dict[str, Any]:
+        hits, misses = sum(self.hits.values()), sum(self.misses.values())
+        return {
+            "hits": dict(self.hits),
+            "misses": dict(self.misses),
+            "hit_rate": round(hits / (hits + misses), 3) if hits + misses else 0.0,
+            "invalidations": self.invalidations,
+            "streams": len(self._streams),
+        }
+
+
+_query_cache = ReadYourWritesCache()
+
+
+def get_query_cache() -> ReadYourWritesCache:
+    return _query_cache
+
 
-        async with self.pool.acquire() as conn:
-            async with conn.cursor(aiomysql.DictCursor) as cursor:
+class AuroraService(StorageBackend):
+    """
+    Per-component handle on the shared pool.
+
+    pool_size is the component's quota: the most connections it may hold at
+    once. The process-wide pool is sized by DB_POOL_MAX_SIZE, so construction
+    is cheap and opens no connections or Secrets Manager calls.
+    """
+
+    def __init__(self, pool_size: int = 10, component: str = "default"):
+        self.shared = get_shared_pool()
+        self.pool_size = pool_size
+        self.component = component
+        self._quota = asyncio.Semaphore(pool_size)
+        self.cache = get_query_cache()
+        self.metrics = DbMetrics(component)
+        self.in_flight = 0
+        self.queries = 0
+
+        logger.info(f"AuroraService initialized for {component} (quota {pool_size})")
+
+    @property
+    def pool(self):
+        return self.shared.pool
+
+    async def initialize(self):
+        """Initialize the shared connection pool (once per process). Call this before using the writer."""
+        await self.shared.initialize()
+
+    @asynccontextmanager
+    async def get_connection(self, cursor_class=aiomysql.DictCursor):
+        """Async context manager for database connections (instrumented, see repositories/db_metrics.py)."""
+        started = time.perf_counter()
+        async with self._quota:
+            async with self.shared.acquire() as conn:
+                self.metrics.acquired(time.perf_counter() - started)
+                self.in_flight += 1
+                self.queries += 1
                 try:
-                    yield cursor
-                    await conn.commit()
-                except Exception as e:
-                    await conn.rollback()
-                    raise e
+                    async with conn.cursor(cursor_class) as cursor:
+                        try:
+                            yield self.metrics.wrap(cursor)
+                            await conn.commit()
+                        except Exception as e:
+                            await conn.rollback()
+                            raise e
+                finally:
+                    self.in_flight -= 1
+                    self.metrics.released()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "component": self.component,
+            "quota": self.pool_size,
+            "in_flight": self.in_flight,
+            "queries": self.queries,
+            "pool": self.shared.stats(),
+        }
 
     async def insert_dict(self, table_name: str, data: Dict[str, Any]) -> int:
         """
@@ -69,7 +456,33 @@ class AuroraService:
 
         async with self.get_connection() as cursor:
             await cursor.execute(query, list(data.values()))
-            return cursor.lastrowid
+            row_id = cursor.lastrowid
+        self.cache.on_rows_written(table_name, [{**data, "id": row_id}])
+        return row_id
+
+    async def insert_dicts(self, table_name: str, rows: List[Dict[str, Any]]) -> int:
+        """
+        Async multi-row insert in one statement.
+
+        Args:
+            table_name: Name of the target table
+            rows: Dictionaries with the same column names as keys
+
+        Returns:
+            Number of inserted rows
+        """
+        if not rows:
+            return 0
+        keys = list(rows[0].keys())
+        columns = ", ".join(keys)
+        placeholders = ", ".join(["%s"] * len(keys))
+        query = f"INSERT INTO {table_name} ({columns}) VALUES ({placeholders})"
+
+        async with self.get_connection() as cursor:
+            await cursor.executemany(query, [[row[k] for k in keys] for row in rows])
+            count = cursor.rowcount
+        self.cache.on_rows_written(table_name, rows)
+        return count
 
     async def upsert_dict(
         self,
@@ -105,7 +518,47 @@ class AuroraService:
 
         async with self.get_connection() as cursor:
             await cursor.execute(query, list(data.values()))
-            return cursor.lastrowid
+            row_id = cursor.lastrowid
+        self.cache.on_rows_written(table_name, [data], keep_existing=unique_keys)
+        return row_id
+
+    async def upsert_dicts(
+        self,
+        table_name: str,
+        rows: List[Dict[str, Any]],
+        unique_keys: Optional[List[str]] = None,
+    ) -> int:
+        """
+        Async multi-row insert or update (ON DUPLICATE KEY UPDATE) in one statement.
+
+        Args:
+            table_name: Name of the target table
+            rows: Dictionaries with the same column names as keys
+            unique_keys: List of column names to exclude from UPDATE clause
+
+        Returns:
+            Number of affected rows
+        """
+        if not rows:
+            return 0
+        if unique_keys is None:
+            unique_keys = []
+
+        keys = list(rows[0].keys())
+        columns = ", ".join(keys)
+        placeholders = ", ".join(["%s"] * len(keys))
+
+        update_cols = [k for k in keys if k not in unique_keys]
+        updates = ", ".join([f"{col}=VALUES({col})" for col in update_cols])
+
+        query = f"INSERT INTO {table_name} ({columns}) VALUES ({placeholders}) ON DUPLICATE KEY UPDATE {updates}"
+
+        async with self.get_connection() as cursor:
+            # executemany rewrites INSERT ... VALUES into a single multi-row statement
+            await cursor.executemany(query, [[row[k] for k in keys] for row in rows])
+            count = cursor.rowcount
+        self.cache.on_rows_written(table_name, rows, keep_existing=unique_keys)
+        return count
 
     async def update_dict(
         self,
@@ -133,67 +586,30 @@ class AuroraService:
 
         async with self.get_connection() as cursor:
             await cursor.execute(query, params)
-            return cursor.rowcount
+            count = cursor.rowcount
+        self.cache.on_update(table_name, data, where_clause, where_params)
+        return count
 
-    def _handle_task_result(self, task: asyncio.Task):
-        """Callback to handle task completion and log errors."""
-        try:
-            result = task.result()
-            logger.debug(f"Task completed successfully: {result}")
-        except Exception as e:
-            logger.error(f"Task failed with error: {e}")
-
-    def insert_dict_nowait(self, table_name: str, data: Dict[str, Any]):
+    async def delete_highlights(self, stream_id: str) -> int:
         """
-        Fire-and-forget insert (creates task without waiting).
+        Delete the highlights of a stream (served by uq_highlights_stream_start).
 
         Args:
-            table_name: Name of the target table
-            data: Dictionary with column names as keys
-        """
-        task = asyncio.create_task(self.insert_dict(table_name, data))
-        # Add error handling callback
-        task.add_done_callback(self._handle_task_result)
-
-    def upsert_dict_nowait(
-        self,
-        table_name: str,
-        data: Dict[str, Any],
-        unique_keys: Optional[List[str]] = None,
-    ):
-        """
-        Fire-and-forget upsert (creates task without waiting).
-
-        Args:
-            table_name: Name of the target table
-            data: Dictionary with column names as keys
-            unique_keys: List of column names to exclude from UPDATE clause
-        """
-        task = asyncio.create_task(self.upsert_dict(table_name, data, unique_keys))
-        task.add_done_callback(self._handle_task_result)
-
-    def update_dict_nowait(
-        self,
-        table_name: str,
-        data: Dict[str, Any],
-        where_clause: str,
-        where_params: tuple,
-    ):
-        """
-        Fire-and-forget update (creates task without waiting).
+            stream_id: The stream identifier
 
-        Args:
-            table_name: Name of the target table
-            data: Dictionary with column names as keys to update
-            where_clause: WHERE clause (e.g., "id = %s")
-            where_params: Tuple of parameters for WHERE clause
+        Returns:
+            Number of rows deleted
         """
-        task = asyncio.create_task(
-            self.update_dict(table_name, data, where_clause, where_params)
-        )
-        task.add_done_callback(self._handle_task_result)
+        async with self.get_connection() as cursor:
+            await cursor.execute(f"DELETE FROM {HIGHLIGHTS_TABLE} WHERE stream_id = %s", (stream_id,))
+            return cursor.rowcount
 
     async def get_stream(self, stream_id: str):
+        cached = self.cache.get_stream(stream_id)
+        if cached is not None:
+            self.cache.hit("stream")
+            return cached
+        self.cache.miss("stream")
         query = """
             SELECT *
             FROM stream_metadata
@@ -204,7 +620,25 @@ class AuroraService:
         async with self.get_connection() as cursor:
             await cursor.execute(query, (stream_id))
             result = await cursor.fetchone()
-            return result
+        self.cache.put_stream(stream_id, result)
+        return result
+
+    async def get_frame_manifest(self, stream_id: str) -> Optional[FrameManifest]:
+        """
+        The stream's frame manifest (written by VideoProcessor or the compaction job).
+
+        Args:
+            stream_id: The stream identifier
+
+        Returns:
+            FrameManifest over the frame_manifest blob, or None if the stream has none
+        """
+        query = f"SELECT manifest FROM {FRAME_MANIFEST_TABLE} WHERE stream_id = %s LIMIT 1"
+
+        async with self.get_connection() as cursor:
+            await cursor.execute(query, (stream_id,))
+            row = await cursor.fetchone()
+        return FrameManifest.from_bytes(row["manifest"]) if row else None
 
     async def get_video_by_stream_and_frame(
         self, stream_id: str, frame_index: int
@@ -219,6 +653,12 @@ class AuroraService:
         Returns:
             Dictionary with video metadata or None if not found
         """
+        manifest = await self.get_frame_manifest(stream_id)
+        if manifest is not None:
+            row = next(manifest.rows(stream_id, frame_index, frame_index), None)
+            if row is not None:
+                return row
+
         query = """
             SELECT id, stream_id, filename, frame_index, timestamp, 
                    pts, width, height, created_at
@@ -251,7 +691,8 @@ class AuroraService:
             order_by: Order clause (default: "frame_index ASC")
 
         Returns:
-            List of dictionaries with video metadata
+            List of dictionaries with video metadata (ordered by frame_index
+            when the stream has a manifest)
         """
         query = """
             SELECT id, stream_id, filename, frame_index, timestamp, 
@@ -281,7 +722,8 @@ class AuroraService:
         async with self.get_connection() as cursor:
             await cursor.execute(query, tuple(params))
             results = await cursor.fetchall()
-            return results
+        manifest = await self.get_frame_manifest(stream_id)
+        return merge_frame_rows(list(results), manifest, stream_id, start_frame, end_frame, limit, order_by)
 
     async def get_audios_by_stream(
         self,
@@ -304,6 +746,14 @@ class AuroraService:
         Returns:
             List of dictionaries with video metadata
         """
+        cacheable = order_by == "chunk_index ASC"
+        if cacheable:
+            cached = self.cache.get_audios(stream_id, start_chunk, end_chunk, limit)
+            if cached is not None:
+                self.cache.hit("audios")
+                return cached
+            self.cache.miss("audios")
+
         query = """
             SELECT id, stream_id, filename, chunk_index, start_timestamp, end_timestamp, sample_rate, transcript
             FROM audio_metadata
@@ -331,7 +781,9 @@ class AuroraService:
         async with self.get_connection() as cursor:
             await cursor.execute(query, tuple(params))
             results = await cursor.fetchall()
-            return results
+        if cacheable:
+            self.cache.put_audios(stream_id, results)
+        return results
 
     async def get_scored_clips_by_stream(self, stream_id: str, start_time: float, end_time: float, order_by="start_time ASC"):
         """
@@ -345,6 +797,14 @@ class AuroraService:
         Returns:
             List of dictionaries with video metadata
         """
+        cacheable = order_by == "start_time ASC"
+        if cacheable:
+            cached = self.cache.get_scores(stream_id, start_time, end_time)
+            if cached is not None:
+                self.cache.hit("scores")
+                return cached
+            self.cache.miss("scores")
+
         query = """
             SELECT id, stream_id, start_time, end_time, saliency_score, highlight_score, caption
             FROM score_metadata
@@ -358,8 +818,92 @@ class AuroraService:
         async with self.get_connection() as cursor:
             await cursor.execute(query, tuple(params))
             results = await cursor.fetchall()
-            return results
+        if cacheable:
+            self.cache.put_scores(stream_id, results)
+        return results
         
+    async def _iter_rows(
+        self, query: str, params: tuple, columns: Sequence[str], row_type: str, batch_size: int = STREAM_FETCH_BATCH
+    ) -> AsyncIterator[Any]:
+        """
+        Rows of query from an unbuffered server-side cursor, batch_size per round trip.
+        The connection stays checked out until the iteration ends or is closed.
+        """
+        make_row = row_factory(row_type, columns)
+        async with self.get_connection(aiomysql.SSCursor) as cursor:
+            await cursor.execute(query, params)
+            while True:
+                rows = await cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                for row in rows:
+                    yield make_row(row) if make_row else row
+
+    async def iter_audios_by_stream(
+        self,
+        stream_id: str,
+        start_chunk: Optional[int] = None,
+        end_chunk: Optional[int] = None,
+        columns: Optional[Sequence[str]] = None,
+        row_type: str = "dict",
+    ) -> AsyncIterator[Any]:
+        """
+        Stream audio_metadata rows of a stream in chunk order, in constant memory.
+
+        Args:
+            stream_id: The stream identifier
+            start_chunk: Optional starting chunk index (inclusive)
+            end_chunk: Optional ending chunk index (inclusive)
+            columns: Subset of AUDIO_COLUMNS to read (default: all)
+            row_type: "dict", "tuple" or "row" (namedtuple)
+        """
+        columns = project_columns(columns, AUDIO_COLUMNS)
+        query = f"SELECT {', '.join(columns)} FROM audio_metadata WHERE stream_id = %s"
+        params = [stream_id]
+        if start_chunk is not None:
+            query += " AND chunk_index >= %s"
+            params.append(start_chunk)
+        if end_chunk is not None:
+            query += " AND chunk_index <= %s"
+            params.append(end_chunk)
+        query += " ORDER BY chunk_index ASC"
+
+        async for row in self._iter_rows(query, tuple(params), columns, row_type):
+            yield row
+
+    async def iter_scored_clips_by_stream(
+        self,
+        stream_id: str,
+        start_time: Optional[float] = None,
+        end_time: Optional[float] = None,
+        columns: Optional[Sequence[str]] = None,
+        row_type: str = "dict",
+    ) -> AsyncIterator[Any]:
+        """
+        Stream score_metadata rows of a stream overlapping [start_time, end_time]
+        (whole stream by default) in start_time order, in constant memory.
+
+        Args:
+            stream_id: The stream identifier
+            start_time: Optional start of the time range (inclusive)
+            end_time: Optional end of the time range (inclusive)
+            columns: Subset of SCORE_COLUMNS to read (default: all)
+            row_type: "dict", "tuple" or "row" (namedtuple)
+        """
+        columns = project_columns(columns, SCORE_COLUMNS)
+        query = f"SELECT {', '.join(columns)} FROM score_metadata WHERE stream_id = %s"
+        params = [stream_id]
+        if end_time is not None:
+            query += " AND start_time <= %s"
+            params.append(end_time)
+        if start_time is not None:
+            query += " AND end_time >= %s"
+            params.append(start_time)
+        query += " ORDER BY start_time ASC"
+
+        async for row in self._iter_rows(query, tuple(params), columns, row_type):
+            yield row
+
     async def has_more_entries_after(self, stream_id: str, end_time: float) -> bool:
         """
         Check if there are more score_metadata entries after the given end_time for a specific stream.
@@ -371,8 +915,14 @@ class AuroraService:
         Returns:
             True if more entries exist after the given end_time, False otherwise.
         """
+        cached = self.cache.has_scores_after(stream_id, end_time)
+        if cached is not None:
+            self.cache.hit("has_more")
+            return cached
+        self.cache.miss("has_more")
+
         query = """
-            SELECT *
+            SELECT id
             FROM score_metadata
             WHERE stream_id = %s AND start_time > %s
             LIMIT 1
@@ -385,9 +935,113 @@ class AuroraService:
             logger.info(f"[AuroraService] - has_more_entries - {row}")
             return True if row else False
 
+    async def get_stream_watermarks(self, stream_id: str) -> Dict[str, Any]:
+        """
+        Durable progress of a stream, for resuming a retried job.
+
+        Args:
+            stream_id: The stream identifier
+
+        Returns:
+            {"frames": next frame_index, "chunks": next chunk_index,
+             "scored_until": end_time of the last scored slice (0.0 when none)}
+        """
+        # Each MAX() is resolved from the (stream_id, ...) unique key; compacted frames live in frame_manifest
+        query = """
+            SELECT
+                GREATEST(
+                    COALESCE((SELECT MAX(frame_index) FROM video_metadata WHERE stream_id = %s), -1),
+                    COALESCE((SELECT last_frame_index FROM frame_manifest WHERE stream_id = %s), -1)
+                ) AS last_frame,
+                (SELECT MAX(chunk_index) FROM audio_metadata WHERE stream_id = %s) AS last_chunk,
+                (SELECT MAX(end_time) FROM score_metadata WHERE stream_id = %s) AS scored_until
+        """
+
+        async with self.get_connection() as cursor:
+            await cursor.execute(query, (stream_id, stream_id, stream_id, stream_id))
+            row = await cursor.fetchone()
+        return {
+            "frames": int(row["last_frame"]) + 1,
+            "chunks": 0 if row["last_chunk"] is None else int(row["last_chunk"]) + 1,
+            "scored_until": float(row["scored_until"] or 0.0),
+        }
+
+    async def get_compactable_streams(self, limit: int = 20) -> List[str]:
+        query = """
+            SELECT s.stream_id
+            FROM stream_metadata s
+            WHERE s.status = 'COMPLETED'
+              AND EXISTS (SELECT 1 FROM video_metadata v WHERE v.stream_id = s.stream_id)
+            LIMIT %s
+        """
+        async with self.get_connection() as cursor:
+            await cursor.execute(query, (limit,))
+            rows = await cursor.fetchall()
+        return [row["stream_id"] for row in rows]
+
+    async def compact_stream_frames(self, stream_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Collapse the video_metadata rows of a COMPLETED stream into its
+        frame_manifest row and delete them, in one transaction.
+
+        Args:
+            stream_id: The stream identifier
+
+        Returns:
+            {"stream_id", "frames": frames in the manifest, "compacted": rows deleted},
+            or None when the stream was skipped
+        """
+        async with self.get_connection() as cursor:
+            await cursor.execute("START TRANSACTION")
+            # Locks the stream row: a retried job cannot restart the stream meanwhile
+            await cursor.execute(
+                "SELECT status FROM stream_metadata WHERE stream_id = %s FOR UPDATE", (stream_id,)
+            )
+            statuses = {row["status"] for row in await cursor.fetchall()}
+            if statuses != {"COMPLETED"}:
+                logger.info(f"[AuroraService] not compacting {stream_id}: status {statuses or None}")
+                return None
+
+            await cursor.execute(
+                """
+                SELECT filename, frame_index, timestamp, pts, width, height
+                FROM video_metadata
+                WHERE stream_id = %s
+                ORDER BY frame_index ASC
+                FOR UPDATE
+                """,
+                (stream_id,),
+            )
+            rows = await cursor.fetchall()
+            await cursor.execute(
+                f"SELECT manifest, width, height FROM {FRAME_MANIFEST_TABLE} WHERE stream_id = %s FOR UPDATE",
+                (stream_id,),
+            )
+            existing = await cursor.fetchone()
+
+            manifest_row = build_manifest_row(stream_id, rows, existing)
+            if manifest_row is None:
+                return None
+            columns = list(manifest_row.keys())
+            updates = ", ".join(f"{col}=VALUES({col})" for col in columns if col != "stream_id")
+            await cursor.execute(
+                f"""
+                INSERT INTO {FRAME_MANIFEST_TABLE} ({', '.join(columns)})
+                VALUES ({', '.join(['%s'] * len(columns))})
+                ON DUPLICATE KEY UPDATE {updates}
+                """,
+                list(manifest_row.values()),
+            )
+            await cursor.execute(
+                "DELETE FROM video_metadata WHERE stream_id = %s AND frame_index <= %s",
+                (stream_id, rows[-1]["frame_index"]),
+            )
+            compacted = cursor.rowcount
+        return {"stream_id": stream_id, "frames": manifest_row["frame_count"], "compacted": compacted}
+
     async def close(self):
-        """Close the connection pool."""
-        if self.pool:
-            self.pool.close()
-            await self.pool.wait_closed()
-            logger.info("Connection pool closed")
+        """Close the shared connection pool (at process shutdown)."""
+        logger.info(f"[AuroraService] pool usage at close: {self.shared.stats()}")
+        logger.info(f"[AuroraService] query cache at close: {self.cache.stats()}")
+        get_metrics_sink().flush()
+        await self.shared.close()
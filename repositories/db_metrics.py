@@ -0,0 +1,329 @@
+import os
+import re
+import json
+import time
+import logging
+import threading
+import functools
+
+from typing import Any, Dict, Optional, Tuple
+
+# Shared by the Batch repositories and the API lambda (packaged via serverless.yaml),
+# so it only uses the standard library and reads its settings from the environment.
+# "video-highlights" is the Batch job's app logger (utils/logger.py).
+logger = logging.getLogger("video-highlights")
+if logger.level == logging.NOTSET:
+    logger.setLevel(logging.INFO)
+
+# "memory" (summaries in the logs), "emf" (CloudWatch embedded metric format on stdout) or "none"
+DB_METRICS_SINK = os.environ.get("DB_METRICS_SINK", "memory")
+DB_METRICS_NAMESPACE = os.environ.get("DB_METRICS_NAMESPACE", "SnipSnap/DB")
+# Queries slower than this are logged with their SQL
+DB_SLOW_QUERY_SECONDS = float(os.environ.get("DB_SLOW_QUERY_SECONDS", 0.5))
+
+# Upper bounds (ms) of the latency histogram buckets; the last bucket is open-ended.
+# The sub-millisecond ones resolve SQLite statements and cached Aurora reads.
+LATENCY_BUCKETS_MS = (0.05, 0.1, 0.25, 0.5, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000)
+
+_MetricKey = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+
+class Histogram:
+    """Fixed-bucket latency histogram; quantiles interpolate linearly inside a bucket."""
+
+    __slots__ = ("counts", "count", "total_ms", "max_ms")
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, ms: float):
+        i = 0
+        while i < len(LATENCY_BUCKETS_MS) and ms > LATENCY_BUCKETS_MS[i]:
+            i += 1
+        self.counts[i] += 1
+        self.count += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+
+    def quantile(self, q: float) -> float:
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            if n and seen + n >= rank:
+                lower = LATENCY_BUCKETS_MS[i - 1] if i > 0 else 0.0
+                upper = min(LATENCY_BUCKETS_MS[i] if i < len(LATENCY_BUCKETS_MS) else self.max_ms, self.max_ms)
+                lower = min(lower, upper)
+                return round(lower + (upper - lower) * (rank - seen) / n, 3)
+            seen += n
+        return round(self.max_ms, 3)
+
+    def summary(self) -> Dict[str, float]:
+        return {
+            "count": self.count,
+            "avg_ms": round(self.total_ms / self.count, 3) if self.count else 0.0,
+            "p50_ms": self.quantile(0.5),
+            "p95_ms": self.quantile(0.95),
+            "p99_ms": self.quantile(0.99),
+            "max_ms": round(self.max_ms, 3),
+        }
+
+
+class MetricsSink:
+    """
+    Destination of the DB metrics. The base class drops everything; subclasses
+    record timings (histograms), counters and gauges keyed by name and tags.
+    """
+
+    def timing(self, name: str, seconds: float, **tags):
+        pass
+
+    def increment(self, name: str, value: int = 1, **tags):
+        pass
+
+    def gauge(self, name: str, value: float, **tags):
+        pass
+
+    def flush(self):
+        """Publish what was recorded (end of a job or of a lambda invocation)."""
+
+
+class InMemoryMetricsSink(MetricsSink):
+    """Aggregates in process; flush() logs one summary line per metric."""
+
+    def __init__(self):
+        self._lock = threading.Lock()  # SQLite statements report from worker threads
+        self.timings: Dict[_MetricKey, Histogram] = {}
+        self.counters: Dict[_MetricKey, int] = {}
+        self.gauges: Dict[_MetricKey, Dict[str, float]] = {}
+
+    @staticmethod
+    def _key(name: str, tags: Dict[str, Any]) -> _MetricKey:
+        return name, tuple(sorted((k, str(v)) for k, v in tags.items()))
+
+    @staticmethod
+    def _label(key: _MetricKey) -> str:
+        name, tags = key
+        return name + "".join(f" {k}={v}" for k, v in tags)
+
+    def timing(self, name: str, seconds: float, **tags):
+        with self._lock:
+            key = self._key(name, tags)
+            histogram = self.timings.get(key)
+            if histogram is None:
+                histogram = self.timings[key] = Histogram()
+            histogram.observe(seconds * 1000)
+
+    def increment(self, name: str, value: int = 1, **tags):
+        with self._lock:
+            key = self._key(name, tags)
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def gauge(self, name: str, value: float, **tags):
+        with self._lock:
+            key = self._key(name, tags)
+            current = self.gauges.get(key)
+            peak = value if current is None else max(current["max"], value)
+            self.gauges[key] = {"value": value, "max": peak}
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {
+                "timings": {self._label(k): h.summary() for k, h in self.timings.items()},
+                "counters": {self._label(k): v for k, v in self.counters.items()},
+                "gauges": {self._label(k): dict(v) for k, v in self.gauges.items()},
+            }
+
+    def flush(self):
+        snapshot = self.snapshot()
+        for kind in ("timings", "counters", "gauges"):
+            for label, value in sorted(snapshot[kind].items()):
+                logger.info(f"[DbMetrics] {label} {value}")
+
+
+class EmfMetricsSink(InMemoryMetricsSink):
+    """
+    Aggregates like InMemoryMetricsSink; flush() prints the aggregates since
+    the previous flush in CloudWatch embedded metric format, which Lambda and
+    Batch (awslogs) turn into CloudWatch metrics without API calls.
+    """
+
+    def __init__(self, namespace: str = DB_METRICS_NAMESPACE):
+        super().__init__()
+        self.namespace = namespace
+
+    def _emit(self, tags: Tuple[Tuple[str, str], ...], values: Dict[str, Tuple[float, str]]):
+        document = {
+            "_aws": {
+                "Timestamp": int(time.time() * 1000),
+                "CloudWatchMetrics": [{
+                    "Namespace": self.namespace,
+                    "Dimensions": [[k for k, _ in tags]],
+                    "Metrics": [{"Name": name, "Unit": unit} for name, (_, unit) in values.items()],
+                }],
+            },
+            **dict(tags),
+            **{name: value for name, (value, _) in values.items()},
+        }
+        print(json.dumps(document), flush=True)
+
+    def flush(self):
+        with self._lock:
+            timings, self.timings = self.timings, {}
+            counters, self.counters = self.counters, {}
+            gauges, self.gauges = self.gauges, {}
+        for (name, tags), histogram in timings.items():
+            summary = histogram.summary()
+            self._emit(tags, {
+                f"{name}.count": (summary["count"], "Count"),
+                f"{name}.p50": (summary["p50_ms"], "Milliseconds"),
+                f"{name}.p95": (summary["p95_ms"], "Milliseconds"),
+                f"{name}.p99": (summary["p99_ms"], "Milliseconds"),
+                f"{name}.max": (summary["max_ms"], "Milliseconds"),
+            })
+        for (name, tags), value in counters.items():
+            self._emit(tags, {name: (value, "Count")})
+        for (name, tags), value in gauges.items():
+            self._emit(tags, {name: (value["value"], "Count"), f"{name}.max": (value["max"], "Count")})
+
+
+def _create_sink(kind: str) -> MetricsSink:
+    if kind == "emf":
+        return EmfMetricsSink()
+    if kind == "none":
+        return MetricsSink()
+    return InMemoryMetricsSink()
+
+
+_sink: MetricsSink = _create_sink(DB_METRICS_SINK)
+
+
+def get_metrics_sink() -> MetricsSink:
+    return _sink
+
+
+def set_metrics_sink(sink: MetricsSink):
+    """Route the DB metrics of the process to another sink (e.g. a StatsD client adapter)."""
+    global _sink
+    _sink = sink
+
+
+_TABLE = re.compile(r"\b(?:FROM|INTO|UPDATE)\s+`?(\w+)", re.IGNORECASE)
+_UPSERT = re.compile(r"\bON\s+(?:DUPLICATE\s+KEY|CONFLICT)\b", re.IGNORECASE)
+
+
+@functools.lru_cache(maxsize=1024)
+def query_type(sql: str) -> str:
+    """Histogram label of a statement: "<verb>:<first table>", e.g. "select:audio_metadata"."""
+    words = sql.split(None, 1)
+    verb = words[0].lower() if words else "other"
+    if verb == "insert" and _UPSERT.search(sql):
+        verb = "upsert"
+    match = _TABLE.search(sql)
+    return f"{verb}:{match.group(1)}" if match else verb
+
+
+class DbMetrics:
+    """
+    Instrumentation of one repository (component): pool acquire waits,
+    connections in flight, per-query-type latency, rows read/written and a
+    slow-query log. Reports to the process-wide sink unless given one.
+    """
+
+    def __init__(self, component: str, sink: Optional[MetricsSink] = None, slow_query_seconds: float = DB_SLOW_QUERY_SECONDS):
+        self.component = component
+        self._sink = sink
+        self.slow_query_seconds = slow_query_seconds
+        self.in_flight = 0
+
+    @property
+    def sink(self) -> MetricsSink:
+        return self._sink if self._sink is not None else get_metrics_sink()
+
+    def acquired(self, waited: float):
+        """A connection was checked out after waiting `waited` seconds (quota and pool)."""
+        self.in_flight += 1
+        self.sink.timing("db.pool.acquire_wait", waited, component=self.component)
+        self.sink.gauge("db.connections.in_flight", self.in_flight, component=self.component)
+
+    def released(self):
+        self.in_flight -= 1
+        self.sink.gauge("db.connections.in_flight", self.in_flight, component=self.component)
+
+    def observe(self, sql: str, seconds: float, rows_read: int = 0, rows_written: int = 0, failed: bool = False):
+        kind = query_type(sql)
+        sink = self.sink
+        sink.timing("db.query.latency", seconds, component=self.component, query=kind)
+        if rows_read:
+            sink.increment("db.rows.read", rows_read, component=self.component, query=kind)
+        if rows_written:
+            sink.increment("db.rows.written", rows_written, component=self.component, query=kind)
+        if failed:
+            sink.increment("db.query.errors", component=self.component, query=kind)
+        if seconds >= self.slow_query_seconds:
+            sink.increment("db.query.slow", component=self.component, query=kind)
+            statement = " ".join(sql.split())
+            logger.warning(f"[DbMetrics] slow query ({self.component}, {kind}) {seconds * 1000:.0f} ms: {statement[:500]}")
+
+    def rows_read(self, sql: str, count: int):
+        if count:
+            self.sink.increment("db.rows.read", count, component=self.component, query=query_type(sql))
+
+    def wrap(self, cursor) -> "InstrumentedCursor":
+        return InstrumentedCursor(cursor, self)
+
+
+def _is_write(sql: str) -> bool:
+    return query_type(sql).split(":", 1)[0] in ("insert", "upsert", "update", "delete", "replace")
+
+
+class InstrumentedCursor:
+    """
+    aiomysql cursor proxy timing execute()/executemany() and counting the rows
+    the fetch*() calls return. With a server-side cursor, execute() covers the
+    first round trip only and the fetches stream the rest.
+    """
+
+    def __init__(self, cursor, metrics: DbMetrics):
+        self._cursor = cursor
+        self._metrics = metrics
+        self._sql = ""
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    async def _timed(self, method, query: str, args):
+        self._sql = query
+        started = time.perf_counter()
+        try:
+            result = await method(query, args)
+        except Exception:
+            self._metrics.observe(query, time.perf_counter() - started, failed=True)
+            raise
+        written = max(self._cursor.rowcount, 0) if _is_write(query) else 0
+        self._metrics.observe(query, time.perf_counter() - started, rows_written=written)
+        return result
+
+    async def execute(self, query: str, args=None):
+        return await self._timed(self._cursor.execute, query, args)
+
+    async def executemany(self, query: str, args):
+        return await self._timed(self._cursor.executemany, query, args)
+
+    async def fetchone(self):
+        row = await self._cursor.fetchone()
+        if row is not None:
+            self._metrics.rows_read(self._sql, 1)
+        return row
+
+    async def fetchmany(self, size=None):
+        rows = await self._cursor.fetchmany(size)
+        self._metrics.rows_read(self._sql, len(rows))
+        return rows
+
+    async def fetchall(self):
+        rows = await self._cursor.fetchall()
+        self._metrics.rows_read(self._sql, len(rows))
+        return rows
@@ -0,0 +1,178 @@
+import os
+import asyncio
+import numpy as np
+import aiofiles
+
+from typing import Dict, Optional, Set, Tuple
+from repositories.s3_service import S3Service
+from utils.frame_segments import FrameSegmentWriter, decode_segment_index, frame_range, segment_index_size
+from utils.helpers import get_video_frame_filename, get_video_frame_index, get_video_segment_filename
+from utils.logger import app_logger as logger
+from config import FRAME_SEGMENT_SECONDS, IMAGE_BUCKET_PREFIX, SEGMENT_BUCKET_PREFIX, VIDEO_FRAME_SAMPLE_RATE
+
+
+class FrameSegmentStore:
+    """
+    Sampled frames of a stream in S3 as packed segments.
+
+    Frames are grouped into one object per FRAME_SEGMENT_SECONDS under
+    streams/<stream_id>/images/segments/ instead of one PUT per frame; single
+    frames are read back with byte-range GETs through the segment's index.
+    Highlight thumbnails and the stream's cover (frame 0) are published as
+    per-frame objects under images/frame/, the keys the frontend and CDN
+    resolve thumbnails to.
+    """
+
+    def __init__(
+        self,
+        s3: S3Service,
+        frames_dir: str,
+        frames_per_segment: int = FRAME_SEGMENT_SECONDS * VIDEO_FRAME_SAMPLE_RATE,
+        max_cached_indexes: int = 64,
+    ):
+        self.s3 = s3
+        self.frames_dir = frames_dir
+        self.frames_per_segment = frames_per_segment
+        self.writer = FrameSegmentWriter(frames_per_segment)
+        self.max_cached_indexes = max_cached_indexes
+        # (stream_id, segment) -> index of an uploaded segment
+        self._indexes: Dict[tuple, np.ndarray] = {}
+        self._published: Set[tuple] = set()
+        self.segments_uploaded = 0
+
+    def segment_key(self, stream_id: str, segment: int) -> str:
+        return self.s3._generate_s3_key(stream_id, get_video_segment_filename(segment), SEGMENT_BUCKET_PREFIX, add_timestamp=False)
+
+    @property
+    def pending_from(self) -> Optional[int]:
+        """First frame of the open segment (not queued for upload yet), None when it is empty."""
+        return self.writer.frames[0][0] if self.writer.frames else None
+
+    async def add_frame(self, stream_id: str, frame_index: int, data: bytes, durable_frames: int = 0) -> Optional[Tuple[int, asyncio.Task]]:
+        """
+        Add an encoded frame; uploads the segment it closes in the background.
+
+        Args:
+            stream_id: Stream being ingested
+            frame_index: Index of the frame (increasing)
+            data: JPEG bytes of the frame
+            durable_frames: Frames already ingested by a previous attempt; segments
+                made only of those are in S3 and not uploaded again
+
+        Returns:
+            (first frame, upload task) of the segment queued for upload, if any
+        """
+        first, last = self._open_range()
+        closed = self.writer.add(frame_index, data)
+        if closed is not None and last >= durable_frames:
+            return first, await self._upload_segment(stream_id, *closed)
+        return None
+
+    async def flush(self, stream_id: str, durable_frames: int = 0) -> Optional[Tuple[int, asyncio.Task]]:
+        """Upload the last, possibly partial, segment (end of the stream)."""
+        first, last = self._open_range()
+        closed = self.writer.flush()
+        if closed is not None and last >= durable_frames:
+            return first, await self._upload_segment(stream_id, *closed)
+        return None
+
+    def _open_range(self) -> Tuple[Optional[int], Optional[int]]:
+        if not self.writer.frames:
+            return None, None
+        return self.writer.frames[0][0], self.writer.frames[-1][0]
+
+    async def _upload_segment(self, stream_id: str, segment: int, data: bytes) -> asyncio.Task:
+        await self.s3.wait_for_capacity()
+        task = self.s3.upload_object_nowait(
+            stream_id=stream_id,
+            filename=get_video_segment_filename(segment),
+            data=data,
+            prefix=SEGMENT_BUCKET_PREFIX,
+            content_type="application/octet-stream",
+        )
+        self.segments_uploaded += 1
+        return task
+
+    async def publish_cover(self, stream_id: str, frame_index: int, data: bytes) -> asyncio.Task:
+        """
+        Upload a frame as its own object under images/frame/ in the background,
+        without waiting for its segment: the dashboard shows frame 0 of every
+        stream as its cover.
+
+        Returns:
+            The upload task
+        """
+        await self.s3.wait_for_capacity()
+        task = self.s3.upload_object_nowait(
+            stream_id=stream_id,
+            filename=get_video_frame_filename(frame_index),
+            data=data,
+            prefix=IMAGE_BUCKET_PREFIX,
+            content_type="image/jpeg",
+        )
+        self._published.add((stream_id, frame_index))
+        return task
+
+    async def _segment_index(self, stream_id: str, segment: int) -> np.ndarray:
+        key = (stream_id, segment)
+        index = self._indexes.get(key)
+        if index is None:
+            # A full segment's header and index fit in one ranged GET
+            head = await self.s3.download_range(self.segment_key(stream_id, segment), 0, segment_index_size(self.frames_per_segment) - 1)
+            index = decode_segment_index(head)
+            if len(self._indexes) >= self.max_cached_indexes:
+                self._indexes.pop(next(iter(self._indexes)))
+            self._indexes[key] = index
+        return index
+
+    async def read_frame(self, stream_id: str, frame_index: int) -> Optional[bytes]:
+        """
+        JPEG bytes of a frame from its segment in S3 (two ranged GETs, one once the index is cached).
+
+        Returns:
+            The frame bytes, or None when its segment does not hold it
+        """
+        segment = self.writer.segment_of(frame_index)
+        byte_range = frame_range(await self._segment_index(stream_id, segment), frame_index)
+        if byte_range is None:
+            return None
+        return await self.s3.download_range(self.segment_key(stream_id, segment), *byte_range)
+
+    async def publish_thumbnail(self, stream_id: str, frame_index: int) -> Optional[str]:
+        """
+        Make a frame addressable as streams/<stream_id>/images/frame/<filename>
+        (where thumbnails are resolved). Uses the local frame file, falling
+        back to a byte-range read of the frame's segment.
+
+        Returns:
+            The frame filename (the highlight's thumbnail), or None when the frame is unavailable
+        """
+        filename = get_video_frame_filename(frame_index)
+        if (stream_id, frame_index) in self._published:
+            return filename
+
+        path = os.path.join(self.frames_dir, filename)
+        data = None
+        if os.path.exists(path):
+            async with aiofiles.open(path, "rb") as f:
+                data = await f.read()
+        else:
+            try:
+                data = await self.read_frame(stream_id, frame_index)
+            except Exception as e:
+                logger.warning(f"[FrameSegmentStore] could not read frame {frame_index} of {stream_id} from its segment: {e}")
+        if not data:
+            logger.warning(f"[FrameSegmentStore] thumbnail frame {frame_index} of {stream_id} is unavailable")
+            return None
+
+        await self.s3.upload_object(stream_id, filename, data, IMAGE_BUCKET_PREFIX, content_type="image/jpeg")
+        self._published.add((stream_id, frame_index))
+        return filename
+
+    async def publish_thumbnails(self, stream_id: str, highlights: list):
+        """Publish the thumbnail frames of highlights concurrently (failures are logged)."""
+        frames = sorted({get_video_frame_index(h["thumbnail"]) for h in highlights if h.get("thumbnail")})
+        results = await asyncio.gather(*[self.publish_thumbnail(stream_id, idx) for idx in frames], return_exceptions=True)
+        for idx, result in zip(frames, results):
+            if isinstance(result, Exception):
+                logger.error(f"[FrameSegmentStore] failed to publish thumbnail frame {idx} of {stream_id}: {result}")
@@ -7,9 +7,92 @@ import mimetypes
 
 from PIL import Image
 from pathlib import Path
-from config import CDN_DOMAIN
-from typing import Optional, Dict, Any
+from contextlib import AsyncExitStack
+from aiobotocore.config import AioConfig
+from typing import Awaitable, Callable, Optional, Dict, Any
+from utils.helpers import retry_with_backoff
 from utils.logger import app_logger as logger
+from config import (
+    CDN_DOMAIN,
+    S3_UPLOAD_CONCURRENCY,
+    S3_UPLOAD_MAX_INFLIGHT_BYTES,
+    S3_UPLOAD_RETRIES,
+    S3_UPLOAD_BACKOFF_SECONDS,
+)
+
+
+class UploadScheduler:
+    """
+    Bounded background uploads behind the *_nowait methods.
+
+    At most max_concurrency uploads run at once; the rest wait for a slot.
+    Bytes of queued and running uploads are capped by max_inflight_bytes:
+    producers await wait_for_capacity() before queueing more, which is the
+    backpressure (like the write-behind buffers of the DB writes).
+    """
+
+    def __init__(self, max_concurrency: int = S3_UPLOAD_CONCURRENCY, max_inflight_bytes: int = S3_UPLOAD_MAX_INFLIGHT_BYTES):
+        self.max_concurrency = max_concurrency
+        self.max_inflight_bytes = max_inflight_bytes
+        self._slots = asyncio.Semaphore(max_concurrency)
+        self._room = asyncio.Event()
+        self._room.set()
+        self.pending = set()
+
+        self.inflight_bytes = 0
+        self.peak_inflight_bytes = 0
+        self.queued = 0
+        self.completed = 0
+        self.failed = 0
+        self.bytes_uploaded = 0
+
+    def add(self, size: int, upload: Callable[[], Awaitable[Any]]) -> asyncio.Task:
+        """Queue upload() (a coroutine function) of an object of size bytes."""
+        self.queued += 1
+        self.inflight_bytes += size
+        self.peak_inflight_bytes = max(self.peak_inflight_bytes, self.inflight_bytes)
+        if self.inflight_bytes >= self.max_inflight_bytes:
+            self._room.clear()
+        task = asyncio.create_task(self._run(size, upload))
+        self.pending.add(task)
+        task.add_done_callback(self.pending.discard)
+        return task
+
+    async def _run(self, size: int, upload: Callable[[], Awaitable[Any]]):
+        try:
+            async with self._slots:
+                result = await upload()
+            self.completed += 1
+            self.bytes_uploaded += size
+            return result
+        except Exception:
+            self.failed += 1
+            raise
+        finally:
+            self.inflight_bytes -= size
+            if self.inflight_bytes < self.max_inflight_bytes:
+                self._room.set()
+
+    async def wait_for_capacity(self):
+        await self._room.wait()
+
+    async def drain(self, timeout: Optional[float] = None) -> bool:
+        """Wait for every queued upload; False when the timeout expired first."""
+        if not self.pending:
+            return True
+        _, not_done = await asyncio.wait(set(self.pending), timeout=timeout)
+        return not not_done
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "pending": len(self.pending),
+            "queued": self.queued,
+            "completed": self.completed,
+            "failed": self.failed,
+            "bytes_uploaded": self.bytes_uploaded,
+            "inflight_bytes": self.inflight_bytes,
+            "peak_inflight_bytes": self.peak_inflight_bytes,
+        }
 
 
 class S3Service:
@@ -53,11 +136,58 @@ class S3Service:
             # region_name=self.region_name,
         )
 
-        # Track pending uploads
-        self.pending_uploads = set()
+        # One long-lived client (and its connection pool) per service, opened on first use
+        self._client = None
+        self._client_stack: Optional[AsyncExitStack] = None
+        self._client_lock = asyncio.Lock()
+
+        # Background uploads of the *_nowait methods
+        self.scheduler = UploadScheduler()
 
         logger.info(f"AsyncS3Service initialized for bucket: {bucket_name}")
 
+    @property
+    def pending_uploads(self):
+        return self.scheduler.pending
+
+    async def _get_client(self):
+        if self._client is None:
+            async with self._client_lock:
+                if self._client is None:
+                    stack = AsyncExitStack()
+                    self._client = await stack.enter_async_context(
+                        self.session.client(
+                            "s3",
+                            config=AioConfig(
+                                max_pool_connections=self.scheduler.max_concurrency,
+                                # Retries with backoff happen in _put_object
+                                retries={"max_attempts": 1, "mode": "standard"},
+                            ),
+                        )
+                    )
+                    self._client_stack = stack
+        return self._client
+
+    @retry_with_backoff(retries=S3_UPLOAD_RETRIES, backoff_in_seconds=S3_UPLOAD_BACKOFF_SECONDS, max_backoff_in_seconds=10)
+    async def _put_object(self, s3_key: str, body: bytes, extra_args: Dict[str, Any]):
+        s3 = await self._get_client()
+        return await s3.put_object(Bucket=self.bucket_name, Key=s3_key, Body=body, **extra_args)
+
+    def _upload_result(self, s3_key: str, content_type: str, body: bytes, response: Dict[str, Any]) -> Dict[str, Any]:
+        # Prefer CDN domain for public HTTPS if configured
+        public_https = (
+            f"https://{CDN_DOMAIN}/{s3_key}" if CDN_DOMAIN else f"https://{self.bucket_name}.s3.{self.region_name}.amazonaws.com/{s3_key}"
+        )
+        return {
+            "key": s3_key,
+            "bucket": self.bucket_name,
+            "url": f"s3://{self.bucket_name}/{s3_key}",
+            "https_url": public_https,
+            "etag": response.get("ETag", "").strip('"'),
+            "content_type": content_type,
+            "size": len(body),
+        }
+
     def _get_content_type(self, filename: str) -> str:
         """Determine content type from filename."""
         content_type, _ = mimetypes.guess_type(filename)
@@ -135,25 +265,8 @@ class S3Service:
         if metadata:
             extra_args["Metadata"] = metadata
 
-        async with self.session.client("s3") as s3:
-            response = await s3.put_object(
-                Bucket=self.bucket_name, Key=s3_key, Body=file_data, **extra_args
-            )
-
-        # Prefer CDN domain for public HTTPS if configured
-        public_https = (
-            f"https://{CDN_DOMAIN}/{s3_key}" if CDN_DOMAIN else f"https://{self.bucket_name}.s3.{self.region_name}.amazonaws.com/{s3_key}"
-        )
-
-        result = {
-            "key": s3_key,
-            "bucket": self.bucket_name,
-            "url": f"s3://{self.bucket_name}/{s3_key}",
-            "https_url": public_https,
-            "etag": response.get("ETag", "").strip('"'),
-            "content_type": content_type,
-            "size": len(file_data),
-        }
+        response = await self._put_object(s3_key, file_data, extra_args)
+        result = self._upload_result(s3_key, content_type, file_data, response)
 
         logger.info(f"Uploaded audio: {s3_key}")
         return result
@@ -194,6 +307,12 @@ class S3Service:
         Returns:
             Dictionary with upload details (key, url, etag)
         """
+        filename, image_byte_array = self._encode_image(image_path, image_file, filename)
+        return await self._upload_image_bytes(
+            stream_id, filename, image_byte_array, metadata, add_timestamp, storage_class
+        )
+
+    def _encode_image(self, image_path: Optional[str], image_file: Image, filename: Optional[str]):
         if image_path:
             filename = filename or os.path.basename(image_path)
             image_file = Image.open(image_path)
@@ -202,9 +321,18 @@ class S3Service:
 
         if not filename:
             raise ValueError("filename must be provided when using file_data")
-        
-        image_byte_array = self._get_image_byte_array(image_file, filename.split('.')[-1])
-        
+
+        return filename, self._get_image_byte_array(image_file, filename.split('.')[-1])
+
+    async def _upload_image_bytes(
+        self,
+        stream_id: str,
+        filename: str,
+        image_byte_array: bytes,
+        metadata: Optional[Dict[str, str]] = None,
+        add_timestamp: bool = True,
+        storage_class: str = "STANDARD",
+    ) -> Dict[str, Any]:
         # Place frames under streams/<stream_id>/images/... so they match the CDN rule
         s3_key = self._generate_s3_key(stream_id, filename, self.image_prefix, add_timestamp)
         content_type = self._get_content_type(filename)
@@ -214,25 +342,8 @@ class S3Service:
         if metadata:
             extra_args["Metadata"] = metadata
 
-        async with self.session.client("s3") as s3:
-            response = await s3.put_object(
-                Bucket=self.bucket_name, Key=s3_key, Body=image_byte_array, **extra_args
-            )
-
-        # Prefer CDN domain for public HTTPS if configured
-        public_https = (
-            f"https://{CDN_DOMAIN}/{s3_key}" if CDN_DOMAIN else f"https://{self.bucket_name}.s3.{self.region_name}.amazonaws.com/{s3_key}"
-        )
-
-        result = {
-            "key": s3_key,
-            "bucket": self.bucket_name,
-            "url": f"s3://{self.bucket_name}/{s3_key}",
-            "https_url": public_https,
-            "etag": response.get("ETag", "").strip('"'),
-            "content_type": content_type,
-            "size": len(image_byte_array),
-        }
+        response = await self._put_object(s3_key, image_byte_array, extra_args)
+        result = self._upload_result(s3_key, content_type, image_byte_array, response)
 
         logger.info(f"Uploaded image: {s3_key}")
         return result
@@ -255,16 +366,17 @@ class S3Service:
         add_timestamp: bool = True,
     ) -> asyncio.Task:
         """
-        Fire-and-forget audio upload (non-blocking).
+        Background audio upload through the upload scheduler (non-blocking).
+        Await wait_for_capacity() first to respect the in-flight byte cap.
 
         Returns:
             asyncio.Task that can be awaited later if needed
         """
-        task = asyncio.create_task(
-            self.upload_audio(stream_id, file_path, file_data, filename, metadata, add_timestamp)
+        size = len(file_data) if file_data is not None else os.path.getsize(file_path)
+        task = self.scheduler.add(
+            size,
+            lambda: self.upload_audio(stream_id, file_path, file_data, filename, metadata, add_timestamp),
         )
-        self.pending_uploads.add(task)
-        task.add_done_callback(lambda t: self.pending_uploads.discard(t))
         task.add_done_callback(self._handle_upload_result)
         return task
 
@@ -278,19 +390,86 @@ class S3Service:
         add_timestamp: bool = True,
     ) -> asyncio.Task:
         """
-        Fire-and-forget image upload (non-blocking).
+        Background image upload through the upload scheduler (non-blocking).
+        The image is encoded right away, so the caller may release it; await
+        wait_for_capacity() first to respect the in-flight byte cap.
 
         Returns:
             asyncio.Task that can be awaited later if needed
         """
-        task = asyncio.create_task(
-            self.upload_image(stream_id, image_path, image_file, filename, metadata, add_timestamp)
+        filename, image_byte_array = self._encode_image(image_path, image_file, filename)
+        task = self.scheduler.add(
+            len(image_byte_array),
+            lambda: self._upload_image_bytes(stream_id, filename, image_byte_array, metadata, add_timestamp),
         )
-        self.pending_uploads.add(task)
-        task.add_done_callback(lambda t: self.pending_uploads.discard(t))
         task.add_done_callback(self._handle_upload_result)
         return task
 
+    async def upload_object(
+        self,
+        stream_id: str,
+        filename: str,
+        data: bytes,
+        prefix: str,
+        content_type: Optional[str] = None,
+        metadata: Optional[Dict[str, str]] = None,
+        storage_class: str = "STANDARD",
+    ) -> Dict[str, Any]:
+        """
+        Upload bytes under streams/<stream_id>/<prefix><filename>.
+
+        Args:
+            stream_id: Stream the object belongs to
+            filename: Object name within the prefix
+            data: Object bytes
+            prefix: Key prefix (e.g. SEGMENT_BUCKET_PREFIX)
+            content_type: MIME type (default: guessed from filename)
+            metadata: Optional metadata dict
+            storage_class: S3 storage class
+
+        Returns:
+            Dict with upload details
+        """
+        s3_key = self._generate_s3_key(stream_id, filename, prefix, add_timestamp=False)
+        content_type = content_type or self._get_content_type(filename)
+
+        extra_args = {"ContentType": content_type, "StorageClass": storage_class}
+
+        if metadata:
+            extra_args["Metadata"] = metadata
+
+        response = await self._put_object(s3_key, data, extra_args)
+        result = self._upload_result(s3_key, content_type, data, response)
+
+        logger.info(f"Uploaded object: {s3_key}")
+        return result
+
+    def upload_object_nowait(
+        self,
+        stream_id: str,
+        filename: str,
+        data: bytes,
+        prefix: str,
+        content_type: Optional[str] = None,
+        metadata: Optional[Dict[str, str]] = None,
+    ) -> asyncio.Task:
+        """
+        Background upload_object through the upload scheduler (non-blocking).
+
+        Returns:
+            asyncio.Task that can be awaited later if needed
+        """
+        task = self.scheduler.add(
+            len(data),
+            lambda: self.upload_object(stream_id, filename, data, prefix, content_type, metadata),
+        )
+        task.add_done_callback(self._handle_upload_result)
+        return task
+
+    async def wait_for_capacity(self):
+        """Backpressure: wait until the queued/in-flight upload bytes are below the cap."""
+        await self.scheduler.wait_for_capacity()
+
     async def download_audio(
         self, s3_key: str, local_path: Optional[str] = None
     ) -> bytes:
@@ -304,10 +483,10 @@ class S3Service:
         Returns:
             Audio file bytes
         """
-        async with self.session.client("s3") as s3:
-            response = await s3.get_object(Bucket=self.bucket_name, Key=s3_key)
-            async with response["Body"] as stream:
-                file_data = await stream.read()
+        s3 = await self._get_client()
+        response = await s3.get_object(Bucket=self.bucket_name, Key=s3_key)
+        async with response["Body"] as stream:
+            file_data = await stream.read()
 
         if local_path:
             async with aiofiles.open(local_path, "wb") as f:
@@ -329,10 +508,10 @@ class S3Service:
         Returns:
             Image file bytes
         """
-        async with self.session.client("s3") as s3:
-            response = await s3.get_object(Bucket=self.bucket_name, Key=s3_key)
-            async with response["Body"] as stream:
-                file_data = await stream.read()
+        s3 = await self._get_client()
+        response = await s3.get_object(Bucket=self.bucket_name, Key=s3_key)
+        async with response["Body"] as stream:
+            file_data = await stream.read()
 
         if local_path:
             async with aiofiles.open(local_path, "wb") as f:
@@ -341,6 +520,23 @@ class S3Service:
 
         return file_data
 
+    async def download_range(self, s3_key: str, start: int, end: int) -> bytes:
+        """
+        Download bytes start..end (inclusive) of an object with a ranged GET.
+
+        Args:
+            s3_key: S3 key of the object
+            start: First byte
+            end: Last byte (clipped to the object size by S3)
+
+        Returns:
+            The bytes of the range
+        """
+        s3 = await self._get_client()
+        response = await s3.get_object(Bucket=self.bucket_name, Key=s3_key, Range=f"bytes={start}-{end}")
+        async with response["Body"] as stream:
+            return await stream.read()
+
     async def get_presigned_url(
         self, s3_key: str, expiration: int = 3600, http_method: str = "get_object"
     ) -> str:
@@ -355,12 +551,12 @@ class S3Service:
         Returns:
             Presigned URL
         """
-        async with self.session.client("s3") as s3:
-            url = await s3.generate_presigned_url(
-                http_method,
-                Params={"Bucket": self.bucket_name, "Key": s3_key},
-                ExpiresIn=expiration,
-            )
+        s3 = await self._get_client()
+        url = await s3.generate_presigned_url(
+            http_method,
+            Params={"Bucket": self.bucket_name, "Key": s3_key},
+            ExpiresIn=expiration,
+        )
 
         return url
 
@@ -373,5 +569,19 @@ class S3Service:
         """
         if self.pending_uploads:
             logger.info(f"Waiting for {len(self.pending_uploads)} pending uploads...")
-            await asyncio.wait(self.pending_uploads, timeout=timeout)
-            logger.info("All pending uploads completed")
+            if await self.scheduler.drain(timeout=timeout):
+                logger.info("All pending uploads completed")
+            else:
+                logger.warning(f"{len(self.pending_uploads)} uploads still pending after {timeout}s")
+        stats = self.scheduler.stats()
+        if stats["failed"]:
+            logger.error(f"[S3Service] {stats['failed']} uploads failed after retries")
+        logger.info(f"[S3Service] uploads: {stats}")
+
+    async def close(self, timeout: Optional[float] = None):
+        """Drain pending uploads and close the client (at shutdown)."""
+        await self.wait_for_pending_uploads(timeout=timeout)
+        if self._client_stack is not None:
+            await self._client_stack.aclose()
+            self._client_stack = None
+            self._client = None
@@ -0,0 +1,657 @@
+import os
+import json
+import time
+import base64
+import asyncio
+import sqlite3
+import threading
+
+from typing import AsyncIterator, Dict, List, Any, Optional, Sequence
+from utils.logger import app_logger as logger
+from utils.frame_manifest import FrameManifest, build_manifest_row
+from repositories.db_metrics import DbMetrics, get_metrics_sink
+from repositories.storage_backend import (
+    StorageBackend,
+    AUDIO_COLUMNS,
+    SCORE_COLUMNS,
+    project_columns,
+    row_factory,
+    merge_frame_rows,
+)
+from config import SQLITE_DB_PATH, STREAM_FETCH_BATCH, FRAME_MANIFEST_TABLE, HIGHLIGHTS_TABLE
+
+
+# Mirrors alembic/versions (MySQL) closely enough for the pipeline and API queries
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS video_metadata (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    stream_id TEXT NOT NULL,
+    filename TEXT NOT NULL,
+    frame_index INTEGER NOT NULL,
+    timestamp REAL,
+    pts INTEGER,
+    width INTEGER,
+    height INTEGER,
+    created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+CREATE UNIQUE INDEX IF NOT EXISTS uq_video_stream_frame ON video_metadata (stream_id, frame_index);
+
+CREATE TABLE IF NOT EXISTS audio_metadata (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    stream_id TEXT NOT NULL,
+    filename TEXT NOT NULL,
+    chunk_index INTEGER NOT NULL,
+    start_timestamp REAL,
+    end_timestamp REAL,
+    sample_rate INTEGER,
+    captured_at INTEGER,
+    created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    transcript TEXT
+);
+CREATE UNIQUE INDEX IF NOT EXISTS uq_audio_stream_chunk ON audio_metadata (stream_id, chunk_index);
+CREATE INDEX IF NOT EXISTS idx_audio_stream_filename ON audio_metadata (stream_id, filename);
+
+CREATE TABLE IF NOT EXISTS score_metadata (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    stream_id TEXT NOT NULL,
+    start_time REAL NOT NULL,
+    end_time REAL NOT NULL,
+    saliency_score REAL,
+    caption TEXT,
+    highlight_score REAL,
+    created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    updated_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+DROP INDEX IF EXISTS idx_score_stream_time;
+CREATE UNIQUE INDEX IF NOT EXISTS uq_score_stream_start ON score_metadata (stream_id, start_time);
+
+CREATE TABLE IF NOT EXISTS stream_metadata (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    stream_id TEXT NOT NULL,
+    stream_url TEXT NOT NULL,
+    status TEXT NOT NULL,
+    message TEXT,
+    highlights TEXT,
+    score_sketch TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_stream_stream_id ON stream_metadata (stream_id);
+CREATE INDEX IF NOT EXISTS idx_status_stream ON stream_metadata (status, stream_id);
+
+CREATE TABLE IF NOT EXISTS highlights (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    stream_id TEXT NOT NULL,
+    start_time REAL NOT NULL,
+    end_time REAL NOT NULL,
+    title TEXT,
+    caption TEXT,
+    thumbnail TEXT,
+    snap_reason TEXT,
+    created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    updated_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE (stream_id, start_time)
+);
+
+CREATE TABLE IF NOT EXISTS frame_manifest (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    stream_id TEXT NOT NULL UNIQUE,
+    frame_count INTEGER NOT NULL,
+    last_frame_index INTEGER NOT NULL,
+    last_timestamp REAL,
+    width INTEGER,
+    height INTEGER,
+    manifest BLOB NOT NULL,
+    created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    updated_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+"""
+
+# Tables whose MySQL updated_at column is ON UPDATE CURRENT_TIMESTAMP
+_UPDATED_AT_TABLES = {"score_metadata", "highlights", "frame_manifest"}
+
+
+class _SqliteDatabase:
+    """
+    One sqlite3 connection per database file, shared by every SqliteService
+    of the process. SQLite serializes writers anyway, so statements run one at
+    a time in a worker thread and never block the event loop.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.conn: Optional[sqlite3.Connection] = None
+        self.lock = threading.Lock()
+
+    def open(self):
+        with self.lock:
+            if self.conn is not None:
+                return
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            # WAL: readers do not block the writer; NORMAL sync is durable enough for local runs
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=5000")
+            conn.executescript(SCHEMA)
+            self.conn = conn
+            logger.info(f"[SqliteService] opened {self.path} (WAL)")
+
+    def run(self, fn):
+        with self.lock:
+            if self.conn is None:
+                raise RuntimeError("Database not initialized. Call initialize() first.")
+            return fn(self.conn)
+
+    def close(self):
+        with self.lock:
+            if self.conn is not None:
+                self.conn.close()
+                self.conn = None
+                logger.info(f"[SqliteService] closed {self.path}")
+
+
+_databases: Dict[str, _SqliteDatabase] = {}
+
+
+def get_sqlite_database(path: str) -> _SqliteDatabase:
+    db = _databases.get(path)
+    if db is None:
+        db = _SqliteDatabase(path)
+        _databases[path] = db
+    return db
+
+
+def _placeholders(sql: str) -> str:
+    """Repository queries use the MySQL paramstyle (%s); sqlite3 uses qmark."""
+    return sql.replace("%s", "?")
+
+
+def _encode_cursor(key_values: List[Any]) -> str:
+    """Same opaque keyset cursor as api_lambda/aurora_service.py."""
+    return base64.urlsafe_b64encode(json.dumps(key_values).encode("utf-8")).decode("ascii")
+
+
+def _decode_cursor(cursor: Optional[str]) -> Optional[List[Any]]:
+    if not cursor:
+        return None
+    try:
+        value = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+    except (ValueError, TypeError):
+        return None
+    return value if isinstance(value, list) and value else None
+
+
+class SqliteService(StorageBackend):
+    """Embedded SQLite (WAL) implementation of the repository, for local runs and profiling."""
+
+    def __init__(self, path: str = SQLITE_DB_PATH, component: str = "default"):
+        self.db = get_sqlite_database(path)
+        self.component = component
+        self.metrics = DbMetrics(component)
+
+        logger.info(f"SqliteService initialized for {component} ({path})")
+
+    async def initialize(self):
+        await asyncio.to_thread(self.db.open)
+
+    async def close(self):
+        await asyncio.to_thread(self.db.close)
+        get_metrics_sink().flush()
+
+    def flush_metrics(self):
+        """Publish the DB metrics recorded so far (called by the API handlers after each request)."""
+        get_metrics_sink().flush()
+
+    def _instrumented(self, query: str, run):
+        """
+        Wrap a worker-thread statement returning (result, rows read, rows written)
+        with the DB metrics; waiting for the shared connection counts as acquire wait.
+        """
+        called = time.perf_counter()
+
+        def _run(conn: sqlite3.Connection):
+            self.metrics.acquired(time.perf_counter() - called)
+            started = time.perf_counter()
+            try:
+                result, rows_read, rows_written = run(conn)
+            except Exception:
+                self.metrics.observe(query, time.perf_counter() - started, failed=True)
+                raise
+            finally:
+                self.metrics.released()
+            self.metrics.observe(query, time.perf_counter() - started, rows_read, rows_written)
+            return result
+        return _run
+
+    async def _execute(self, query: str, params=(), fetch: Optional[str] = None):
+        """Run one statement in the worker thread. fetch: None (cursor info), "one" or "all"."""
+        def _run(conn: sqlite3.Connection):
+            cursor = conn.execute(query, tuple(params))
+            if fetch == "one":
+                row = cursor.fetchone()
+                return (dict(row) if row is not None else None), int(row is not None), 0
+            if fetch == "all":
+                rows = [dict(row) for row in cursor.fetchall()]
+                return rows, len(rows), 0
+            return (cursor.lastrowid, cursor.rowcount), 0, max(cursor.rowcount, 0)
+        return await asyncio.to_thread(self.db.run, self._instrumented(query, _run))
+
+    async def _executemany(self, query: str, values: List[List[Any]]) -> int:
+        def _run(conn: sqlite3.Connection):
+            # One transaction instead of one commit per row
+            conn.execute("BEGIN")
+            try:
+                cursor = conn.executemany(query, values)
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+            return cursor.rowcount, 0, max(cursor.rowcount, 0)
+        return await asyncio.to_thread(self.db.run, self._instrumented(query, _run))
+
+    @staticmethod
+    def _upsert_query(table_name: str, keys: List[str], unique_keys: List[str]) -> str:
+        columns = ", ".join(keys)
+        placeholders = ", ".join(["?"] * len(keys))
+        update_cols = [k for k in keys if k not in unique_keys]
+        updates = [f"{col}=excluded.{col}" for col in update_cols]
+        if table_name in _UPDATED_AT_TABLES and "updated_at" not in keys:
+            updates.append("updated_at=CURRENT_TIMESTAMP")
+        # Like ON DUPLICATE KEY UPDATE: no conflict target, any unique key matches (SQLite >= 3.35);
+        # unique_keys only lists the columns the update leaves alone
+        action = f"DO UPDATE SET {', '.join(updates)}" if updates else "DO NOTHING"
+        return f"INSERT INTO {table_name} ({columns}) VALUES ({placeholders}) ON CONFLICT {action}"
+
+    async def insert_dict(self, table_name: str, data: Dict[str, Any]) -> int:
+        columns = ", ".join(data.keys())
+        placeholders = ", ".join(["?"] * len(data))
+        query = f"INSERT INTO {table_name} ({columns}) VALUES ({placeholders})"
+        lastrowid, _ = await self._execute(query, list(data.values()))
+        return lastrowid
+
+    async def insert_dicts(self, table_name: str, rows: List[Dict[str, Any]]) -> int:
+        if not rows:
+            return 0
+        keys = list(rows[0].keys())
+        query = f"INSERT INTO {table_name} ({', '.join(keys)}) VALUES ({', '.join(['?'] * len(keys))})"
+        return await self._executemany(query, [[row[k] for k in keys] for row in rows])
+
+    async def upsert_dict(
+        self,
+        table_name: str,
+        data: Dict[str, Any],
+        unique_keys: Optional[List[str]] = None,
+    ) -> int:
+        query = self._upsert_query(table_name, list(data.keys()), unique_keys or [])
+        lastrowid, _ = await self._execute(query, list(data.values()))
+        return lastrowid
+
+    async def upsert_dicts(
+        self,
+        table_name: str,
+        rows: List[Dict[str, Any]],
+        unique_keys: Optional[List[str]] = None,
+    ) -> int:
+        if not rows:
+            return 0
+        keys = list(rows[0].keys())
+        query = self._upsert_query(table_name, keys, unique_keys or [])
+        return await self._executemany(query, [[row[k] for k in keys] for row in rows])
+
+    async def update_dict(
+        self,
+        table_name: str,
+        data: Dict[str, Any],
+        where_clause: str,
+        where_params: tuple,
+    ) -> int:
+        set_clause = ", ".join([f"{k}=?" for k in data.keys()])
+        query = f"UPDATE {table_name} SET {set_clause} WHERE {_placeholders(where_clause)}"
+        _, rowcount = await self._execute(query, list(data.values()) + list(where_params))
+        return rowcount
+
+    async def delete_highlights(self, stream_id: str) -> int:
+        _, rowcount = await self._execute(f"DELETE FROM {HIGHLIGHTS_TABLE} WHERE stream_id = ?", (stream_id,))
+        return rowcount
+
+    async def get_stream(self, stream_id: str):
+        query = "SELECT * FROM stream_metadata WHERE stream_id = ? LIMIT 1"
+        return await self._execute(query, (stream_id,), fetch="one")
+
+    async def get_frame_manifest(self, stream_id: str) -> Optional[FrameManifest]:
+        query = f"SELECT manifest FROM {FRAME_MANIFEST_TABLE} WHERE stream_id = ? LIMIT 1"
+        row = await self._execute(query, (stream_id,), fetch="one")
+        return FrameManifest.from_bytes(row["manifest"]) if row else None
+
+    async def get_video_by_stream_and_frame(
+        self, stream_id: str, frame_index: int
+    ) -> Optional[Dict[str, Any]]:
+        manifest = await self.get_frame_manifest(stream_id)
+        if manifest is not None:
+            row = next(manifest.rows(stream_id, frame_index, frame_index), None)
+            if row is not None:
+                return row
+        query = """
+            SELECT id, stream_id, filename, frame_index, timestamp,
+                   pts, width, height, created_at
+            FROM video_metadata
+            WHERE stream_id = ? AND frame_index = ?
+            LIMIT 1
+        """
+        return await self._execute(query, (stream_id, frame_index), fetch="one")
+
+    async def get_videos_by_stream(
+        self,
+        stream_id: str,
+        start_frame: Optional[int] = None,
+        end_frame: Optional[int] = None,
+        limit: Optional[int] = None,
+        order_by: str = "frame_index ASC",
+    ) -> List[Dict[str, Any]]:
+        query = """
+            SELECT id, stream_id, filename, frame_index, timestamp,
+                   pts, width, height, created_at
+            FROM video_metadata
+            WHERE stream_id = ?
+        """
+        params = [stream_id]
+        if start_frame is not None:
+            query += " AND frame_index >= ?"
+            params.append(start_frame)
+        if end_frame is not None:
+            query += " AND frame_index <= ?"
+            params.append(end_frame)
+        query += f" ORDER BY {order_by}"
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+        rows = await self._execute(query, params, fetch="all")
+        manifest = await self.get_frame_manifest(stream_id)
+        return merge_frame_rows(rows, manifest, stream_id, start_frame, end_frame, limit, order_by)
+
+    async def get_audios_by_stream(
+        self,
+        stream_id: str,
+        start_chunk: Optional[int] = None,
+        end_chunk: Optional[int] = None,
+        limit: Optional[int] = None,
+        order_by: str = "chunk_index ASC",
+    ) -> List[Dict[str, Any]]:
+        query = """
+            SELECT id, stream_id, filename, chunk_index, start_timestamp, end_timestamp, sample_rate, transcript
+            FROM audio_metadata
+            WHERE stream_id = ?
+        """
+        params = [stream_id]
+        if start_chunk is not None:
+            query += " AND chunk_index >= ?"
+            params.append(start_chunk)
+        if end_chunk is not None:
+            query += " AND chunk_index <= ?"
+            params.append(end_chunk)
+        query += f" ORDER BY {order_by}"
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+        return await self._execute(query, params, fetch="all")
+
+    async def get_scored_clips_by_stream(self, stream_id: str, start_time: float, end_time: float, order_by="start_time ASC"):
+        query = f"""
+            SELECT id, stream_id, start_time, end_time, saliency_score, highlight_score, caption
+            FROM score_metadata
+            WHERE stream_id = ? AND start_time <= ? AND end_time >= ?
+            ORDER BY {order_by}
+        """
+        return await self._execute(query, (stream_id, end_time, start_time), fetch="all")
+
+    async def _iter_rows(
+        self, query: str, params, columns: Sequence[str], row_type: str, batch_size: int = STREAM_FETCH_BATCH
+    ) -> AsyncIterator[Any]:
+        make_row = row_factory(row_type, columns)
+        cursor = await asyncio.to_thread(self.db.run, lambda conn: conn.execute(query, tuple(params)))
+        try:
+            while True:
+                # Plain tuples: the connection-wide sqlite3.Row factory would defeat tuple results
+                rows = await asyncio.to_thread(self.db.run, lambda conn: [tuple(r) for r in cursor.fetchmany(batch_size)])
+                if not rows:
+                    break
+                for row in rows:
+                    yield make_row(row) if make_row else row
+        finally:
+            await asyncio.to_thread(self.db.run, lambda conn: cursor.close())
+
+    async def iter_audios_by_stream(
+        self,
+        stream_id: str,
+        start_chunk: Optional[int] = None,
+        end_chunk: Optional[int] = None,
+        columns: Optional[Sequence[str]] = None,
+        row_type: str = "dict",
+    ) -> AsyncIterator[Any]:
+        columns = project_columns(columns, AUDIO_COLUMNS)
+        query = f"SELECT {', '.join(columns)} FROM audio_metadata WHERE stream_id = ?"
+        params = [stream_id]
+        if start_chunk is not None:
+            query += " AND chunk_index >= ?"
+            params.append(start_chunk)
+        if end_chunk is not None:
+            query += " AND chunk_index <= ?"
+            params.append(end_chunk)
+        query += " ORDER BY chunk_index ASC"
+        async for row in self._iter_rows(query, params, columns, row_type):
+            yield row
+
+    async def iter_scored_clips_by_stream(
+        self,
+        stream_id: str,
+        start_time: Optional[float] = None,
+        end_time: Optional[float] = None,
+        columns: Optional[Sequence[str]] = None,
+        row_type: str = "dict",
+    ) -> AsyncIterator[Any]:
+        columns = project_columns(columns, SCORE_COLUMNS)
+        query = f"SELECT {', '.join(columns)} FROM score_metadata WHERE stream_id = ?"
+        params = [stream_id]
+        if end_time is not None:
+            query += " AND start_time <= ?"
+            params.append(end_time)
+        if start_time is not None:
+            query += " AND end_time >= ?"
+            params.append(start_time)
+        query += " ORDER BY start_time ASC"
+        async for row in self._iter_rows(query, params, columns, row_type):
+            yield row
+
+    async def has_more_entries_after(self, stream_id: str, end_time: float) -> bool:
+        query = "SELECT 1 FROM score_metadata WHERE stream_id = ? AND start_time > ? LIMIT 1"
+        row = await self._execute(query, (stream_id, end_time), fetch="one")
+        return row is not None
+
+    async def get_stream_watermarks(self, stream_id: str) -> Dict[str, Any]:
+        row = await self._execute(
+            """
+            SELECT
+                MAX(
+                    COALESCE((SELECT MAX(frame_index) FROM video_metadata WHERE stream_id = ?), -1),
+                    COALESCE((SELECT last_frame_index FROM frame_manifest WHERE stream_id = ?), -1)
+                ) AS last_frame,
+                (SELECT MAX(chunk_index) FROM audio_metadata WHERE stream_id = ?) AS last_chunk,
+                (SELECT MAX(end_time) FROM score_metadata WHERE stream_id = ?) AS scored_until
+            """,
+            (stream_id, stream_id, stream_id, stream_id),
+            fetch="one",
+        )
+        return {
+            "frames": int(row["last_frame"]) + 1,
+            "chunks": 0 if row["last_chunk"] is None else int(row["last_chunk"]) + 1,
+            "scored_until": float(row["scored_until"] or 0.0),
+        }
+
+    async def get_compactable_streams(self, limit: int = 20) -> List[str]:
+        query = """
+            SELECT s.stream_id
+            FROM stream_metadata s
+            WHERE s.status = 'COMPLETED'
+              AND EXISTS (SELECT 1 FROM video_metadata v WHERE v.stream_id = s.stream_id)
+            LIMIT ?
+        """
+        rows = await self._execute(query, (limit,), fetch="all")
+        return [row["stream_id"] for row in rows]
+
+    async def compact_stream_frames(self, stream_id: str) -> Optional[Dict[str, Any]]:
+        def _run(conn: sqlite3.Connection):
+            # IMMEDIATE takes the write lock up front, like the FOR UPDATE reads on Aurora
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                statuses = {
+                    row["status"]
+                    for row in conn.execute("SELECT status FROM stream_metadata WHERE stream_id = ?", (stream_id,))
+                }
+                if statuses != {"COMPLETED"}:
+                    logger.info(f"[SqliteService] not compacting {stream_id}: status {statuses or None}")
+                    conn.execute("COMMIT")
+                    return None
+                rows = [
+                    dict(row)
+                    for row in conn.execute(
+                        """
+                        SELECT filename, frame_index, timestamp, pts, width, height
+                        FROM video_metadata
+                        WHERE stream_id = ?
+                        ORDER BY frame_index ASC
+                        """,
+                        (stream_id,),
+                    )
+                ]
+                existing = conn.execute(
+                    f"SELECT manifest, width, height FROM {FRAME_MANIFEST_TABLE} WHERE stream_id = ?", (stream_id,)
+                ).fetchone()
+                manifest_row = build_manifest_row(stream_id, rows, dict(existing) if existing else None)
+                if manifest_row is None:
+                    conn.execute("COMMIT")
+                    return None
+                keys = list(manifest_row.keys())
+                conn.execute(
+                    self._upsert_query(FRAME_MANIFEST_TABLE, keys, ["stream_id"]),
+                    [manifest_row[k] for k in keys],
+                )
+                compacted = conn.execute(
+                    "DELETE FROM video_metadata WHERE stream_id = ? AND frame_index <= ?",
+                    (stream_id, rows[-1]["frame_index"]),
+                ).rowcount
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+            return {"stream_id": stream_id, "frames": manifest_row["frame_count"], "compacted": compacted}
+        return await asyncio.to_thread(self.db.run, _run)
+
+    # API reads of single-box runs, served by api_lambda/highlight_handler.py with
+    # STORAGE_BACKEND=sqlite; deployed, the API lambda reads Aurora
+    # (api_lambda/aurora_service.py), so they are not part of StorageBackend
+    async def get_available_streams(
+        self,
+        page: int = 1,
+        limit: int = 20,
+        status: Optional[str] = None,
+        sort_by: str = "stream_id",
+        sort_order: str = "DESC",
+        cursor: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        if sort_by not in {"stream_id", "status"}:
+            sort_by = "stream_id"
+        sort_order = "DESC" if sort_order.upper() != "ASC" else "ASC"
+        limit = max(1, limit)
+
+        conditions, params = [], []
+        if status:
+            conditions.append("status = ?")
+            params.append(status)
+        count = await self._execute(
+            "SELECT COUNT(*) AS total FROM stream_metadata" + (" WHERE status = ?" if status else ""),
+            params,
+            fetch="one",
+        )
+
+        keys = ["stream_id", "id"] if sort_by == "stream_id" else [sort_by, "stream_id", "id"]
+        after = _decode_cursor(cursor)
+        if after is not None and len(after) != len(keys):
+            after = None
+        if after is not None:
+            op = "<" if sort_order == "DESC" else ">"
+            conditions.append(f"({', '.join(keys)}) {op} ({', '.join(['?'] * len(keys))})")
+            params.extend(after)
+        query = "SELECT id, stream_id, stream_url, status, message FROM stream_metadata"
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY " + ", ".join(f"{key} {sort_order}" for key in keys) + " LIMIT ?"
+        params.append(limit + 1)
+        if after is None and page > 1:
+            query += " OFFSET ?"
+            params.append((page - 1) * limit)
+        rows = await self._execute(query, params, fetch="all")
+
+        has_next = len(rows) > limit
+        rows = rows[:limit]
+        next_cursor = _encode_cursor([rows[-1][key] for key in keys]) if has_next else None
+        for row in rows:
+            del row["id"]
+            row["highlights"] = None
+        total = count["total"]
+        return {
+            "items": rows,
+            "total": total,
+            "total_is_estimate": False,
+            "page": page,
+            "total_pages": max(page if rows else 0, -((-total) // limit)),
+            "has_next": has_next,
+            "has_prev": page > 1,
+            "next_cursor": next_cursor,
+            "limit": limit,
+        }
+
+    async def get_highlights_by_stream(
+        self,
+        stream_id: str,
+        start_time: Optional[float] = None,
+        end_time: Optional[float] = None,
+        after: Optional[float] = None,
+        limit: Optional[int] = None,
+    ) -> Optional[Dict[str, Any]]:
+        stream = await self._execute(
+            "SELECT stream_id, stream_url, status, message FROM stream_metadata WHERE stream_id = ? LIMIT 1",
+            (stream_id,),
+            fetch="one",
+        )
+        if stream is None:
+            return None
+
+        query = """
+            SELECT start_time, end_time, title, caption, thumbnail, snap_reason
+            FROM highlights
+            WHERE stream_id = ?
+        """
+        params = [stream_id]
+        if start_time is not None:
+            query += " AND start_time >= ?"
+            params.append(start_time)
+        if end_time is not None:
+            query += " AND start_time < ?"
+            params.append(end_time)
+        if after is not None:
+            query += " AND start_time > ?"
+            params.append(after)
+        query += " ORDER BY start_time ASC"
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit + 1)
+        rows = await self._execute(query, params, fetch="all")
+
+        next_after = None
+        if limit is not None and len(rows) > limit:
+            rows = rows[:limit]
+            next_after = rows[-1]["start_time"]
+
+        stream["highlights"] = json.dumps(rows)
+        stream["next_after"] = next_after
+        return stream
@@ -0,0 +1,308 @@
+from abc import ABC, abstractmethod
+from collections import namedtuple
+from typing import AsyncIterator, Dict, List, Any, Optional, Sequence
+from utils.frame_manifest import FrameManifest
+from repositories.write_behind import _PendingWrite, get_write_behind_buffer, flush_write_behind
+from config import STORAGE_BACKEND
+
+
+# Columns the streaming reads may project (default: all of them, in this order)
+AUDIO_COLUMNS = ("id", "stream_id", "filename", "chunk_index", "start_timestamp", "end_timestamp", "sample_rate", "transcript")
+SCORE_COLUMNS = ("id", "stream_id", "start_time", "end_time", "saliency_score", "highlight_score", "caption")
+
+ROW_TYPES = ("dict", "tuple", "row")
+
+
+def project_columns(columns: Optional[Sequence[str]], allowed: Sequence[str]) -> List[str]:
+    """Validated column projection for a streaming read (column names go into the SQL text)."""
+    if not columns:
+        return list(allowed)
+    unknown = [c for c in columns if c not in allowed]
+    if unknown:
+        raise ValueError(f"Unknown columns {unknown}, expected a subset of {list(allowed)}")
+    return list(columns)
+
+
+def row_factory(row_type: str, columns: Sequence[str]):
+    """
+    Converts a result tuple (in projection order) to the requested row type:
+    "dict", "tuple" (as-is) or "row" (namedtuple with attribute access).
+    """
+    if row_type not in ROW_TYPES:
+        raise ValueError(f"row_type must be one of {ROW_TYPES}")
+    if row_type == "tuple":
+        return None
+    if row_type == "row":
+        return namedtuple("Row", columns)._make
+    return lambda values: dict(zip(columns, values))
+
+
+def merge_frame_rows(
+    rows: List[Dict[str, Any]],
+    manifest: Optional[FrameManifest],
+    stream_id: str,
+    start_frame: Optional[int] = None,
+    end_frame: Optional[int] = None,
+    limit: Optional[int] = None,
+    order_by: str = "frame_index ASC",
+) -> List[Dict[str, Any]]:
+    """
+    video_metadata rows (left by older runs until compacted) plus the frames
+    of the stream's manifest in the same range; rows win on equal frame_index.
+    With a manifest the result is ordered by frame_index.
+    """
+    if manifest is None:
+        return rows
+    by_index = {row["frame_index"]: row for row in manifest.rows(stream_id, start_frame, end_frame)}
+    by_index.update({row["frame_index"]: row for row in rows})
+    merged = sorted(by_index.values(), key=lambda row: row["frame_index"], reverse="DESC" in order_by.upper())
+    return merged[:limit] if limit is not None else merged
+
+
+class StorageBackend(ABC):
+    """
+    Repository interface used by the pipeline (and mirrored by the API lambda).
+
+    AuroraService is the production implementation, SqliteService an embedded
+    one for local runs and profiling without network DB latency. The
+    *_nowait helpers, backed by per-table write-behind buffers
+    (repositories/write_behind.py), are shared by every backend.
+    """
+
+    @abstractmethod
+    async def initialize(self):
+        """Open the backend (pool, file, schema). Call this before using it."""
+
+    @abstractmethod
+    async def close(self):
+        """Release the backend's resources (at process shutdown)."""
+
+    @abstractmethod
+    async def insert_dict(self, table_name: str, data: Dict[str, Any]) -> int:
+        """Insert one row, returns its id."""
+
+    @abstractmethod
+    async def insert_dicts(self, table_name: str, rows: List[Dict[str, Any]]) -> int:
+        """Multi-row insert (rows share their columns), returns the number of rows."""
+
+    @abstractmethod
+    async def upsert_dict(
+        self,
+        table_name: str,
+        data: Dict[str, Any],
+        unique_keys: Optional[List[str]] = None,
+    ) -> int:
+        """Insert one row or update the row with the same unique key."""
+
+    @abstractmethod
+    async def upsert_dicts(
+        self,
+        table_name: str,
+        rows: List[Dict[str, Any]],
+        unique_keys: Optional[List[str]] = None,
+    ) -> int:
+        """Multi-row upsert, returns the number of affected rows."""
+
+    @abstractmethod
+    async def update_dict(
+        self,
+        table_name: str,
+        data: Dict[str, Any],
+        where_clause: str,
+        where_params: tuple,
+    ) -> int:
+        """Update rows matching where_clause (%s placeholders), returns the row count."""
+
+    @abstractmethod
+    async def delete_highlights(self, stream_id: str) -> int:
+        """Delete the highlights rows of a stream (before they are assembled again), returns the row count."""
+
+    @abstractmethod
+    async def get_stream(self, stream_id: str) -> Optional[Dict[str, Any]]:
+        """The stream_metadata row of a stream."""
+
+    @abstractmethod
+    async def get_frame_manifest(self, stream_id: str) -> Optional[FrameManifest]:
+        """The stream's frame manifest, from its frame_manifest row."""
+
+    @abstractmethod
+    async def get_video_by_stream_and_frame(
+        self, stream_id: str, frame_index: int
+    ) -> Optional[Dict[str, Any]]:
+        """One video_metadata row (or the manifest's frame)."""
+
+    @abstractmethod
+    async def get_videos_by_stream(
+        self,
+        stream_id: str,
+        start_frame: Optional[int] = None,
+        end_frame: Optional[int] = None,
+        limit: Optional[int] = None,
+        order_by: str = "frame_index ASC",
+    ) -> List[Dict[str, Any]]:
+        """video_metadata rows of a stream in a frame range, merged with its manifest (merge_frame_rows)."""
+
+    @abstractmethod
+    async def get_audios_by_stream(
+        self,
+        stream_id: str,
+        start_chunk: Optional[int] = None,
+        end_chunk: Optional[int] = None,
+        limit: Optional[int] = None,
+        order_by: str = "chunk_index ASC",
+    ) -> List[Dict[str, Any]]:
+        """audio_metadata rows of a stream in a chunk range."""
+
+    @abstractmethod
+    async def get_scored_clips_by_stream(
+        self, stream_id: str, start_time: float, end_time: float, order_by: str = "start_time ASC"
+    ) -> List[Dict[str, Any]]:
+        """score_metadata rows overlapping [start_time, end_time]."""
+
+    @abstractmethod
+    def iter_audios_by_stream(
+        self,
+        stream_id: str,
+        start_chunk: Optional[int] = None,
+        end_chunk: Optional[int] = None,
+        columns: Optional[Sequence[str]] = None,
+        row_type: str = "dict",
+    ) -> AsyncIterator[Any]:
+        """
+        Stream audio_metadata rows of a stream in chunk order, in constant memory.
+
+        Args:
+            stream_id: The stream identifier
+            start_chunk: Optional starting chunk index (inclusive)
+            end_chunk: Optional ending chunk index (inclusive)
+            columns: Subset of AUDIO_COLUMNS to read (default: all)
+            row_type: "dict", "tuple" or "row" (namedtuple)
+
+        Use as `async with aclosing(...) as rows` when the loop may stop early.
+        """
+
+    @abstractmethod
+    def iter_scored_clips_by_stream(
+        self,
+        stream_id: str,
+        start_time: Optional[float] = None,
+        end_time: Optional[float] = None,
+        columns: Optional[Sequence[str]] = None,
+        row_type: str = "dict",
+    ) -> AsyncIterator[Any]:
+        """
+        Stream score_metadata rows of a stream overlapping [start_time, end_time]
+        (whole stream by default) in start_time order, in constant memory.
+
+        Args:
+            stream_id: The stream identifier
+            start_time: Optional start of the time range (inclusive)
+            end_time: Optional end of the time range (inclusive)
+            columns: Subset of SCORE_COLUMNS to read (default: all)
+            row_type: "dict", "tuple" or "row" (namedtuple)
+        """
+
+    @abstractmethod
+    async def has_more_entries_after(self, stream_id: str, end_time: float) -> bool:
+        """Whether score_metadata has rows starting after end_time."""
+
+    @abstractmethod
+    async def get_stream_watermarks(self, stream_id: str) -> Dict[str, Any]:
+        """
+        Durable progress of a stream, for resuming a retried job.
+
+        Returns:
+            {"frames": next frame_index, "chunks": next chunk_index,
+             "scored_until": end_time of the last scored slice (0.0 when none)}
+        """
+
+    @abstractmethod
+    async def get_compactable_streams(self, limit: int = 20) -> List[str]:
+        """COMPLETED streams that still have video_metadata rows."""
+
+    @abstractmethod
+    async def compact_stream_frames(self, stream_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Collapse the video_metadata rows of a COMPLETED stream into its
+        frame_manifest row and delete them, in one transaction.
+
+        Returns:
+            {"stream_id", "frames": frames in the manifest, "compacted": rows deleted},
+            or None when the stream was skipped
+        """
+
+    def insert_dict_nowait(self, table_name: str, data: Dict[str, Any]):
+        """
+        Queued insert through the table's write-behind buffer (does not wait).
+
+        Args:
+            table_name: Name of the target table
+            data: Dictionary with column names as keys
+        """
+        get_write_behind_buffer(table_name, self).add(_PendingWrite("insert", data))
+
+    def upsert_dict_nowait(
+        self,
+        table_name: str,
+        data: Dict[str, Any],
+        unique_keys: Optional[List[str]] = None,
+    ):
+        """
+        Queued upsert through the table's write-behind buffer (does not wait).
+        A queued upsert with the same unique key values absorbs this one.
+
+        Args:
+            table_name: Name of the target table
+            data: Dictionary with column names as keys
+            unique_keys: List of column names to exclude from UPDATE clause
+        """
+        get_write_behind_buffer(table_name, self).add(_PendingWrite("upsert", data, unique_keys=unique_keys))
+
+    def update_dict_nowait(
+        self,
+        table_name: str,
+        data: Dict[str, Any],
+        where_clause: str,
+        where_params: tuple,
+    ):
+        """
+        Queued update through the table's write-behind buffer (does not wait).
+        A queued update with the same WHERE clause and params absorbs this one.
+
+        Args:
+            table_name: Name of the target table
+            data: Dictionary with column names as keys to update
+            where_clause: WHERE clause (e.g., "id = %s")
+            where_params: Tuple of parameters for WHERE clause
+        """
+        get_write_behind_buffer(table_name, self).add(
+            _PendingWrite("update", data, where_clause=where_clause, where_params=where_params)
+        )
+
+    async def wait_for_capacity(self, table_name: str):
+        """Backpressure for producers of *_nowait writes: wait while the table's buffer is full."""
+        await get_write_behind_buffer(table_name, self).wait_for_capacity()
+
+    async def flush(self) -> int:
+        """
+        Apply every queued *_nowait write of the process. Await this before close().
+
+        Returns:
+            Queued rows that could not be written (after retries)
+        """
+        return await flush_write_behind()
+
+
+def create_storage_backend(pool_size: int = 10, component: str = "default") -> StorageBackend:
+    """
+    The repository selected by STORAGE_BACKEND ("aurora" or "sqlite").
+
+    Args:
+        pool_size: Connection quota of the component (Aurora only)
+        component: Name of the calling component, used in pool metrics
+    """
+    if STORAGE_BACKEND == "sqlite":
+        from repositories.sqlite_service import SqliteService
+        return SqliteService(component=component)
+    from repositories.aurora_service import AuroraService
+    return AuroraService(pool_size=pool_size, component=component)
@@ -0,0 +1,206 @@
+import asyncio
+
+from typing import Dict, List, Any, Optional, Tuple
+from utils.helpers import retry_with_backoff
+from utils.logger import app_logger as logger
+from config import (
+    WRITE_BEHIND_MAX_ROWS,
+    WRITE_BEHIND_BATCH_ROWS,
+    WRITE_BEHIND_FLUSH_INTERVAL,
+    WRITE_BEHIND_RETRIES,
+    WRITE_BEHIND_BACKOFF_SECONDS,
+)
+
+
+class _PendingWrite:
+    __slots__ = ("kind", "data", "unique_keys", "where_clause", "where_params", "key")
+
+    def __init__(self, kind: str, data: Dict[str, Any], unique_keys=None, where_clause=None, where_params=None):
+        self.kind = kind  # "insert" | "upsert" | "update"
+        self.data = dict(data)
+        self.unique_keys = list(unique_keys or [])
+        self.where_clause = where_clause
+        self.where_params = tuple(where_params or ())
+        if kind == "update":
+            self.key = (where_clause, self.where_params)
+        elif kind == "upsert" and self.unique_keys:
+            self.key = tuple(self.data.get(k) for k in self.unique_keys)
+        else:
+            self.key = None
+
+    def disjoint(self, other: "_PendingWrite") -> bool:
+        """True when other certainly writes another row (same key columns, other key)."""
+        if other.key is None or other.kind != self.kind or other.key == self.key:
+            return False
+        if self.kind == "update":
+            return other.where_clause == self.where_clause
+        return other.unique_keys == self.unique_keys
+
+    def batch_signature(self) -> Optional[Tuple]:
+        """Consecutive writes with equal signatures go out as one multi-row statement."""
+        if self.kind == "update":
+            return None
+        return (self.kind, tuple(self.data.keys()), tuple(self.unique_keys))
+
+
+class WriteBehindBuffer:
+    """
+    Write-behind queue of one table, behind the *_nowait repository methods.
+
+    Writes are applied in the order they were queued, so every key sees its
+    writes in order. A queued update or upsert absorbs later writes to the same
+    key (e.g. repeated status updates) until the buffer is flushed, as long as
+    every write queued in between certainly touches another row.
+    Runs of inserts/upserts with the same columns are flushed as multi-row
+    statements. Memory is bounded by max_rows: producers await
+    wait_for_capacity() to feel the backpressure.
+    """
+
+    def __init__(
+        self,
+        backend,
+        table_name: str,
+        max_rows: int = WRITE_BEHIND_MAX_ROWS,
+        batch_rows: int = WRITE_BEHIND_BATCH_ROWS,
+        flush_interval: float = WRITE_BEHIND_FLUSH_INTERVAL,
+    ):
+        self.backend = backend
+        self.table_name = table_name
+        self.max_rows = max_rows
+        self.batch_rows = batch_rows
+        self.flush_interval = flush_interval
+
+        self._pending: List[_PendingWrite] = []
+        self._lock = asyncio.Lock()  # one flush at a time keeps the apply order
+        self._room = asyncio.Event()
+        self._room.set()
+        self._wakeup = asyncio.Event()
+        self._flusher: Optional[asyncio.Task] = None
+
+        self.queued = 0
+        self.coalesced = 0
+        self.written = 0
+        self.statements = 0
+        self.failed = 0
+
+    def __len__(self):
+        return len(self._pending)
+
+    def _coalesce(self, write: _PendingWrite) -> bool:
+        if write.key is None:
+            return False
+        for queued in reversed(self._pending):
+            if queued.kind == write.kind and queued.key == write.key:
+                queued.data.update(write.data)
+                return True
+            # Merging moves write ahead of queued: only skip writes that cannot
+            # touch its row (same kind and key columns, different key values)
+            if not write.disjoint(queued):
+                return False
+        return False
+
+    def add(self, write: _PendingWrite):
+        self.queued += 1
+        if self._coalesce(write):
+            self.coalesced += 1
+            return
+        self._pending.append(write)
+        if len(self._pending) >= self.max_rows:
+            self._room.clear()
+        if len(self._pending) >= self.batch_rows:
+            self._wakeup.set()
+        self._ensure_flusher()
+
+    def _ensure_flusher(self):
+        if self._flusher is None or self._flusher.done():
+            self._flusher = asyncio.create_task(self._run())
+
+    async def _run(self):
+        while self._pending:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    async def wait_for_capacity(self):
+        await self._room.wait()
+
+    async def flush(self):
+        """Apply everything queued so far, in order."""
+        async with self._lock:
+            while self._pending:
+                batch, self._pending = self._pending, []
+                self._room.set()
+                await self._apply(batch)
+
+    async def _apply(self, batch: List[_PendingWrite]):
+        i = 0
+        while i < len(batch):
+            write = batch[i]
+            signature = write.batch_signature()
+            j = i + 1
+            if signature is not None:
+                while j < len(batch) and j - i < self.batch_rows and batch[j].batch_signature() == signature:
+                    j += 1
+            group = batch[i:j]
+            try:
+                await self._write(group)
+                self.written += len(group)
+            except Exception as e:
+                self.failed += len(group)
+                logger.error(f"[WriteBehindBuffer] {write.kind} of {len(group)} row(s) into {self.table_name} failed: {e}")
+            self.statements += 1
+            i = j
+
+    @retry_with_backoff(retries=WRITE_BEHIND_RETRIES, backoff_in_seconds=WRITE_BEHIND_BACKOFF_SECONDS, max_backoff_in_seconds=10)
+    async def _write(self, group: List[_PendingWrite]):
+        # One statement per attempt: a failed attempt wrote nothing, so it is retried whole
+        write = group[0]
+        if write.kind == "insert":
+            await self.backend.insert_dicts(self.table_name, [w.data for w in group])
+        elif write.kind == "upsert":
+            await self.backend.upsert_dicts(self.table_name, [w.data for w in group], write.unique_keys)
+        else:
+            await self.backend.update_dict(self.table_name, write.data, write.where_clause, write.where_params)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "table": self.table_name,
+            "pending": len(self._pending),
+            "queued": self.queued,
+            "coalesced": self.coalesced,
+            "written": self.written,
+            "statements": self.statements,
+            "failed": self.failed,
+        }
+
+
+_buffers: Dict[str, WriteBehindBuffer] = {}
+
+
+def get_write_behind_buffer(table_name: str, backend) -> WriteBehindBuffer:
+    """The process-wide buffer of a table; it writes through the first backend that asked for it."""
+    buffer = _buffers.get(table_name)
+    if buffer is None:
+        buffer = WriteBehindBuffer(backend, table_name)
+        _buffers[table_name] = buffer
+    return buffer
+
+
+async def flush_write_behind() -> int:
+    """
+    Flush every table buffer and log what they did.
+
+    Returns:
+        Rows whose write failed after retries since the process started (0 when all are in the DB)
+    """
+    failed = 0
+    for buffer in list(_buffers.values()):
+        await buffer.flush()
+        logger.info(f"[WriteBehindBuffer] {buffer.stats()}")
+        failed += buffer.failed
+    if failed:
+        logger.error(f"[WriteBehindBuffer] {failed} queued row(s) were not written")
+    return failed
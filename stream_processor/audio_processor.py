@@ -10,7 +10,10 @@ from av import AudioFrame
 from av.audio.resampler import AudioResampler
 from repositories.s3_service import S3Service
 from utils.logger import app_logger as logger
-from repositories.aurora_service import AuroraService
+from utils.pcm_store import PcmStreamWriter
+from utils.stream_state import get_stream_state
+from detectors.audio_boundary_detector import get_audio_boundary_detector
+from repositories.storage_backend import create_storage_backend
 from utils.unique_async_queue import UniqueAsyncQueue
 from utils.helpers import get_audio_filename, EMPTY_STRING
 from config import (
@@ -31,8 +34,9 @@ class AudioChunker:
         self.chunk_index = 0
         self.output_dir = audio_chunk_dir
         self.is_db_writer_initialized = False
+        self.pcm_writer = PcmStreamWriter(audio_chunk_dir)
 
-        self.db_writer = AuroraService(pool_size=10)
+        self.db_writer = create_storage_backend(pool_size=4, component="audio_chunker")
 
         # self.s3_writer = S3Service(
         #     bucket_name=S3_BUCKET_NAME,
@@ -69,6 +73,7 @@ class AudioChunker:
         filepath = os.path.join(self.output_dir, filename)
 
         await self.intialize_db_writer()
+        boundary_detector = get_audio_boundary_detector(stream_id)
 
         try:
             output_container = av.open(filepath, mode="w")
@@ -86,7 +91,12 @@ class AudioChunker:
                 for new_frame in resampled_frames:
                     packets = out_stream.encode(new_frame)
                     output_container.mux(packets)
+                    samples = new_frame.to_ndarray()
+                    channels = len(new_frame.layout.channels)
+                    self.pcm_writer.append(samples, TARGET_SAMPLE_RATE, channels)
+                    boundary_detector.push(samples, TARGET_SAMPLE_RATE, channels)
             output_container.close()
+            self.pcm_writer.flush()
 
             last = self.buffer[-1]
             end_ts = float(last.pts * last.time_base) if last.pts else None
@@ -105,8 +115,15 @@ class AudioChunker:
             # upload audio clip to S3 bucket
             # self.s3_writer.upload_audio_nowait(stream_id, file_path=filepath)
 
-            # store metadata into Aurora SQL DB
-            await self.db_writer.insert_dict(AUDIO_METADATA_TABLE_NAME, metadata)
+            # store metadata into Aurora SQL DB; a retried job must not reset a finished transcript
+            stream_state = get_stream_state(stream_id)
+            if not stream_state.chunk_durable(self.chunk_index):
+                await self.db_writer.upsert_dict(
+                    AUDIO_METADATA_TABLE_NAME,
+                    metadata,
+                    unique_keys=["stream_id", "chunk_index", "transcript"],
+                )
+            stream_state.mark_chunk_written(self.chunk_index)
 
             logger.info(f"[AudioChunker] Wrote chunk {os.path.basename(filepath)}")
         except Exception as e:
@@ -159,6 +176,10 @@ class AudioProcessor:
             await self.chunker.flush_chunk(stream_id)
         except Exception as e:
             logger.error(f"[AudioProcessor] Error flushing chunk on shutdown: {e}")
+        finally:
+            self.chunker.pcm_writer.close()
+            get_audio_boundary_detector(stream_id).finalize()
 
         logger.info("[AudioProcessor] Audio worker exiting.")
+        get_stream_state(stream_id).mark_audio_done()
         audio_processor_event.set()
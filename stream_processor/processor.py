@@ -4,17 +4,20 @@ from queue import Queue
 from threading import Event
 from av.stream import Disposition
 from config import MAX_STREAM_DURATION
+from detectors.shot_hints import get_shot_hints
 from utils.logger import app_logger as logger
 
 
 class StreamProcessor:
-    def __init__(self, url: str, audio_frame_q: Queue, video_frame_q: Queue):
+    def __init__(self, url: str, audio_frame_q: Queue, video_frame_q: Queue, stream_id: str | None = None):
         if not audio_frame_q or not video_frame_q:
             raise Exception("Stream processor resquires audio and video frame queues")
         self.audio_frame_q = audio_frame_q
         self.video_frame_q = video_frame_q
         self.stream_url = url
         self.max_seconds = MAX_STREAM_DURATION
+        # Packet statistics for compressed-domain shot-change hints
+        self.shot_hints = get_shot_hints(stream_id) if stream_id else None
 
     def start_stream(self, stream_processor_event: Event):
         logger.info(f"[Stream Proceesor] Starting to read the stream {self.stream_url}")
@@ -37,6 +40,8 @@ class StreamProcessor:
                 for packet in container.demux(audio_stream, video_stream):
                     if stream_processor_event.is_set():
                         break
+                    if self.shot_hints is not None and packet.stream.type == "video":
+                        self.shot_hints.record_packet(packet)
                     try:
                         for frame in packet.decode():
                             if frame is None:
@@ -47,6 +52,8 @@ class StreamProcessor:
                                     stream_processor_event.set()
                                     return
                             if packet.stream.type == "video":
+                                if self.shot_hints is not None:
+                                    self.shot_hints.record_frame(frame)
                                 self.video_frame_q.put(frame)
                             elif packet.stream.type == "audio":
                                 self.audio_frame_q.put(frame)
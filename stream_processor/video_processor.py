@@ -1,5 +1,7 @@
+import io
 import os
 import queue
+import bisect
 import asyncio
 import threading
 
@@ -7,10 +9,23 @@ from queue import Queue
 from PIL import Image
 from av import VideoFrame
 from utils.logger import app_logger as logger
+from utils.frame_store import get_frame_store
+from utils.stream_state import get_stream_state
+from utils.frame_manifest import FrameManifestWriter, FRAME_MANIFEST_FILENAME, summary_row
+from detectors.scene_detector import get_scene_detector
 from utils.helpers import get_video_frame_filename
-from repositories.aurora_service import AuroraService
+from repositories.storage_backend import create_storage_backend
 from repositories.s3_service import S3Service
-from config import AUDIO_BUCKET_PREFIX, IMAGE_BUCKET_PREFIX, S3_BUCKET_NAME, S3_REGION, VIDEO_METADATA_TABLE_NAME
+from repositories.frame_segment_store import FrameSegmentStore
+from config import (
+    AUDIO_BUCKET_PREFIX,
+    IMAGE_BUCKET_PREFIX,
+    S3_BUCKET_NAME,
+    S3_REGION,
+    FRAME_MANIFEST_TABLE,
+    FRAME_MANIFEST_CHECKPOINT_FRAMES,
+    FRAME_STORAGE_MODE,
+)
 
 class VideoProcessor:
     def __init__(
@@ -23,12 +38,19 @@ class VideoProcessor:
         self.output_dir = output_dir
         os.makedirs(self.output_dir, exist_ok=True)
         self.frames_q = video_frame_q
+        self.frame_store = get_frame_store(output_dir)
         self.frame_index = 0
         self.last_saved_pts = None
+        # Frame columns of the stream; the DB only keeps its stream-level row
+        self.manifest = FrameManifestWriter(os.path.join(output_dir, FRAME_MANIFEST_FILENAME))
+        # (first frame, task) of the S3 uploads since the last checkpoint; the
+        # checkpoint (the resume watermark) only covers frames whose upload completed
+        self._uploads = []
+        self._upload_failed_from = None
         
         self.is_db_writer_initialized = False
         
-        self.db_writer = AuroraService(pool_size=10)
+        self.db_writer = create_storage_backend(pool_size=10, component="video_processor")
 
         self.s3_writer = S3Service(
             bucket_name=S3_BUCKET_NAME,
@@ -36,6 +58,10 @@ class VideoProcessor:
             audio_prefix=AUDIO_BUCKET_PREFIX,
             image_prefix=IMAGE_BUCKET_PREFIX,
         )
+        # Packed mode: frames go to S3 in segments, thumbnails are published per frame
+        self.frame_segments = (
+            FrameSegmentStore(self.s3_writer, output_dir) if FRAME_STORAGE_MODE == "packed" else None
+        )
     
     def _read_frame(self):
         frame: VideoFrame = None
@@ -52,11 +78,46 @@ class VideoProcessor:
             await self.db_writer.initialize()
             self.is_db_writer_initialized = True
                 
+    async def _uploaded_frames(self) -> int:
+        """
+        Wait for the uploads queued so far and return how many leading frames
+        of the manifest are in S3 (a resumed job does not upload them again).
+        """
+        uploads, self._uploads = self._uploads, []
+        results = await asyncio.gather(*[task for _, task in uploads], return_exceptions=True)
+        for (start, _), result in zip(uploads, results):
+            if isinstance(result, Exception) and (self._upload_failed_from is None or start < self._upload_failed_from):
+                self._upload_failed_from = start
+        uploaded = self.manifest.frame_index[-1] + 1
+        if self.frame_segments is not None and self.frame_segments.pending_from is not None:
+            # Frames of the open segment are not in S3 until it closes
+            uploaded = min(uploaded, self.frame_segments.pending_from)
+        if self._upload_failed_from is not None:
+            uploaded = min(uploaded, self._upload_failed_from)
+        return bisect.bisect_left(self.manifest.frame_index, uploaded)
+
+    async def _save_manifest(self, stream_id: str, stream_state):
+        """Write the manifest file and queue the stream's frame_manifest row (replaces per-frame rows)."""
+        if len(self.manifest) == 0:
+            return
+        await asyncio.to_thread(self.manifest.write)
+        uploaded = await self._uploaded_frames()
+        # A resumed job rebuilds the manifest from frame 0: never shrink the durable one
+        if uploaded > stream_state.durable_frames:
+            await self.db_writer.wait_for_capacity(FRAME_MANIFEST_TABLE)
+            self.db_writer.upsert_dict_nowait(
+                FRAME_MANIFEST_TABLE,
+                summary_row(stream_id, self.manifest.to_bytes(uploaded)),
+                unique_keys=["stream_id"],
+            )
+
     async def process_frames(self, stream_id: str, video_processor_event: asyncio.Event, stream_processor_event: threading.Event):
         logger.info("[VideoProcessor] started to sample the video frames")
         
         logger.info("Initializing DB Connection in VideoProcessor")
         await self.intialize_db_writer()
+        stream_state = get_stream_state(stream_id)
+        scene_detector = get_scene_detector(stream_id, fps=self.sample_rate)
         
         while True:
             if video_processor_event.is_set() or (stream_processor_event.is_set() and self.frames_q.empty()):
@@ -90,33 +151,66 @@ class VideoProcessor:
                 
                 img: Image = frame.to_image()
                                             
-                # upload image to S3
-                self.s3_writer.upload_image_nowait(
-                    stream_id = stream_id,
-                    image_file = img,
-                    filename = filename
-                )
-                
-                if not os.path.exists(filepath):
-                    img.save(filepath, format="JPEG")
+                if self.frame_segments is not None:
+                    # Encode once for the local file and the frame's segment
+                    buf = io.BytesIO()
+                    img.save(buf, format="JPEG")
+                    data = buf.getvalue()
+                    if not os.path.exists(filepath):
+                        with open(filepath, "wb") as f:
+                            f.write(data)
+                    queued = await self.frame_segments.add_frame(stream_id, self.frame_index, data, stream_state.durable_frames)
+                    if queued is not None:
+                        self._uploads.append(queued)
+                    if self.frame_index == 0 and not stream_state.frame_durable(0):
+                        # The dashboard's cover thumbnail (images/frame/ of frame 0)
+                        self._uploads.append((0, await self.frame_segments.publish_cover(stream_id, 0, data)))
+                    del buf, data
+                else:
+                    # upload image to S3 (already there when a previous attempt got this far)
+                    if not stream_state.frame_durable(self.frame_index):
+                        # Backpressure: decoding stalls while too many upload bytes are in flight
+                        await self.s3_writer.wait_for_capacity()
+                        task = self.s3_writer.upload_image_nowait(
+                            stream_id = stream_id,
+                            image_file = img,
+                            filename = filename
+                        )
+                        self._uploads.append((self.frame_index, task))
+
+                    if not os.path.exists(filepath):
+                        img.save(filepath, format="JPEG")
                 del img
-            except Exception as e:
-                print("Error saving video frame:", e)
-                return
-
-            metadata = {
-                "stream_id": stream_id,
-                "filename": filename,
-                "frame_index": self.frame_index,
-                "timestamp": ts,
-                "pts": frame.pts,
-                "width": getattr(frame, "width", None),
-                "height": getattr(frame, "height", None),
-            }
-            
-            await self.db_writer.insert_dict(VIDEO_METADATA_TABLE_NAME, metadata)
+
+                # keep the decoded pixels so consumers skip the JPEG round trip
+                bgr = frame.to_ndarray(format="bgr24")
+                self.frame_store.put(self.frame_index, bgr)
+                scene_detector.push(self.frame_index, bgr)
+                del bgr
+            except Exception:
+                # Stop sampling but still close out the stream below, so consumers
+                # waiting on frames past this one are released
+                logger.exception(f"[VideoProcessor] error saving video frame {self.frame_index}, stopping")
+                break
+
+            self.manifest.append(
+                self.frame_index,
+                frame.pts,
+                ts,
+                getattr(frame, "width", None),
+                getattr(frame, "height", None),
+            )
+            if len(self.manifest) % FRAME_MANIFEST_CHECKPOINT_FRAMES == 0:
+                await self._save_manifest(stream_id, stream_state)
+            stream_state.mark_frame_ingested(self.frame_index, ts)
         
             self.frame_index += 1
             self.last_saved_pts = ts
-        
+
+        if self.frame_segments is not None:
+            queued = await self.frame_segments.flush(stream_id, stream_state.durable_frames)
+            if queued is not None:
+                self._uploads.append(queued)
+        await self._save_manifest(stream_id, stream_state)
+        stream_state.mark_video_done()
         video_processor_event.set()
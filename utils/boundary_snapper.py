@@ -1,65 +1,281 @@
 from __future__ import annotations
 
-from typing import Dict, Iterable, List, Optional, Tuple
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+import numpy as np
+
+
+_TIE_EPS = 1e-2  # distances within 10ms are ties, broken by prefer_direction
+
+
+class BoundaryIndex:
+    """
+    Immutable sorted array of boundary timestamps with bisect-based queries.
+
+    nearest() is O(log n). nearest_many() answers a whole array of queries
+    with one searchsorted call, which is what snap_windows() uses to snap all
+    highlight windows of a chunk at once.
+    """
+
+    __slots__ = ("times",)
+
+    def __init__(self, boundaries: Iterable[float] = ()):
+        if isinstance(boundaries, BoundaryIndex):
+            self.times = boundaries.times
+            return
+        arr = np.asarray(boundaries if isinstance(boundaries, np.ndarray) else list(boundaries), dtype=np.float64)
+        self.times = np.unique(arr[np.isfinite(arr)])
+
+    @classmethod
+    def coerce(cls, boundaries: Union["BoundaryIndex", Iterable[float], None]) -> "BoundaryIndex":
+        if isinstance(boundaries, BoundaryIndex):
+            return boundaries
+        return cls(boundaries if boundaries is not None else ())
+
+    def __len__(self) -> int:
+        return len(self.times)
+
+    def __iter__(self):
+        return iter(self.times.tolist())
+
+    def __bool__(self) -> bool:
+        return len(self.times) > 0
+
+    def tolist(self) -> List[float]:
+        return self.times.tolist()
+
+    def nearest(
+        self,
+        t: float,
+        max_shift: float = np.inf,
+        forbid_cross: Optional[float] = None,
+        prefer_direction: Optional[str] = None,
+    ) -> Optional[float]:
+        out = self.nearest_many(
+            np.array([t], dtype=np.float64),
+            max_shift,
+            None if forbid_cross is None else np.array([forbid_cross], dtype=np.float64),
+            prefer_direction,
+        )[0]
+        return None if np.isnan(out) else float(out)
+
+    def nearest_many(
+        self,
+        ts: np.ndarray,
+        max_shift: float,
+        forbid_cross: Optional[np.ndarray] = None,
+        prefer_direction: Optional[str] = None,  # 'past' or 'future'
+    ) -> np.ndarray:
+        """
+        Nearest boundary to each of ts within max_shift seconds (NaN if none).
+
+        - If forbid_cross is provided, reject candidates that would move t across that
+          time (e.g., the clip midpoint).
+        - If prefer_direction is provided, tie-break by preferring candidates in that
+          temporal direction when distances are very similar (~10ms); otherwise
+          ties go to the earlier candidate.
+        """
+        ts = np.asarray(ts, dtype=np.float64)
+        result = np.full(ts.shape, np.nan)
+        n = len(self.times)
+        if n == 0 or ts.size == 0:
+            return result
+
+        lo = ts - max_shift
+        hi = ts + max_shift
+        if forbid_cross is not None:
+            fc = np.asarray(forbid_cross, dtype=np.float64)
+            hi = np.where(ts <= fc, np.minimum(hi, fc), hi)  # start must not pass the midpoint
+            lo = np.where(fc <= ts, np.maximum(lo, fc), lo)  # end must not pass the midpoint
+
+        # Only the neighbours around t can be nearest: left <= t < right
+        left = np.searchsorted(self.times, ts, side="right") - 1
+        right = left + 1
+        left_t = self.times[np.clip(left, 0, n - 1)]
+        right_t = self.times[np.clip(right, 0, n - 1)]
+        left_ok = (left >= 0) & (left_t >= lo) & (left_t <= hi)
+        right_ok = (right < n) & (right_t >= lo) & (right_t <= hi)
+
+        d_left = ts - left_t
+        d_right = right_t - ts
+        if prefer_direction == "future":
+            # right is strictly future; left counts as future only when it equals t
+            pick_right = d_right <= d_left + _TIE_EPS
+            pick_right &= ~(d_left == 0)
+        else:
+            pick_right = d_right < d_left - _TIE_EPS
+
+        use_right = right_ok & (~left_ok | pick_right)
+        use_left = left_ok & ~use_right
+        result[use_left] = left_t[use_left]
+        result[use_right] = right_t[use_right]
+        return result
+
+
+EMPTY_INDEX = BoundaryIndex()
+
+Boundaries = Union[BoundaryIndex, Iterable[float]]
 
 
 def _nearest(
     t: float,
-    candidates: Iterable[float],
+    candidates: Boundaries,
     max_shift: float,
     forbid_cross: Optional[float] = None,
     prefer_direction: Optional[str] = None,  # 'past' or 'future'
 ) -> Optional[float]:
+    """Find nearest candidate to time t within max_shift seconds (see BoundaryIndex.nearest_many)."""
+    return BoundaryIndex.coerce(candidates).nearest(t, max_shift, forbid_cross, prefer_direction)
+
+
+_PRIORITIES = {
+    "scene_first": ("scene", "topic", "audio"),
+    "topic_first": ("topic", "scene", "audio"),
+    "audio_first": ("audio", "topic", "scene"),
+}
+
+
+_SOURCE_NAMES = ("original", "scene", "topic", "audio")
+
+
+def snap_windows(
+    starts: Iterable[float],
+    ends: Iterable[float],
+    scene_boundaries: Boundaries = (),
+    topic_boundaries: Boundaries = (),
+    audio_boundaries: Boundaries = (),
+    *,
+    max_shift_scene_start: float = 1.0,
+    max_shift_scene_end: float = 2.0,
+    max_shift_topic: float = 1.0,
+    max_shift_audio: float = 1.0,
+    min_len: Union[float, np.ndarray] = 4.0,
+    max_len: Union[float, np.ndarray] = 12.0,
+    priority: str = "scene_first",
+    audio_refine: float = 0.0,
+) -> Tuple[np.ndarray, np.ndarray, List[Dict[str, str]]]:
     """
-    Find nearest candidate to time t within max_shift seconds.
+    Vectorized snap_window over many [start, end] windows.
+
+    min_len/max_len may be scalars or per-window arrays. With audio_refine > 0,
+    an audio boundary within audio_refine seconds of an edge chosen by the
+    priority order wins: a speech pause right next to a scene/topic cut is the
+    cleaner cut point.
 
-    - If forbid_cross is provided, reject candidates that would move t across that
-      time (e.g., the clip midpoint).
-    - If prefer_direction is provided, tie-break by preferring candidates in that
-      temporal direction when distances are very similar (~10ms).
+    Returns: (new_starts, new_ends, sources) with one sources dict per window.
     """
-    best = None
-    best_d = None
-    for c in candidates:
-        d = abs(c - t)
-        if d > max_shift:
-            continue
-        if forbid_cross is not None:
-            if t <= forbid_cross < c:
-                # moving start past midpoint
-                continue
-            if c < forbid_cross <= t:
-                # moving end past midpoint
-                continue
-        if best is None or d < best_d - 1e-2:
-            best, best_d = c, d
-        elif best is not None and abs(d - best_d) <= 1e-2 and prefer_direction:
-            if prefer_direction == "past" and c <= t and best > t:
-                best, best_d = c, d
-            elif prefer_direction == "future" and c >= t and best < t:
-                best, best_d = c, d
-    return best
+    start = np.asarray(starts, dtype=np.float64).copy()
+    end = np.asarray(ends, dtype=np.float64).copy()
+    if start.shape != end.shape:
+        raise ValueError("starts and ends must have the same length")
+    if np.any(end <= start):
+        raise ValueError("end must be greater than start")
+
+    mid = (start + end) / 2.0
+    order = _PRIORITIES.get(priority, _PRIORITIES["scene_first"])
+    sources = {
+        "scene": BoundaryIndex.coerce(scene_boundaries),
+        "topic": BoundaryIndex.coerce(topic_boundaries),
+        "audio": BoundaryIndex.coerce(audio_boundaries),
+    }
+    start_shift = {"scene": max_shift_scene_start, "topic": max_shift_topic, "audio": max_shift_audio}
+    end_shift = {"scene": max_shift_scene_end, "topic": max_shift_topic, "audio": max_shift_audio}
+
+    # Snap each edge to the first source in priority order that has a candidate.
+    s_src = np.zeros(start.shape, dtype=np.int8)
+    e_src = np.zeros(end.shape, dtype=np.int8)
+    for name in order:
+        code = _SOURCE_NAMES.index(name)
+        open_s = s_src == 0
+        if open_s.any():
+            cand = sources[name].nearest_many(start[open_s], start_shift[name], mid[open_s], "past")
+            hit = ~np.isnan(cand)
+            idx = np.nonzero(open_s)[0][hit]
+            start[idx] = cand[hit]
+            s_src[idx] = code
+        open_e = e_src == 0
+        if open_e.any():
+            cand = sources[name].nearest_many(end[open_e], end_shift[name], mid[open_e], "future")
+            hit = ~np.isnan(cand)
+            idx = np.nonzero(open_e)[0][hit]
+            end[idx] = cand[hit]
+            e_src[idx] = code
+
+    if audio_refine > 0 and sources["audio"]:
+        code = _SOURCE_NAMES.index("audio")
+        cand = sources["audio"].nearest_many(start, audio_refine, mid, "past")
+        hit = ~np.isnan(cand)
+        start[hit] = cand[hit]
+        s_src[hit] = code
+        cand = sources["audio"].nearest_many(end, audio_refine, mid, "future")
+        hit = ~np.isnan(cand)
+        end[hit] = cand[hit]
+        e_src[hit] = code
+
+    # Enforce duration constraints.
+    s_orig = s_src == 0
+    e_orig = e_src == 0
+    dur = end - start
+    need = min_len - dur
+    short = dur < min_len
+    # Expand end first, then start, up to max_len; split when both were snapped.
+    grow_end = short & e_orig
+    grow_start = short & ~e_orig & s_orig
+    split = short & ~e_orig & ~s_orig
+    new_end = np.where(grow_end, np.minimum(end + need, start + max_len), end)
+    split_end = np.minimum(end + need / 2.0, start + max_len)
+    new_end = np.where(split, split_end, new_end)
+    new_start = np.where(grow_start, np.maximum(start - need, end - max_len), start)
+    split_start = np.maximum(start - (need - (split_end - end)), split_end - max_len)
+    new_start = np.where(split, split_start, new_start)
+
+    # Prefer trimming equally around midpoint; avoid undoing snaps by trimming the "original" side.
+    long = dur > max_len
+    excess = dur - max_len
+    trim_s = np.where(~s_orig & e_orig, 0.0, np.where(~e_orig & s_orig, excess, excess / 2.0))
+    trim_e = excess - trim_s
+    new_start = np.where(long, start + trim_s, new_start)
+    new_end = np.where(long, end - trim_e, new_end)
+
+    tags = [
+        {"start_source": _SOURCE_NAMES[a], "end_source": _SOURCE_NAMES[b]}
+        for a, b in zip(s_src.tolist(), e_src.tolist())
+    ]
+    # Python round() per value keeps results identical to the scalar snapper
+    return (
+        np.array([round(x, 3) for x in new_start.tolist()]),
+        np.array([round(x, 3) for x in new_end.tolist()]),
+        tags,
+    )
 
 
 def snap_window(
     start: float,
     end: float,
-    scene_boundaries: Iterable[float] = (),
-    topic_boundaries: Iterable[float] = (),
+    scene_boundaries: Boundaries = (),
+    topic_boundaries: Boundaries = (),
+    audio_boundaries: Boundaries = (),
     *,
     max_shift_scene_start: float = 1.0,
     max_shift_scene_end: float = 2.0,
     max_shift_topic: float = 1.0,
+    max_shift_audio: float = 1.0,
     min_len: float = 4.0,
     max_len: float = 12.0,
     priority: str = "scene_first",
+    audio_refine: float = 0.0,
 ) -> Tuple[float, float, Dict[str, str]]:
     """
-    Snap [start, end] to nearest boundaries with priority: scene > topic.
+    Snap [start, end] to nearest boundaries with priority: scene > topic > audio.
+
+    priority is one of 'scene_first', 'topic_first', 'audio_first'; each edge
+    takes the nearest boundary of the first source in that order that has one
+    within its max shift. Boundaries may be BoundaryIndex instances or plain
+    iterables of seconds.
 
     Returns: (new_start, new_end, sources)
-      where sources = { 'start_source': 'scene|topic|original',
-                        'end_source':   'scene|topic|original' }
+      where sources = { 'start_source': 'scene|topic|audio|original',
+                        'end_source':   'scene|topic|audio|original' }
 
     Invariants:
       - Does not let start cross the midpoint towards the end (and vice versa).
@@ -67,79 +283,19 @@ def snap_window(
     """
     if end <= start:
         raise ValueError("end must be greater than start")
-
-    mid = (start + end) / 2.0
-    s_src = "original"
-    e_src = "original"
-
-    # Try snapping start then end, with configurable priority.
-    if priority == "topic_first":
-        s_candidate = _nearest(start, topic_boundaries, max_shift_topic, forbid_cross=mid, prefer_direction="past")
-        if s_candidate is None:
-            s_candidate = _nearest(start, scene_boundaries, max_shift_scene_start, forbid_cross=mid, prefer_direction="past")
-            if s_candidate is not None:
-                s_src = "scene"
-        else:
-            s_src = "topic"
-    else:
-        s_candidate = _nearest(start, scene_boundaries, max_shift_scene_start, forbid_cross=mid, prefer_direction="past")
-        if s_candidate is None:
-            s_candidate = _nearest(start, topic_boundaries, max_shift_topic, forbid_cross=mid, prefer_direction="past")
-            if s_candidate is not None:
-                s_src = "topic"
-        else:
-            s_src = "scene"
-
-    if s_candidate is not None:
-        start = s_candidate
-
-    # End edge snapping
-    if priority == "topic_first":
-        e_candidate = _nearest(end, topic_boundaries, max_shift_topic, forbid_cross=mid, prefer_direction="future")
-        if e_candidate is None:
-            e_candidate = _nearest(end, scene_boundaries, max_shift_scene_end, forbid_cross=mid, prefer_direction="future")
-            if e_candidate is not None:
-                e_src = "scene"
-        else:
-            e_src = "topic"
-    else:
-        e_candidate = _nearest(end, scene_boundaries, max_shift_scene_end, forbid_cross=mid, prefer_direction="future")
-        if e_candidate is None:
-            e_candidate = _nearest(end, topic_boundaries, max_shift_topic, forbid_cross=mid, prefer_direction="future")
-            if e_candidate is not None:
-                e_src = "topic"
-        else:
-            e_src = "scene"
-
-    if e_candidate is not None:
-        end = e_candidate
-
-    # Enforce duration constraints.
-    dur = end - start
-    if dur < min_len:
-        # Try expanding end first, then start, up to max_len.
-        need = min_len - dur
-        if e_src == "original":
-            end = min(end + need, start + max_len)
-        elif s_src == "original":
-            start = max(start - need, end - max_len)
-        else:
-            # If both were snapped, split expansion.
-            half = need / 2.0
-            end = min(end + half, start + max_len)
-            start = max(start - (need - (end - (start + dur))), end - max_len)
-    elif dur > max_len:
-        # Prefer trimming equally around midpoint when possible.
-        excess = dur - max_len
-        trim_s = trim_e = excess / 2.0
-        # Avoid undoing recent snaps: favor trimming the "original" side first.
-        if s_src != "original" and e_src == "original":
-            trim_s = 0.0
-            trim_e = excess
-        elif e_src != "original" and s_src == "original":
-            trim_s = excess
-            trim_e = 0.0
-        start += trim_s
-        end -= trim_e
-
-    return round(start, 3), round(end, 3), {"start_source": s_src, "end_source": e_src}
+    starts, ends, tags = snap_windows(
+        [start],
+        [end],
+        scene_boundaries,
+        topic_boundaries,
+        audio_boundaries,
+        max_shift_scene_start=max_shift_scene_start,
+        max_shift_scene_end=max_shift_scene_end,
+        max_shift_topic=max_shift_topic,
+        max_shift_audio=max_shift_audio,
+        min_len=min_len,
+        max_len=max_len,
+        priority=priority,
+        audio_refine=audio_refine,
+    )
+    return float(starts[0]), float(ends[0]), tags[0]
@@ -0,0 +1,293 @@
+import os
+import mmap
+import numpy as np
+
+from array import array
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+from utils.helpers import get_video_frame_filename
+from utils.logger import app_logger as logger
+
+
+# Binary layout of a stream's frame manifest (little-endian, 8-byte aligned):
+#   header (32 bytes): magic, version, flags, count, width, height, reserved
+#   int64   frame_index[count]
+#   int64   pts[count]        (MISSING_PTS when the decoder gave none)
+#   float64 timestamp[count]  (NaN when unknown)
+# Each column is a plain numpy array at a fixed offset, so a manifest can be
+# read with np.frombuffer over bytes or a memory map without copying.
+MANIFEST_MAGIC = b"SSFM"
+MANIFEST_VERSION = 1
+MISSING_PTS = np.iinfo(np.int64).min
+# Written by VideoProcessor next to the sampled frames
+FRAME_MANIFEST_FILENAME = "frames.manifest"
+
+HEADER_DTYPE = np.dtype([
+    ("magic", "S4"),
+    ("version", "<u2"),
+    ("flags", "<u2"),
+    ("count", "<u8"),
+    ("width", "<u4"),
+    ("height", "<u4"),
+    ("reserved", "<u8"),
+])
+COLUMN_DTYPES = (("frame_index", np.dtype("<i8")), ("pts", np.dtype("<i8")), ("timestamp", np.dtype("<f8")))
+
+
+def _column(values, dtype: str, missing) -> np.ndarray:
+    if isinstance(values, np.ndarray):
+        return values.astype(dtype, copy=False)
+    return np.asarray([missing if v is None else v for v in values], dtype=dtype)
+
+
+def encode_manifest(frame_index, pts, timestamp, width: int = 0, height: int = 0) -> bytes:
+    """
+    Pack the frame columns of a stream, ordered by frame_index.
+
+    Args:
+        frame_index, pts, timestamp: Equal-length sequences (None pts/timestamp allowed)
+        width, height: Frame size shared by every frame of the stream
+
+    Returns:
+        The manifest bytes
+    """
+    frame_index = np.asarray(frame_index, dtype="<i8")
+    pts = _column(pts, "<i8", MISSING_PTS)
+    timestamp = _column(timestamp, "<f8", np.nan)
+    if not (len(frame_index) == len(pts) == len(timestamp)):
+        raise ValueError("manifest columns must have the same length")
+
+    order = np.argsort(frame_index, kind="stable")
+    header = np.zeros(1, dtype=HEADER_DTYPE)
+    header["magic"] = MANIFEST_MAGIC
+    header["version"] = MANIFEST_VERSION
+    header["count"] = len(frame_index)
+    header["width"] = width or 0
+    header["height"] = height or 0
+    return b"".join([header.tobytes()] + [column[order].tobytes() for column in (frame_index, pts, timestamp)])
+
+
+def read_header(buffer) -> Dict[str, int]:
+    header = np.frombuffer(buffer, dtype=HEADER_DTYPE, count=1)[0]
+    if bytes(header["magic"]) != MANIFEST_MAGIC:
+        raise ValueError("not a frame manifest")
+    if int(header["version"]) != MANIFEST_VERSION:
+        raise ValueError(f"unsupported frame manifest version {int(header['version'])}")
+    return {"count": int(header["count"]), "width": int(header["width"]), "height": int(header["height"])}
+
+
+def decode_manifest(buffer) -> Dict[str, object]:
+    """
+    Columns of a manifest as numpy views over buffer (bytes, memoryview or mmap).
+
+    Returns:
+        {"count", "width", "height", "frame_index", "pts", "timestamp"}
+    """
+    manifest: Dict[str, object] = read_header(buffer)
+    count = manifest["count"]
+    offset = HEADER_DTYPE.itemsize
+    for name, dtype in COLUMN_DTYPES:
+        manifest[name] = np.frombuffer(buffer, dtype=dtype, count=count, offset=offset)
+        offset += count * dtype.itemsize
+    return manifest
+
+
+def merge_manifest(existing: Optional[bytes], rows: Iterable[Dict], width: int = 0, height: int = 0) -> bytes:
+    """
+    Manifest of existing plus video_metadata-like rows; rows win on equal frame_index.
+    """
+    frames = {}
+    if existing:
+        old = decode_manifest(existing)
+        width = width or old["width"]
+        height = height or old["height"]
+        for idx, p, ts in zip(old["frame_index"].tolist(), old["pts"].tolist(), old["timestamp"].tolist()):
+            frames[idx] = (p, ts)
+    for row in rows:
+        frames[int(row["frame_index"])] = (row.get("pts"), row.get("timestamp"))
+    indexes = sorted(frames)
+    return encode_manifest(
+        indexes,
+        [frames[i][0] for i in indexes],
+        [frames[i][1] for i in indexes],
+        width=width,
+        height=height,
+    )
+
+
+def build_manifest_row(stream_id: str, rows: List[Dict[str, Any]], existing: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+    """
+    frame_manifest row replacing a stream's video_metadata rows (and merging
+    a manifest compacted earlier), or None when the rows cannot be collapsed:
+    the manifest keeps a single frame size and derives filenames from
+    frame_index, so rows that differ from that are left in place.
+    """
+    if not rows:
+        return None
+    sizes = {(row["width"], row["height"]) for row in rows}
+    if existing is not None:
+        sizes.add((existing["width"], existing["height"]))
+    if len(sizes) > 1:
+        logger.warning(f"[FrameManifest] {stream_id}: frame size varies {sorted(sizes, key=str)}, not compacting")
+        return None
+    odd = [row["frame_index"] for row in rows if row["filename"] != get_video_frame_filename(row["frame_index"])]
+    if odd:
+        logger.warning(f"[FrameManifest] {stream_id}: {len(odd)} frame(s) with custom filenames, not compacting")
+        return None
+
+    width, height = sizes.pop()
+    manifest = merge_manifest(existing["manifest"] if existing else None, rows, width=width, height=height)
+    return summary_row(stream_id, manifest)
+
+
+def summary_row(stream_id: str, manifest: bytes) -> Dict[str, Any]:
+    """The stream-level frame_manifest row of a (non-empty) manifest."""
+    columns = decode_manifest(manifest)
+    timestamp = columns["timestamp"]
+    return {
+        "stream_id": stream_id,
+        "frame_count": columns["count"],
+        "last_frame_index": int(columns["frame_index"][-1]),
+        "last_timestamp": None if np.isnan(timestamp[-1]) else float(timestamp[-1]),
+        "width": columns["width"] or None,
+        "height": columns["height"] or None,
+        "manifest": manifest,
+    }
+
+
+class FrameManifestWriter:
+    """
+    Frame columns of the stream being ingested, appended in frame_index order.
+
+    Appends are amortized O(1) into typed arrays; write() saves the manifest
+    file (atomically, so readers never map a partial file) and returns the
+    bytes for the stream's frame_manifest row.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.frame_index = array("q")
+        self.pts = array("q")
+        self.timestamp = array("d")
+        self.width = 0
+        self.height = 0
+        self._size_warned = False
+
+    def __len__(self):
+        return len(self.frame_index)
+
+    def append(self, frame_index: int, pts: Optional[int], timestamp: Optional[float], width: Optional[int] = None, height: Optional[int] = None):
+        if self.frame_index and frame_index <= self.frame_index[-1]:
+            raise ValueError(f"frame {frame_index} appended after frame {self.frame_index[-1]}")
+        if not self.width:
+            self.width, self.height = width or 0, height or 0
+        elif (width, height) != (self.width, self.height) and not self._size_warned:
+            # The manifest keeps one frame size per stream
+            logger.warning(f"[FrameManifest] frame {frame_index} is {width}x{height}, manifest keeps {self.width}x{self.height}")
+            self._size_warned = True
+        self.frame_index.append(frame_index)
+        self.pts.append(MISSING_PTS if pts is None else pts)
+        self.timestamp.append(float("nan") if timestamp is None else timestamp)
+
+    def to_bytes(self, count: Optional[int] = None) -> bytes:
+        """Manifest of all frames, or of the first count frames."""
+        count = len(self.frame_index) if count is None else count
+        return encode_manifest(
+            np.frombuffer(self.frame_index, dtype="<i8")[:count],
+            np.frombuffer(self.pts, dtype="<i8")[:count],
+            np.frombuffer(self.timestamp, dtype="<f8")[:count],
+            width=self.width,
+            height=self.height,
+        )
+
+    def write(self) -> bytes:
+        manifest = self.to_bytes()
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(manifest)
+        os.replace(tmp_path, self.path)
+        return manifest
+
+
+class FrameManifest:
+    """
+    Read-only view of a frame manifest, over a memory-mapped file or bytes.
+
+    Frames are sorted by frame_index, so index-to-timestamp is an O(1) offset
+    when frame indexes are contiguous (the VideoProcessor case, else a binary
+    search). AssortClipsService maps the file VideoProcessor writes to read
+    the recorded time of sampled frames.
+    """
+
+    def __init__(self, buffer, mapped: Optional[mmap.mmap] = None):
+        columns = decode_manifest(buffer)
+        self._mmap = mapped
+        self.width = columns["width"]
+        self.height = columns["height"]
+        self.frame_index = columns["frame_index"]
+        self.pts = columns["pts"]
+        self.timestamp = columns["timestamp"]
+        self.first_index = int(self.frame_index[0]) if len(self.frame_index) else 0
+        self.contiguous = (
+            len(self.frame_index) == 0
+            or int(self.frame_index[-1]) - self.first_index == len(self.frame_index) - 1
+        )
+
+    @classmethod
+    def open(cls, path: str) -> "FrameManifest":
+        with open(path, "rb") as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return cls(mapped, mapped)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "FrameManifest":
+        return cls(data)
+
+    def close(self):
+        # Views over the map must be gone before it can be closed
+        self.frame_index = self.pts = self.timestamp = None
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return len(self.frame_index)
+
+    def position(self, frame_index: int) -> Optional[int]:
+        """Row of frame_index in the columns, or None when the frame is not in the manifest."""
+        if self.contiguous:
+            pos = frame_index - self.first_index
+            return pos if 0 <= pos < len(self.frame_index) else None
+        pos = int(np.searchsorted(self.frame_index, frame_index))
+        return pos if pos < len(self.frame_index) and self.frame_index[pos] == frame_index else None
+
+    def timestamp_of(self, frame_index: int) -> Optional[float]:
+        pos = self.position(frame_index)
+        if pos is None or np.isnan(self.timestamp[pos]):
+            return None
+        return float(self.timestamp[pos])
+
+    def rows(self, stream_id: str, start_frame: Optional[int] = None, end_frame: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """video_metadata-shaped rows of the frames in [start_frame, end_frame]."""
+        lo = 0 if start_frame is None else int(np.searchsorted(self.frame_index, start_frame, side="left"))
+        hi = len(self.frame_index) if end_frame is None else int(np.searchsorted(self.frame_index, end_frame, side="right"))
+        for pos in range(lo, hi):
+            idx = int(self.frame_index[pos])
+            pts = int(self.pts[pos])
+            ts = float(self.timestamp[pos])
+            yield {
+                "id": None,
+                "stream_id": stream_id,
+                "filename": get_video_frame_filename(idx),
+                "frame_index": idx,
+                "timestamp": None if np.isnan(ts) else ts,
+                "pts": None if pts == MISSING_PTS else pts,
+                "width": self.width or None,
+                "height": self.height or None,
+                "created_at": None,
+            }
@@ -0,0 +1,128 @@
+import numpy as np
+
+from typing import List, Optional, Tuple
+
+
+# Binary layout of a frame segment, the S3 object holding the encoded frames
+# of FRAME_SEGMENT_SECONDS of video (little-endian, 8-byte aligned):
+#   header (16 bytes): magic, version, flags, count, reserved
+#   index[count]: int64 frame_index, uint64 offset, uint32 length, uint32 reserved
+#   the frames' JPEG bytes, back to back (offsets are from the start of the object)
+# The index sits in front, so a reader fetches it with one byte-range GET of
+# segment_index_size(frames_per_segment) bytes and each frame with another.
+SEGMENT_MAGIC = b"SSFS"
+SEGMENT_VERSION = 1
+
+SEGMENT_HEADER_DTYPE = np.dtype([
+    ("magic", "S4"),
+    ("version", "<u2"),
+    ("flags", "<u2"),
+    ("count", "<u4"),
+    ("reserved", "<u4"),
+])
+SEGMENT_INDEX_DTYPE = np.dtype([
+    ("frame_index", "<i8"),
+    ("offset", "<u8"),
+    ("length", "<u4"),
+    ("reserved", "<u4"),
+])
+
+
+def segment_index_size(count: int) -> int:
+    """Bytes of the header and index of a segment of count frames."""
+    return SEGMENT_HEADER_DTYPE.itemsize + count * SEGMENT_INDEX_DTYPE.itemsize
+
+
+def encode_segment(frames: List[Tuple[int, bytes]]) -> bytes:
+    """
+    Pack encoded frames into one segment.
+
+    Args:
+        frames: (frame_index, JPEG bytes) pairs in frame_index order
+
+    Returns:
+        The segment bytes
+    """
+    header = np.zeros(1, dtype=SEGMENT_HEADER_DTYPE)
+    header["magic"] = SEGMENT_MAGIC
+    header["version"] = SEGMENT_VERSION
+    header["count"] = len(frames)
+
+    index = np.zeros(len(frames), dtype=SEGMENT_INDEX_DTYPE)
+    offset = segment_index_size(len(frames))
+    for i, (frame_index, data) in enumerate(frames):
+        index[i] = (frame_index, offset, len(data), 0)
+        offset += len(data)
+    return b"".join([header.tobytes(), index.tobytes()] + [data for _, data in frames])
+
+
+def decode_segment_index(buffer) -> np.ndarray:
+    """
+    Index of a segment from its first bytes (at least segment_index_size(count)).
+
+    Returns:
+        Structured array with frame_index, offset and length per frame
+    """
+    header = np.frombuffer(buffer, dtype=SEGMENT_HEADER_DTYPE, count=1)[0]
+    if bytes(header["magic"]) != SEGMENT_MAGIC:
+        raise ValueError("not a frame segment")
+    if int(header["version"]) != SEGMENT_VERSION:
+        raise ValueError(f"unsupported frame segment version {int(header['version'])}")
+    count = int(header["count"])
+    if len(buffer) < segment_index_size(count):
+        raise ValueError(f"frame segment index truncated ({len(buffer)} bytes for {count} frames)")
+    return np.frombuffer(buffer, dtype=SEGMENT_INDEX_DTYPE, count=count, offset=SEGMENT_HEADER_DTYPE.itemsize)
+
+
+def frame_range(index: np.ndarray, frame_index: int) -> Optional[Tuple[int, int]]:
+    """(first byte, last byte) of frame_index in its segment, None when the segment lacks it."""
+    pos = int(np.searchsorted(index["frame_index"], frame_index))
+    if pos >= len(index) or index["frame_index"][pos] != frame_index:
+        return None
+    offset = int(index["offset"][pos])
+    return offset, offset + int(index["length"][pos]) - 1
+
+
+def read_frame(segment: bytes, frame_index: int) -> Optional[bytes]:
+    """JPEG bytes of frame_index from a whole segment in memory."""
+    byte_range = frame_range(decode_segment_index(segment), frame_index)
+    if byte_range is None:
+        return None
+    return segment[byte_range[0]:byte_range[1] + 1]
+
+
+class FrameSegmentWriter:
+    """
+    Groups the frames of a stream into segments of frames_per_segment frames.
+    Segment n holds frames [n * frames_per_segment, (n + 1) * frames_per_segment),
+    so the segment of any frame is known without a lookup.
+    """
+
+    def __init__(self, frames_per_segment: int):
+        self.frames_per_segment = frames_per_segment
+        self.segment = None
+        self.frames: List[Tuple[int, bytes]] = []
+
+    def segment_of(self, frame_index: int) -> int:
+        return frame_index // self.frames_per_segment
+
+    def add(self, frame_index: int, data: bytes) -> Optional[Tuple[int, bytes]]:
+        """
+        Add a frame; returns (segment number, segment bytes) of the segment it
+        closed, if any.
+        """
+        segment = self.segment_of(frame_index)
+        closed = None
+        if self.frames and segment != self.segment:
+            closed = self.flush()
+        self.segment = segment
+        self.frames.append((frame_index, data))
+        return closed
+
+    def flush(self) -> Optional[Tuple[int, bytes]]:
+        """Close the open (possibly partial) segment."""
+        if not self.frames:
+            return None
+        closed = (self.segment, encode_segment(self.frames))
+        self.frames = []
+        return closed
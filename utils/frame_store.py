@@ -0,0 +1,115 @@
+import os
+import cv2
+import threading
+import numpy as np
+
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional
+from config import FRAME_CACHE_MAX_BYTES
+from utils.logger import app_logger as logger
+from utils.helpers import get_video_frame_filename
+
+
+class FrameStore:
+    """
+    Decoded frames (BGR ndarrays) of a single stream, keyed by frame_index.
+
+    Reads are served from a byte-bounded LRU and fall back to decoding the
+    JPEG from the frames directory. VideoProcessor puts every sampled frame
+    into the store while the pixels are still in memory, so scoring, scene
+    detection and edge refinement do not decode the same file again.
+
+    Cached arrays are shared between consumers and marked read-only.
+    """
+
+    def __init__(self, frames_dir: str, max_bytes: int = FRAME_CACHE_MAX_BYTES):
+        self.frames_dir = frames_dir
+        self.max_bytes = max_bytes
+        self._frames: "OrderedDict[int, np.ndarray]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def frame_path(self, idx: int) -> str:
+        return os.path.join(self.frames_dir, get_video_frame_filename(idx))
+
+    def put(self, idx: int, img: Optional[np.ndarray]):
+        if img is None or img.nbytes > self.max_bytes:
+            return
+        img.flags.writeable = False
+        with self._lock:
+            old = self._frames.pop(idx, None)
+            if old is not None:
+                self._bytes -= old.nbytes
+            self._frames[idx] = img
+            self._bytes += img.nbytes
+            while self._bytes > self.max_bytes:
+                _, evicted = self._frames.popitem(last=False)
+                self._bytes -= evicted.nbytes
+
+    def get(self, idx: int, populate: bool = True) -> Optional[np.ndarray]:
+        """
+        Return the decoded frame at idx, or None if it does not exist.
+
+        Args:
+            idx: Frame index
+            populate: Insert a frame decoded from disk into the LRU. Full scans
+                      pass False so they do not evict recently ingested frames.
+        """
+        if idx < 0:
+            return None
+        with self._lock:
+            img = self._frames.get(idx)
+            if img is not None:
+                self._frames.move_to_end(idx)
+                self.hits += 1
+                return img
+            self.misses += 1
+
+        path = self.frame_path(idx)
+        if not os.path.exists(path):
+            return None
+        img = cv2.imread(path)
+        if img is None:
+            logger.warning(f"[FrameStore] unable to decode frame {os.path.basename(path)}")
+            return None
+        if populate:
+            self.put(idx, img)
+        return img
+
+    def get_many(self, indexes: Iterable[int]) -> List[np.ndarray]:
+        frames = []
+        for idx in indexes:
+            img = self.get(idx)
+            if img is not None:
+                frames.append(img)
+        return frames
+
+    def __len__(self):
+        return len(self._frames)
+
+    @property
+    def nbytes(self) -> int:
+        return self._bytes
+
+
+_stores: Dict[str, FrameStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_frame_store(frames_dir: str) -> FrameStore:
+    """Return the process-wide FrameStore for a stream's frames directory."""
+    key = os.path.normpath(os.path.abspath(frames_dir))
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            store = FrameStore(frames_dir)
+            _stores[key] = store
+        return store
+
+
+def drop_frame_store(frames_dir: str):
+    key = os.path.normpath(os.path.abspath(frames_dir))
+    with _stores_lock:
+        _stores.pop(key, None)
@@ -8,6 +8,7 @@ import random
 import asyncio
 import requests
 import functools
+import threading
 import numpy as np
 
 from .logger import app_logger as logger
@@ -33,6 +34,12 @@ def get_audio_filename(idx: int):
 def get_video_frame_filename(idx: int):
     return f"frame_{idx:09d}.jpg"
 
+def get_video_frame_index(filename: str) -> int:
+    return int(filename[len("frame_"):-len(".jpg")])
+
+def get_video_segment_filename(idx: int):
+    return f"segment_{idx:06d}.bin"
+
 async def run_sync_func(func, *args, **kwargs):
     loop = asyncio.get_running_loop()
     return await loop.run_in_executor(None, func, *args, **kwargs)
@@ -164,6 +171,24 @@ def get_secret(secret_name: str, region_name: str = "us-east-1"):
     except Exception as e:
         logger.error(f"The requested secret {secret_name} was not found")
 
+_secret_cache = {}
+_secret_cache_lock = threading.Lock()
+
+
+def get_cached_secret(secret_name: str, region_name: str = "us-east-1", refresh: bool = False):
+    """
+    Process-wide cached get_secret. Pass refresh=True after an authentication
+    failure to fetch the (possibly rotated) secret again.
+    """
+    key = (secret_name, region_name)
+    with _secret_cache_lock:
+        if not refresh and _secret_cache.get(key) is not None:
+            return _secret_cache[key]
+        secret = get_secret(secret_name, region_name)
+        if secret is not None:
+            _secret_cache[key] = secret
+        return secret
+
 def seconds_to_hhmmss(seconds: int) -> str:
     """
     Convert seconds to HH:MM:SS format.
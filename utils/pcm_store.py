@@ -0,0 +1,107 @@
+import os
+import json
+import threading
+import numpy as np
+
+from typing import Dict, Optional
+from utils.logger import app_logger as logger
+
+STREAM_PCM_FILENAME = "stream.pcm"
+STREAM_PCM_FORMAT_FILENAME = "stream.pcm.json"
+
+
+class PcmStreamWriter:
+    """
+    Appends interleaved s16le samples of a whole stream to one contiguous file
+    (emptied when the writer is created).
+
+    AudioChunker writes the same resampled frames it encodes into the per-chunk
+    WAVs, so sample k of the file is at k / (sample_rate * channels) seconds.
+    """
+
+    def __init__(self, audio_dir: str):
+        self.path = os.path.join(audio_dir, STREAM_PCM_FILENAME)
+        self.format_path = os.path.join(audio_dir, STREAM_PCM_FORMAT_FILENAME)
+        self._file = None
+        # Every run (a resumed one too) decodes from t=0: drop a previous attempt's
+        # samples before any reader maps the file, so offsets are this run's
+        if os.path.exists(self.path):
+            open(self.path, "wb").close()
+
+    def append(self, samples: np.ndarray, sample_rate: int, channels: int):
+        if self._file is None:
+            with open(self.format_path, "w") as f:
+                json.dump({"sample_rate": sample_rate, "channels": channels, "format": "s16le"}, f)
+            self._file = open(self.path, "ab")
+        self._file.write(np.ascontiguousarray(samples, dtype=np.int16).tobytes())
+
+    def flush(self):
+        if self._file is not None:
+            self._file.flush()
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class PcmWindowReader:
+    """
+    Zero-copy reads of [start_time, end_time) windows from a stream PCM file.
+
+    The file is memory-mapped once and only re-mapped when a read reaches past
+    the mapped length because the writer has appended more samples since.
+    Windows are returned as views shaped (1, n) like packed frames from av.
+    """
+
+    def __init__(self, path: str, sample_rate: int, channels: int):
+        self.path = path
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self._mm: Optional[np.memmap] = None
+        self._lock = threading.Lock()
+
+    def _mapped(self, needed: int) -> Optional[np.memmap]:
+        with self._lock:
+            if self._mm is None or len(self._mm) < needed:
+                n = os.path.getsize(self.path) // np.dtype(np.int16).itemsize
+                if n == 0:
+                    return None
+                if self._mm is None or n > len(self._mm):
+                    self._mm = np.memmap(self.path, dtype=np.int16, mode="r", shape=(n,))
+            return self._mm
+
+    def window(self, start_time: float, end_time: float) -> Optional[np.ndarray]:
+        stride = self.sample_rate * self.channels
+        start = int(start_time * self.sample_rate) * self.channels
+        end = int(end_time * self.sample_rate) * self.channels
+        if end <= start:
+            return None
+        mm = self._mapped(end)
+        if mm is None or start >= len(mm):
+            return None
+        if end > len(mm):
+            logger.debug(f"[PcmWindowReader] window {start_time}-{end_time} truncated at {len(mm) / stride:.3f}s")
+        return mm[start:end].reshape(1, -1)
+
+
+_readers: Dict[str, PcmWindowReader] = {}
+_readers_lock = threading.Lock()
+
+
+def get_pcm_reader(audio_dir: str) -> Optional[PcmWindowReader]:
+    """Return the process-wide reader for a stream's audio directory, if it has PCM data."""
+    key = os.path.normpath(os.path.abspath(audio_dir))
+    with _readers_lock:
+        reader = _readers.get(key)
+        if reader is not None:
+            return reader
+        path = os.path.join(audio_dir, STREAM_PCM_FILENAME)
+        format_path = os.path.join(audio_dir, STREAM_PCM_FORMAT_FILENAME)
+        if not os.path.exists(path) or not os.path.exists(format_path):
+            return None
+        with open(format_path) as f:
+            fmt = json.load(f)
+        reader = PcmWindowReader(path, int(fmt["sample_rate"]), int(fmt["channels"]))
+        _readers[key] = reader
+        return reader
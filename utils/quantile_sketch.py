@@ -0,0 +1,140 @@
+import math
+import random
+
+from typing import Dict, List, Optional
+from config import QUANTILE_SKETCH_K
+
+
+class KllSketch:
+    """
+    Mergeable streaming quantile sketch (Karnin-Lang-Liberty).
+
+    Level h holds items of weight 2**h. When the sketch is full, the lowest
+    full level is sorted and every other item (random offset) is promoted to
+    the next level, so memory stays O(k) while rank error is about 1/k.
+    """
+
+    def __init__(self, k: int = QUANTILE_SKETCH_K, c: float = 2.0 / 3.0, seed: Optional[int] = None):
+        self.k = k
+        self.c = c
+        self.n = 0
+        self.compactors: List[List[float]] = [[]]
+        self._rng = random.Random(seed)
+        self._max_size = self._capacity(0)
+
+    def _capacity(self, h: int) -> int:
+        depth = len(self.compactors) - h - 1
+        return max(2, int(math.ceil(self.k * self.c ** depth)))
+
+    def _grow(self):
+        self.compactors.append([])
+        self._max_size = sum(self._capacity(h) for h in range(len(self.compactors)))
+
+    def _size(self) -> int:
+        return sum(len(c) for c in self.compactors)
+
+    def _compress(self):
+        for h in range(len(self.compactors)):
+            level = self.compactors[h]
+            if len(level) < self._capacity(h):
+                continue
+            if h + 1 >= len(self.compactors):
+                self._grow()
+            level.sort()
+            # An odd item out stays at this level
+            keep = [level.pop()] if len(level) % 2 else []
+            offset = 1 if self._rng.random() < 0.5 else 0
+            self.compactors[h + 1].extend(level[offset::2])
+            self.compactors[h] = keep
+            if self._size() < self._max_size:
+                break
+
+    def update(self, x: float):
+        self.compactors[0].append(float(x))
+        self.n += 1
+        if self._size() >= self._max_size:
+            self._compress()
+
+    def merge(self, other: "KllSketch"):
+        while len(self.compactors) < len(other.compactors):
+            self._grow()
+        for h, level in enumerate(other.compactors):
+            self.compactors[h].extend(level)
+        self.n += other.n
+        while self._size() >= self._max_size:
+            self._compress()
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Approximate q-quantile (0 <= q <= 1), or None if the sketch is empty."""
+        items = sorted(
+            (x, 1 << h) for h, level in enumerate(self.compactors) for x in level
+        )
+        if not items:
+            return None
+        total = sum(w for _, w in items)
+        target = q * total
+        acc = 0
+        for x, w in items:
+            acc += w
+            if acc >= target:
+                return x
+        return items[-1][0]
+
+    def __len__(self):
+        return self.n
+
+    def to_dict(self) -> Dict:
+        return {"k": self.k, "c": self.c, "n": self.n, "compactors": self.compactors}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "KllSketch":
+        sketch = cls(k=int(data.get("k", QUANTILE_SKETCH_K)), c=float(data.get("c", 2.0 / 3.0)))
+        sketch.compactors = [list(map(float, level)) for level in data.get("compactors", [[]])] or [[]]
+        sketch.n = int(data.get("n", 0))
+        sketch._max_size = sum(sketch._capacity(h) for h in range(len(sketch.compactors)))
+        return sketch
+
+
+class ScoreSketches:
+    """Stream-wide sketches of the highlight and saliency scores written by ClipScorerService."""
+
+    def __init__(self):
+        self.highlight = KllSketch()
+        self.saliency = KllSketch()
+
+    def update(self, highlight_score: Optional[float], saliency_score: Optional[float]):
+        if highlight_score is not None:
+            self.highlight.update(highlight_score)
+        if saliency_score is not None:
+            self.saliency.update(saliency_score)
+
+    def merge(self, other: "ScoreSketches"):
+        self.highlight.merge(other.highlight)
+        self.saliency.merge(other.saliency)
+
+    @property
+    def count(self) -> int:
+        return len(self.highlight)
+
+    def to_dict(self) -> Dict:
+        return {"highlight": self.highlight.to_dict(), "saliency": self.saliency.to_dict()}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "ScoreSketches":
+        sketches = cls()
+        if data.get("highlight"):
+            sketches.highlight = KllSketch.from_dict(data["highlight"])
+        if data.get("saliency"):
+            sketches.saliency = KllSketch.from_dict(data["saliency"])
+        return sketches
+
+
+_sketches: Dict[str, ScoreSketches] = {}
+
+
+def get_score_sketches(stream_id: str) -> ScoreSketches:
+    sketches = _sketches.get(stream_id)
+    if sketches is None:
+        sketches = ScoreSketches()
+        _sketches[stream_id] = sketches
+    return sketches
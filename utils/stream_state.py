@@ -0,0 +1,113 @@
+import asyncio
+
+from typing import Dict, Iterable, Optional
+from config import VIDEO_FRAME_SAMPLE_RATE
+
+
+class StreamState:
+    """
+    In-process progress watermarks of one stream's pipeline stages.
+
+    Producers (VideoProcessor, AudioChunker, AudioTranscriber) advance the
+    watermarks right after their rows are durable in the DB, and consumers
+    await readiness instead of polling the DB. The DB stays the durable
+    record; this object is only the signal. The in-process watermarks track
+    local files too, so a resumed job restores the DB's durable progress
+    separately (restore()) and only uses it to skip writes and model calls.
+    """
+
+    def __init__(self, stream_id: str):
+        self.stream_id = stream_id
+        self.frames_ingested = 0
+        self.last_frame_timestamp: Optional[float] = None
+        self.chunks_written = 0
+        self.transcribed_chunks = set()
+        self.video_done = False
+        self.audio_done = False
+        self.transcripts_done = False
+        # Durable progress of a previous attempt (resume mode); work below it is skipped
+        self.durable_frames = 0
+        self.durable_chunks = 0
+        self.durable_scored_until = 0.0
+        self._changed = asyncio.Event()
+
+    def _notify(self):
+        # Wake every waiter; each re-checks its predicate against the new state.
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    async def _wait_for(self, predicate):
+        while not predicate():
+            await self._changed.wait()
+
+    def restore(self, watermarks: Dict):
+        """Seed the durable watermarks read back from the DB (see get_stream_watermarks)."""
+        self.durable_frames = int(watermarks.get("frames", 0))
+        self.durable_chunks = int(watermarks.get("chunks", 0))
+        self.durable_scored_until = float(watermarks.get("scored_until", 0.0))
+
+    def frame_durable(self, frame_index: int) -> bool:
+        return frame_index < self.durable_frames
+
+    def chunk_durable(self, chunk_index: int) -> bool:
+        return chunk_index < self.durable_chunks
+
+    # ---------- producers ----------
+    def mark_frame_ingested(self, frame_index: int, timestamp: Optional[float] = None):
+        self.frames_ingested = max(self.frames_ingested, frame_index + 1)
+        if timestamp is not None:
+            self.last_frame_timestamp = timestamp
+        self._notify()
+
+    def mark_chunk_written(self, chunk_index: int):
+        self.chunks_written = max(self.chunks_written, chunk_index + 1)
+        self._notify()
+
+    def mark_transcribed(self, chunk_index: int):
+        """Transcript of the chunk reached a terminal value (text or ERROR_STRING)."""
+        self.transcribed_chunks.add(chunk_index)
+        self._notify()
+
+    def mark_video_done(self):
+        self.video_done = True
+        self._notify()
+
+    def mark_audio_done(self):
+        self.audio_done = True
+        self._notify()
+
+    def mark_transcripts_done(self):
+        self.transcripts_done = True
+        self._notify()
+
+    # ---------- consumers ----------
+    def frames_ready(self, end_frame: int) -> bool:
+        return self.video_done or self.frames_ingested >= end_frame
+
+    def chunk_ready(self, chunk_index: int) -> bool:
+        if chunk_index in self.transcribed_chunks or self.transcripts_done:
+            return True
+        # The chunk will never be written
+        return self.audio_done and chunk_index >= self.chunks_written
+
+    async def wait_for_time(self, end_time: float, chunk_indexes: Iterable[int]):
+        """
+        Wait until frames and finished transcripts up to end_time exist, or
+        until the producers are done and no more data will arrive.
+        """
+        end_frame = int(end_time * VIDEO_FRAME_SAMPLE_RATE)
+        chunk_indexes = list(chunk_indexes)
+        await self._wait_for(
+            lambda: self.frames_ready(end_frame) and all(self.chunk_ready(c) for c in chunk_indexes)
+        )
+
+
+_states: Dict[str, StreamState] = {}
+
+
+def get_stream_state(stream_id: str) -> StreamState:
+    state = _states.get(stream_id)
+    if state is None:
+        state = StreamState(stream_id)
+        _states[stream_id] = state
+    return state